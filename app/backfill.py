@@ -0,0 +1,423 @@
+"""Resumable, concurrent backfill of historical rates into the history store."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from array import array
+from datetime import date
+from pathlib import Path
+
+import httpx
+
+from app.config import (
+    BACKFILL_BACKOFF_SECONDS,
+    BACKFILL_CHUNK_DAYS,
+    BACKFILL_CONCURRENCY,
+    BACKFILL_MAX_PAIRS,
+    BACKFILL_RATE_PER_SECOND,
+    BACKFILL_RETRIES,
+    HISTORY_DIR,
+)
+from app.services.admission import TokenBucket
+from app.services.fx_client import FXClient, ServiceUnavailableError
+from app.services.live_rates import parse_pairs
+from app.services.providers import (
+    HistoryProvider,
+    LocalFileProvider,
+    default_providers,
+    merge_spans,
+)
+from app.services.rate_series import RateSeries
+from app.utils.validators import format_date_ordinal, parse_date_ordinal
+
+logger = logging.getLogger(__name__)
+
+
+def _write_json(path: Path, data: dict) -> None:
+    """Write JSON atomically so an interrupted run never leaves a torn file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def chunk_span(start: str, end: str, days: int) -> list[tuple[str, str]]:
+    """
+    Split an inclusive date span into consecutive chunks.
+
+    Args:
+        start: First date (YYYY-MM-DD)
+        end: Last date (YYYY-MM-DD)
+        days: Days per chunk
+
+    Returns:
+        (start, end) date pairs covering the span
+    """
+    first, last = parse_date_ordinal(start), parse_date_ordinal(end)
+    return [
+        (format_date_ordinal(o), format_date_ordinal(min(o + days - 1, last)))
+        for o in range(first, last + 1, days)
+    ]
+
+
+class Checkpoint:
+    """
+    Date spans already backfilled per pair, persisted as pairs are written.
+
+    Progress is kept by the days covered rather than by chunk, so a rerun
+    with a different --start or --chunk-days still skips what is stored.
+    """
+
+    def __init__(self, path: str):
+        """
+        Load progress from a previous run, if any.
+
+        Args:
+            path: Checkpoint file
+        """
+        self.path = Path(path)
+        self._covered = HistoryProvider.read_coverage(path)
+
+    def missing(
+        self, base: str, quote: str, start: str, end: str
+    ) -> list[tuple[str, str]]:
+        """
+        Find the parts of a span not yet covered for a pair.
+
+        Args:
+            base: Base currency
+            quote: Quote currency
+            start: First date (YYYY-MM-DD)
+            end: Last date (YYYY-MM-DD)
+
+        Returns:
+            Uncovered inclusive (start, end) date spans, in order
+        """
+        first, last = parse_date_ordinal(start), parse_date_ordinal(end)
+        gaps = []
+        for lo, hi in self._covered.get(f"{base}/{quote}", ()):
+            if hi < first:
+                continue
+            if lo > last:
+                break
+            if lo > first:
+                gaps.append((first, lo - 1))
+            first = hi + 1
+        if first <= last:
+            gaps.append((first, last))
+        return [(format_date_ordinal(lo), format_date_ordinal(hi)) for lo, hi in gaps]
+
+    def mark(self, base: str, quote: str, spans: list[tuple[str, str]]) -> None:
+        """
+        Record spans of a pair as written.
+
+        Args:
+            base: Base currency
+            quote: Quote currency
+            spans: Inclusive (start, end) date spans
+        """
+        pair = f"{base}/{quote}"
+        self._covered[pair] = merge_spans(
+            self._covered.get(pair, [])
+            + [(parse_date_ordinal(lo), parse_date_ordinal(hi)) for lo, hi in spans]
+        )
+        _write_json(
+            self.path,
+            {
+                "covered": {
+                    pair: [
+                        [format_date_ordinal(lo), format_date_ordinal(hi)]
+                        for lo, hi in spans
+                    ]
+                    for pair, spans in sorted(self._covered.items())
+                }
+            },
+        )
+
+
+def merge_into_history(
+    directory: str, base: str, quote: str, series: RateSeries
+) -> int:
+    """
+    Merge fetched rates into a pair's history dataset.
+
+    Args:
+        directory: History directory
+        base: Base currency
+        quote: Quote currency
+        series: Rates to add (they win over stored rates on equal dates)
+
+    Returns:
+        Points in the dataset after merging
+    """
+    path = Path(HistoryProvider.path_for(directory, base, quote))
+    existing = LocalFileProvider._read(str(path))[2] if path.exists() else RateSeries()
+    merged = existing.merge(series)
+    _write_json(
+        path,
+        {"base": base, "to": quote, "rates": dict(zip(merged.dates(), merged.rates))},
+    )
+    return len(merged)
+
+
+class Backfill:
+    """
+    Fetch history for many pairs in chunks under a rate limit.
+
+    Only days the checkpoint does not cover yet are fetched. Quotes sharing
+    a base and missing the same days are fetched together, one upstream
+    request per chunk. At most `concurrency` requests are in flight and
+    starts are paced by a token bucket. Fetched chunks are kept in memory
+    and each pair is written and checkpointed once, in a worker thread,
+    after its last chunk finishes. Failed chunks are retried with
+    exponential backoff and otherwise left for the next run.
+    """
+
+    def __init__(
+        self,
+        client: FXClient,
+        directory: str = HISTORY_DIR,
+        checkpoint: Checkpoint | None = None,
+        concurrency: int = BACKFILL_CONCURRENCY,
+        rate: float = BACKFILL_RATE_PER_SECOND,
+        chunk_days: int = BACKFILL_CHUNK_DAYS,
+        retries: int = BACKFILL_RETRIES,
+        backoff: float = BACKFILL_BACKOFF_SECONDS,
+    ):
+        """
+        Initialize backfill.
+
+        Args:
+            client: FX client for upstream requests
+            directory: History directory to write
+            checkpoint: Progress store (default: .checkpoint.json in directory)
+            concurrency: Requests in flight at once
+            rate: Requests started per second
+            chunk_days: Days per request
+            retries: Retries per chunk after the first attempt
+            backoff: Seconds before the first retry, doubling each time
+        """
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        self.client = client
+        self.directory = directory
+        if checkpoint is None:
+            checkpoint = Checkpoint(HistoryProvider.coverage_path(directory))
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate, burst=max(1, concurrency))
+        self.chunk_days = chunk_days
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self.fetched = 0
+        self.failed = 0
+        self.points = 0
+        self._total = 0
+        self._started = time.perf_counter()
+        # Per pair: chunks still outstanding, and fetched (span, series) parts
+        self._outstanding: dict[tuple[str, str], int] = {}
+        self._parts: dict[
+            tuple[str, str], list[tuple[tuple[str, str], RateSeries]]
+        ] = {}
+        self._write_lock = asyncio.Lock()
+
+    async def _throttle(self) -> None:
+        """Wait for a token."""
+        while (wait := self.bucket.take()) is not None:
+            await asyncio.sleep(wait)
+
+    async def _chunk(
+        self,
+        slots: asyncio.Semaphore,
+        base: str,
+        quotes: list[str],
+        start: str,
+        end: str,
+    ) -> None:
+        """Fetch one chunk, then write any pair it completes."""
+        matrix = None
+        async with slots:
+            for attempt in range(self.retries + 1):
+                await self._throttle()
+                self.requests += 1
+                try:
+                    matrix, _ = await self.client.fetch_matrix(start, end, base, quotes)
+                    break
+                except ServiceUnavailableError:
+                    if attempt == self.retries:
+                        self.failed += 1
+                        logger.warning(
+                            "Giving up on %s/%s %s..%s",
+                            base,
+                            ",".join(quotes),
+                            start,
+                            end,
+                        )
+                        break
+                    await asyncio.sleep(self.backoff * 2**attempt)
+
+        if matrix is not None:
+            for quote in quotes:
+                self._parts[(base, quote)].append(((start, end), matrix[quote]))
+                self.points += len(matrix[quote])
+            self.fetched += 1
+            elapsed = time.perf_counter() - self._started
+            logger.info(
+                "%s/%s chunks, %s points, %.0f points/s",
+                self.fetched + self.failed,
+                self._total,
+                self.points,
+                self.points / elapsed if elapsed else 0,
+            )
+
+        for quote in quotes:
+            pair = (base, quote)
+            self._outstanding[pair] -= 1
+            if not self._outstanding[pair] and self._parts[pair]:
+                async with self._write_lock:
+                    await asyncio.to_thread(
+                        self._write_pair, base, quote, self._parts.pop(pair)
+                    )
+
+    def _write_pair(
+        self, base: str, quote: str, parts: list[tuple[tuple[str, str], RateSeries]]
+    ) -> None:
+        """
+        Merge a pair's fetched chunks into its dataset and checkpoint them.
+
+        Runs in a worker thread; the dataset is read and written once.
+
+        Args:
+            base: Base currency
+            quote: Quote currency
+            parts: ((start, end), series) of each fetched chunk
+        """
+        # Chunks never overlap, so ordering them by start orders every point
+        parts = sorted(parts, key=lambda part: part[0][0])
+        ordinals, rates = array("l"), array("d")
+        for _, series in parts:
+            ordinals.extend(series.ordinals)
+            rates.extend(series.rates)
+        merge_into_history(self.directory, base, quote, RateSeries(ordinals, rates))
+        # Today's fixing may not be published yet, so today never counts as covered
+        yesterday = format_date_ordinal(date.today().toordinal() - 1)
+        self.checkpoint.mark(
+            base,
+            quote,
+            [
+                (start, min(end, yesterday))
+                for (start, end), _ in parts
+                if start <= yesterday
+            ],
+        )
+
+    async def run(self, pairs: list[tuple[str, str]], start: str, end: str) -> dict:
+        """
+        Backfill pairs over a date span.
+
+        Args:
+            pairs: (base, quote) pairs
+            start: First date (YYYY-MM-DD)
+            end: Last date (YYYY-MM-DD)
+
+        Returns:
+            Report with chunk counts, pair-days already covered by earlier
+            runs, points written and throughput
+        """
+        span_days = parse_date_ordinal(end) - parse_date_ordinal(start) + 1
+        quotes_by_chunk: dict[tuple[str, str, str], list[str]] = {}
+        already_covered = 0
+        for base, quote in pairs:
+            gaps = self.checkpoint.missing(base, quote, start, end)
+            already_covered += span_days - sum(
+                parse_date_ordinal(hi) - parse_date_ordinal(lo) + 1 for lo, hi in gaps
+            )
+            for gap_start, gap_end in gaps:
+                for chunk_start, chunk_end in chunk_span(
+                    gap_start, gap_end, self.chunk_days
+                ):
+                    quotes_by_chunk.setdefault(
+                        (chunk_start, chunk_end, base), []
+                    ).append(quote)
+
+        jobs = [
+            (base, quotes, chunk_start, chunk_end)
+            for (chunk_start, chunk_end, base), quotes in sorted(
+                quotes_by_chunk.items()
+            )
+        ]
+        for base, quotes, _, _ in jobs:
+            for quote in quotes:
+                self._outstanding[(base, quote)] = (
+                    self._outstanding.get((base, quote), 0) + 1
+                )
+                self._parts.setdefault((base, quote), [])
+
+        slots = asyncio.Semaphore(self.concurrency)
+        self._total = len(jobs)
+        self._started = time.perf_counter()
+        await asyncio.gather(*(self._chunk(slots, *job) for job in jobs))
+        elapsed = time.perf_counter() - self._started
+
+        return {
+            "chunks": len(jobs),
+            "already_covered": already_covered,
+            "fetched": self.fetched,
+            "failed": self.failed,
+            "requests": self.requests,
+            "points": self.points,
+            "elapsed_seconds": round(elapsed, 3),
+            "points_per_second": round(self.points / elapsed, 1)
+            if elapsed > 0
+            else None,
+        }
+
+
+async def _run(args: argparse.Namespace) -> dict:
+    """Run a backfill with upstream providers only."""
+    async with httpx.AsyncClient() as http_client:
+        routed = [p for p in default_providers(http_client) if not p.fallback]
+        backfill = Backfill(
+            FXClient(http_client, providers=routed),
+            directory=args.out,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            chunk_days=args.chunk_days,
+        )
+        return await backfill.run(args.pairs, args.start, args.end)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point: python -m app.backfill."""
+    parser = argparse.ArgumentParser(
+        description="Backfill historical rates into the history store"
+    )
+    parser.add_argument(
+        "pairs",
+        type=lambda v: parse_pairs(v, BACKFILL_MAX_PAIRS),
+        help="e.g. EUR/USD,EUR/GBP",
+    )
+    parser.add_argument("--start", required=True, help="First date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--end", default=date.today().isoformat(), help="Last date (default: today)"
+    )
+    parser.add_argument("--out", default=HISTORY_DIR, help="History directory")
+    parser.add_argument("--chunk-days", type=int, default=BACKFILL_CHUNK_DAYS)
+    parser.add_argument("--concurrency", type=int, default=BACKFILL_CONCURRENCY)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=BACKFILL_RATE_PER_SECOND,
+        help="Requests per second",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(_run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
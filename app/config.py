@@ -1,7 +1,86 @@
 """Configuration constants for the FX Summary Service."""
 
+import os
+
 FRANKFURTER_BASE_URL = "https://api.frankfurter.dev"
 CACHE_TTL_SECONDS = 60
 SERVER_PORT = 8000
 LOCAL_FALLBACK_PATH = "data/sample_fx.json"
 REQUEST_TIMEOUT = 10
+CONVERT_BATCH_SIZE = 5000
+CONVERT_LOOKBACK_DAYS = 7
+CONVERT_GAP_POLICY = "previous"
+CONVERT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+CONVERT_RETRY_BACKOFF_SECONDS = 1.0
+CONVERT_RETRY_MAX_BACKOFF_SECONDS = 30.0
+REFRESH_ENABLED = True
+REFRESH_INTERVAL_SECONDS = 10
+REFRESH_TOP_N = 20
+REFRESH_CONCURRENCY = 2
+REFRESH_JITTER_SECONDS = 2.0
+REFRESH_AHEAD_FRACTION = 0.8
+PUBLICATION_TIME_UTC = "14:30"
+UPSTREAM_MAX_CONCURRENCY = 8
+UPSTREAM_MAX_QUEUE = 16
+UPSTREAM_QUEUE_DEADLINE_SECONDS = 2.0
+CLIENT_RATE_PER_SECOND = 20
+CLIENT_BURST = 40
+CLIENT_MAX_TRACKED = 10000
+COMPUTE_POOL_WORKERS = 4
+COMPUTE_POOL_MAX_PENDING = 32
+COMPUTE_OFFLOAD_MIN_POINTS = 2000
+LIVE_POLL_INTERVAL_SECONDS = 5
+LIVE_SUBSCRIBER_BUFFER = 16
+LIVE_KEEPALIVE_SECONDS = 15
+LIVE_MAX_PAIRS = 20
+LIVE_MAX_POLLERS = 50
+LIVE_MAX_SUBSCRIPTIONS = 1000
+NEGATIVE_CACHE_TTL_SECONDS = 300
+# Budgeted size of a negative-cache entry (key, sentinel and bookkeeping)
+NEGATIVE_CACHE_ENTRY_BYTES = 256
+DISTRIBUTION_BINS = 20
+DISTRIBUTION_EXACT_MAX_POINTS = 2000
+DISTRIBUTION_SKETCH_ACCURACY = 0.001
+COMPARE_MAX_QUOTES = 10
+RATE_MIRRORS: dict[str, str] = {}
+PROVIDER_EWMA_ALPHA = 0.2
+PROVIDER_ERROR_THRESHOLD = 0.5
+PROVIDER_COOLDOWN_SECONDS = 30
+PROVIDER_MIN_TIMEOUT_SECONDS = 1.0
+PROVIDER_TIMEOUT_FACTOR = 4.0
+SERVER_GRACEFUL_TIMEOUT_SECONDS = 30
+SERVER_MAX_DEFAULT_WORKERS = 4
+STARTUP_BUDGET_SECONDS = 3.0
+STARTUP_CONNECT_TIMEOUT_SECONDS = 1.0
+DIAGNOSTICS_ENABLED = True
+LOOP_LAG_INTERVAL_SECONDS = 0.1
+LOOP_LAG_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+SLOW_CALLBACK_SECONDS = 0.1
+SLOW_CALLBACK_HISTORY = 20
+TRACEMALLOC_FRAMES = 10
+TRACE_SAMPLE_RATE = 0.01
+TRACE_EXPORTER = "none"
+TRACE_JSONL_PATH = "traces.jsonl"
+TRACE_OTLP_ENDPOINT = "http://localhost:4318/v1/traces"
+TRACE_BATCH_SIZE = 512
+TRACE_FLUSH_INTERVAL_SECONDS = 1.0
+TRACE_MAX_QUEUED_SPANS = 10000
+CAPTURE_ENABLED = False
+CAPTURE_PATH = "capture-{pid}.jsonl.gz"
+CAPTURE_FLUSH_INTERVAL_SECONDS = 1.0
+CAPTURE_MAX_BUFFERED = 100000
+SERIES_BLOCK_SIZE = 256
+SERIES_MAX_DECIMALS = 8
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+HISTORY_DIR = "data/history"
+BACKFILL_CHUNK_DAYS = 365
+BACKFILL_CONCURRENCY = 4
+BACKFILL_RATE_PER_SECOND = 5
+BACKFILL_RETRIES = 3
+BACKFILL_BACKOFF_SECONDS = 1.0
+BACKFILL_MAX_PAIRS = 200
+# Admin endpoints are disabled unless a token is provided
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN") or None
+ADMIN_WARM_CONCURRENCY = 4
+ADMIN_WARM_MAX_CONCURRENCY = 16
+ADMIN_WARM_MAX_QUERIES = 1000
@@ -1,32 +1,217 @@
 """FastAPI application for FX Summary Service."""
 
-from contextlib import asynccontextmanager
-from typing import Annotated
+import time
+
+# Taken before the framework imports so the startup budget covers them
+_imported_at = time.perf_counter()
+
+import asyncio
+import secrets
+from contextlib import AsyncExitStack, asynccontextmanager
+from datetime import date
+from typing import Annotated, Any
 
 import httpx
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic_core import to_json
 
-from app.config import CACHE_TTL_SECONDS, SERVER_PORT
-from app.models import SummaryQueryParams, SummaryResponse, MetaInfo
+from app.config import (
+    ADMIN_TOKEN,
+    CACHE_MAX_BYTES,
+    CACHE_TTL_SECONDS,
+    CAPTURE_ENABLED,
+    CONVERT_GAP_POLICY,
+    DIAGNOSTICS_ENABLED,
+    LIVE_MAX_PAIRS,
+    NEGATIVE_CACHE_ENTRY_BYTES,
+    NEGATIVE_CACHE_TTL_SECONDS,
+    REFRESH_ENABLED,
+    SERVER_PORT,
+    STARTUP_CONNECT_TIMEOUT_SECONDS,
+    TRACE_SAMPLE_RATE,
+)
+from app.models import (
+    SUMMARY_FIELDS,
+    CompareMeta,
+    CompareQueryParams,
+    CompareResponse,
+    ConvertQueryParams,
+    FrankfurterResponse,
+    MetaInfo,
+    SummaryQueryParams,
+    SummaryResponse,
+    WarmRequest,
+)
+from app.services.admission import (
+    ClientRateLimiter,
+    OverloadedError,
+    SingleFlight,
+    UpstreamLimiter,
+)
+from app.services.analytics import RollingAnalytics
 from app.services.cache import InMemoryCache
+from app.services.calculator import ENDPOINT_FIELDS, PERIOD_BREAKDOWNS, Calculator
+from app.services.capture import TrafficRecorder
+from app.services.compute_pool import ComputePool
+from app.services.diagnostics import (
+    LoopLagMonitor,
+    MemoryProfiler,
+    cache_memory_by_pair,
+    deep_sizeof,
+)
+from app.services.distribution import DistributionStats, SketchStore
 from app.services.fx_client import FXClient, ServiceUnavailableError
-from app.services.calculator import Calculator
-
+from app.services.live_rates import LiveRateHub, parse_pairs
+from app.services.providers import (
+    HistoryProvider,
+    HTTPProvider,
+    LocalFileProvider,
+    ProviderRouter,
+    default_providers,
+)
+from app.services.rate_series import RateSeries
+from app.services.refresher import RefreshScheduler
+from app.services.series_codec import EncodedSeries
+from app.services.startup import StartupTracker
+from app.services.tracing import (
+    SpanProcessor,
+    Tracer,
+    TracingMiddleware,
+    build_exporter,
+    start_span,
+)
+from app.services.trading_calendar import TradingCalendar
+from app.utils.validators import (
+    decode_cursor,
+    encode_cursor,
+    format_date_ordinal,
+    parse_date_ordinal,
+)
 
 # Global cache instance
-cache = InMemoryCache(ttl_seconds=CACHE_TTL_SECONDS)
+cache = InMemoryCache(ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES)
+
+# Cached marker for ranges known to have no data
+NO_DATA = object()
+
+# Publication calendar for answering no-data ranges locally
+calendar = TradingCalendar()
 
 # Global HTTP client
 http_client: httpx.AsyncClient = None
 
 
+async def _refresh(query: tuple[str, str, str, str]) -> None:
+    """Refetch a hot query in the background, sharing the fetch with concurrent misses."""
+    await coalescer.do(InMemoryCache.make_key(*query), lambda: _fill_cache(query))
+
+
+# Provider latency and error stats shared by all requests
+provider_router = ProviderRouter()
+
+# Configured providers, built once per HTTP client
+_providers: tuple[httpx.AsyncClient, list] | None = None
+
+
+def _fx_client() -> FXClient:
+    """Return an FX client over the shared providers and router."""
+    global _providers
+    if _providers is None or _providers[0] is not http_client:
+        _providers = (http_client, default_providers(http_client))
+    return FXClient(http_client, provider_router, _providers[1])
+
+# Admission control for upstream-bound requests
+rate_limiter = ClientRateLimiter()
+upstream_limiter = UpstreamLimiter()
+coalescer = SingleFlight()
+
+# Per-year quantile sketches for long distribution queries
+sketches = SketchStore()
+
+# Worker pool for large renders
+compute_pool = ComputePool()
+
+async def _fetch_latest(pair: tuple[str, str]) -> tuple[str, float]:
+    """Poll a pair's latest rate under upstream admission control."""
+    async with upstream_limiter.slot():
+        return await _fx_client().fetch_latest(*pair)
+
+
+# Shared latest-rate pollers for live subscriptions
+live_hub = LiveRateHub(_fetch_latest)
+
+# Background refresher for hot queries
+refresher = RefreshScheduler(cache, lambda query: InMemoryCache.make_key(*query), _refresh)
+
+
+# Event-loop lag and memory diagnostics
+loop_monitor = LoopLagMonitor()
+memory_profiler = MemoryProfiler()
+
+# Sampled request tracing, off unless an exporter is configured
+_trace_exporter = build_exporter()
+tracer = Tracer(SpanProcessor(_trace_exporter), TRACE_SAMPLE_RATE if _trace_exporter is not None else 0.0)
+
+# Opt-in capture of /summary traffic for replay
+recorder = TrafficRecorder()
+
+# Readiness and startup timings
+startup = StartupTracker(_imported_at)
+
+
+async def _warm_upstream() -> None:
+    """Open connections to every HTTP provider concurrently."""
+    providers = [p for p in default_providers(http_client) if isinstance(p, HTTPProvider)]
+    await asyncio.gather(
+        *(p.warm(STARTUP_CONNECT_TIMEOUT_SECONDS) for p in providers),
+        return_exceptions=True
+    )
+
+
+async def _warm_fallback_data() -> None:
+    """Parse the local datasets unless the pre-fork master already did."""
+    if not LocalFileProvider.is_preloaded():
+        await asyncio.to_thread(LocalFileProvider.preload)
+        await asyncio.to_thread(HistoryProvider.preload_all)
+
+
+def _warm_render() -> None:
+    """Exercise parsing, summary and serialization once so first-call setup is paid now."""
+    sample = {"2025-07-01": 1.07, "2025-07-02": 1.08}
+    FrankfurterResponse(amount=1.0, base="EUR", start_date="2025-07-01", end_date="2025-07-02",
+                        rates={d: {"USD": r} for d, r in sample.items()})
+    entry = _build_entry(("EUR", "USD", "2025-07-01", "2025-07-02"), RateSeries.from_mapping(sample), "local_file")
+    params = SummaryQueryParams(start="2025-07-01", end="2025-07-02", breakdown="day")
+    _render_json(entry, params, "MISS")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan."""
     global http_client
     http_client = httpx.AsyncClient()
+    # Warm up in the background: liveness is immediate, readiness follows
+    warmup = asyncio.create_task(startup.run({
+        "upstream": _warm_upstream,
+        "fallback_data": _warm_fallback_data,
+        "render": lambda: asyncio.to_thread(_warm_render),
+    }))
+    if REFRESH_ENABLED:
+        refresher.start()
+    if DIAGNOSTICS_ENABLED:
+        loop_monitor.start()
+    tracer.processor.start()
+    if CAPTURE_ENABLED:
+        await asyncio.to_thread(recorder.start)
     yield
+    warmup.cancel()
+    await loop_monitor.stop()
+    await asyncio.to_thread(tracer.processor.shutdown)
+    await asyncio.to_thread(recorder.stop)
+    await refresher.stop()
+    await live_hub.close()
+    compute_pool.shutdown()
     await http_client.aclose()
 
 
@@ -36,6 +221,7 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan
 )
+app.add_middleware(TracingMiddleware, tracer=tracer)
 
 
 @app.get("/health")
@@ -44,13 +230,227 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness check: 503 until startup warm-up has finished."""
+    return JSONResponse(status_code=200 if startup.ready else 503, content=startup.report())
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters for admission control and background work."""
+    return {
+        "cache": cache.stats(),
+        "upstream": upstream_limiter.stats(),
+        "rate_limited": rate_limiter.limited,
+        "refresher": {"refreshed": refresher.refreshed, "failed": refresher.failed},
+        "compute": compute_pool.stats(),
+        "providers": provider_router.stats(),
+        "tracing": tracer.processor.stats(),
+        "capture": recorder.stats(),
+    }
+
+
+def _require_admin(x_admin_token: Annotated[str | None, Header()] = None) -> None:
+    """
+    Check the X-Admin-Token header against ADMIN_TOKEN.
+
+    Admin endpoints fail closed: without a configured token they are off.
+
+    Raises:
+        HTTPException: 403 if no token is configured or the header does not match
+    """
+    if ADMIN_TOKEN is None or not secrets.compare_digest((x_admin_token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail={
+            "error": "Forbidden",
+            "message": "Admin endpoints require the X-Admin-Token header matching ADMIN_TOKEN"
+        })
+
+
+@app.get("/diagnostics", dependencies=[Depends(_require_admin)])
+async def diagnostics():
+    """Event-loop lag histogram, recent slow callbacks and cache memory by pair."""
+    # Sizing walks every cached object, so it runs off the event loop
+    by_pair = await asyncio.to_thread(cache_memory_by_pair, cache)
+    return {
+        "loop": loop_monitor.stats(),
+        "cache": by_pair,
+        "tracemalloc": memory_profiler.tracing,
+    }
+
+
+@app.post("/diagnostics/memory/snapshot", dependencies=[Depends(_require_admin)])
+async def memory_snapshot():
+    """Start tracemalloc if needed and take a baseline snapshot."""
+    return await asyncio.to_thread(memory_profiler.snapshot)
+
+
+@app.get("/diagnostics/memory/diff", dependencies=[Depends(_require_admin)])
+async def memory_diff(
+    limit: Annotated[int, Query(ge=1, le=200, description="Top differences to return")] = 20
+):
+    """
+    Compare current allocations with the baseline snapshot.
+
+    Raises:
+        HTTPException: 403 for a missing admin token, 409 if no snapshot was taken
+    """
+    try:
+        return await asyncio.to_thread(memory_profiler.diff, limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail={
+            "error": "NoSnapshot",
+            "message": str(e)
+        })
+
+
+@app.post("/diagnostics/memory/stop", dependencies=[Depends(_require_admin)])
+async def memory_stop():
+    """Stop tracemalloc."""
+    return await asyncio.to_thread(memory_profiler.stop)
+
+
+@app.get("/admin/cache", dependencies=[Depends(_require_admin)])
+async def admin_cache():
+    """Cache totals and live entries, bytes and covered dates by pair."""
+    return {
+        "cache": cache.stats(),
+        "pairs": {
+            pair: {**usage, "first": format_date_ordinal(usage["first"]), "last": format_date_ordinal(usage["last"])}
+            for pair, usage in sorted(cache.occupancy().items())
+        },
+    }
+
+
+def _reload_local_data() -> None:
+    """Re-read the bundled and backfilled datasets from disk."""
+    LocalFileProvider.unload()
+    LocalFileProvider.preload()
+    HistoryProvider.preload_all()
+
+
+@app.post("/admin/cache/invalidate", dependencies=[Depends(_require_admin)])
+async def admin_invalidate(
+    pairs: Annotated[str, Query(description="Comma-separated pairs, e.g. EUR/USD,EUR/GBP")],
+    start: Annotated[str | None, Query(description="First affected date (default: unbounded)")] = None,
+    end: Annotated[str | None, Query(description="Last affected date (default: unbounded)")] = None,
+    reload: Annotated[bool, Query(description="Re-read local datasets before invalidating")] = False
+):
+    """
+    Drop cached summaries and comparisons that overlap corrected data.
+
+    Only entries of the given pairs whose date range overlaps start..end
+    are dropped, along with the pairs' distribution sketches for the
+    affected years; everything else stays warm. Hot queries among the
+    dropped entries are refetched by the background refresher.
+
+    Args:
+        pairs: Currency pairs whose data changed
+        start: First affected date in YYYY-MM-DD format
+        end: Last affected date in YYYY-MM-DD format
+        reload: Re-read local datasets first, e.g. after a fallback update
+
+    Returns:
+        Number and keys of dropped entries
+
+    Raises:
+        HTTPException: 400 for invalid parameters, 403 for a missing admin token
+    """
+    try:
+        parsed = parse_pairs(pairs, LIVE_MAX_PAIRS)
+        first = None if start is None else parse_date_ordinal(start)
+        last = None if end is None else parse_date_ordinal(end)
+        if first is not None and last is not None and first > last:
+            raise ValueError("start date must be before or equal to end date")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={
+            "error": "ValidationError",
+            "message": str(e)
+        })
+
+    # Reload before dropping so refills cannot read the old data
+    if reload:
+        await asyncio.to_thread(_reload_local_data)
+
+    first_year = None if first is None else date.fromordinal(first).year
+    last_year = None if last is None else date.fromordinal(last).year
+    keys = []
+    for base, quote in parsed:
+        keys.extend(cache.invalidate(f"{base}/{quote}", first, last))
+    affected = set(parsed)
+    sketches.discard(lambda key, year: (
+        key[:2] in affected
+        and (first_year is None or year >= first_year)
+        and (last_year is None or year <= last_year)
+    ))
+    return {"invalidated": len(keys), "keys": keys}
+
+
+@app.post("/admin/cache/warm", dependencies=[Depends(_require_admin)])
+async def admin_warm(body: WarmRequest):
+    """
+    Load summary queries into the cache ahead of traffic.
+
+    Queries are canonicalized and filled through the same coalescer as
+    /summary, with at most `concurrency` fills in flight; queries already
+    cached are skipped.
+
+    Args:
+        body: Queries to load and fill concurrency
+
+    Returns:
+        Counts of warmed, cached, no-data and failed queries
+
+    Raises:
+        HTTPException: 400 for an invalid query, 403 for a missing admin token
+    """
+    try:
+        for params in body.queries:
+            params.validate_date_range()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={
+            "error": "ValidationError",
+            "message": str(e)
+        })
+
+    slots = asyncio.Semaphore(body.concurrency)
+
+    async def warm(params: SummaryQueryParams) -> str:
+        query = _canonical_query(params)
+        if query is None:
+            return "no_data"
+        key = InMemoryCache.make_key(*query)
+        if cache.get(key) is not None:
+            return "cached"
+        async with slots:
+            try:
+                entry = await coalescer.do(key, lambda: _fill_cache(query))
+            except (ServiceUnavailableError, OverloadedError):
+                return "failed"
+        return "warmed" if entry is not None else "no_data"
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(warm(params) for params in body.queries))
+    report = {outcome: outcomes.count(outcome) for outcome in ("warmed", "cached", "no_data", "failed")}
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
 @app.get("/summary", response_model=SummaryResponse)
 async def summary(
+    request: Request,
     start: Annotated[str, Query(description="Start date (YYYY-MM-DD)")],
     end: Annotated[str, Query(description="End date (YYYY-MM-DD)")],
     breakdown: Annotated[str, Query(description="Breakdown type")] = "none",
     from_currency: Annotated[str, Query(alias="from", description="Source currency")] = "EUR",
-    to: Annotated[str, Query(description="Target currency")] = "USD"
+    to: Annotated[str, Query(description="Target currency")] = "USD",
+    analytics: Annotated[str | None, Query(description="Rolling analytics: sma, volatility, range, drawdown")] = None,
+    window: Annotated[str | None, Query(description="Rolling window size in data points")] = None,
+    allow_fallback: Annotated[str | None, Query(description="Serve local data when upstream is overloaded")] = None,
+    distribution: Annotated[str | None, Query(description="Include median, p5/p95 and histogram")] = None,
+    fields: Annotated[str | None, Query(description="Comma-separated sections or fields, e.g. totals.end_rate")] = None,
+    limit: Annotated[str | None, Query(description="Daily rows per page (breakdown=day)")] = None,
+    cursor: Annotated[str | None, Query(description="Cursor from a previous page's next_cursor")] = None
 ):
     """
     Get FX rate summary for date range.
@@ -58,66 +458,231 @@ async def summary(
     Args:
         start: Start date in YYYY-MM-DD format
         end: End date in YYYY-MM-DD format
-        breakdown: Either "none" or "day"
+        breakdown: One of "none", "day", "week", "month", "quarter" or "year"
         from_currency: Source currency code (default: EUR)
         to: Target currency code (default: USD)
+        analytics: Comma-separated rolling analytics to compute
+        window: Rolling window size for analytics
+        allow_fallback: Serve the local dataset if the request is shed
+        distribution: Include distribution statistics of the rates
+        fields: Sections or section.field paths to return (default: all)
+        limit: Daily rows per page; enables pagination of breakdown=day
+        cursor: Opaque cursor of the page to return
 
     Returns:
         Summary response with totals, daily breakdown (if requested), and pattern
 
     Raises:
-        HTTPException: 400 for invalid parameters, 404 for no data, 503 for service unavailable
+        HTTPException: 400 for invalid parameters, 404 for no data, 429 for client
+            rate limit, 503 for service unavailable or upstream overload
     """
+    client = request.client.host if request.client else "unknown"
+    recorder.record(client, request.query_params)
+
+    # Per-client rate limit
+    try:
+        rate_limiter.check(client)
+    except OverloadedError as e:
+        raise HTTPException(status_code=429, detail={
+            "error": "RateLimited",
+            "message": str(e)
+        }, headers={"Retry-After": str(e.retry_after)})
+
     # Validate query parameters
     try:
-        params = SummaryQueryParams(
-            start=start,
-            end=end,
-            breakdown=breakdown,
-            **{"from": from_currency},
-            to=to
-        )
-        params.validate_date_range()
+        with start_span("validate"):
+            params = SummaryQueryParams(
+                start=start,
+                end=end,
+                breakdown=breakdown,
+                **{"from": from_currency},
+                to=to,
+                analytics=analytics,
+                **({"window": window} if window is not None else {}),
+                **({"allow_fallback": allow_fallback} if allow_fallback is not None else {}),
+                **({"distribution": distribution} if distribution is not None else {}),
+                fields=fields,
+                **({"limit": limit} if limit is not None else {}),
+                cursor=cursor
+            )
+            params.validate_date_range()
+            params.validate_pagination()
     except ValueError as e:
         raise HTTPException(status_code=400, detail={
             "error": "ValidationError",
             "message": str(e)
         })
 
-    # Check cache
-    cache_key = InMemoryCache.make_key(from_currency, to, start, end)
-    cached = cache.get(cache_key)
+    no_data = HTTPException(status_code=404, detail={
+        "error": "NoDataFound",
+        "message": f"No exchange rates found for {from_currency}→{to} between {start} and {end}"
+    })
+
+    # Ranges without any publication day cannot have data
+    with start_span("cache.lookup") as span:
+        query = _canonical_query(params)
+        if query is None:
+            span.set("publication_days", False)
+            raise no_data
+
+        # Check cache
+        cache_key = InMemoryCache.make_key(*query)
+        refresher.record(query)
+        cached = cache.get(cache_key)
+        span.set("hit", cached is not None)
+    cache_status = "HIT"
+
+    if cached is NO_DATA:
+        raise no_data
+
+    if cached is None:
+        cache_status = "MISS"
+        try:
+            try:
+                with start_span("coalesce.wait"):
+                    cached = await coalescer.do(cache_key, lambda: _fill_cache(query))
+            except OverloadedError as e:
+                if not params.allow_fallback:
+                    raise HTTPException(status_code=503, detail={
+                        "error": "Overloaded",
+                        "message": str(e)
+                    }, headers={"Retry-After": str(e.retry_after)})
+                cached = _local_entry(query)
+        except ServiceUnavailableError:
+            raise HTTPException(status_code=503, detail={
+                "error": "ServiceUnavailable",
+                "message": "Both API and local fallback failed"
+            })
+
+    # Check if we have data
+    if cached is None:
+        raise no_data
 
-    if cached is not None:
-        # Return cached response with HIT status
-        result = cached.copy()
-        result["meta"]["cache"] = "HIT"
-        # Adjust daily based on breakdown parameter
-        if breakdown == "none":
-            result["daily"] = []
-        return result
-
-    # Fetch rates
-    fx_client = FXClient(http_client)
+    # Large renders run in the worker pool so the event loop stays responsive
     try:
-        rates, source = await fx_client.fetch_rates(start, end, from_currency, to)
-    except ServiceUnavailableError:
+        with start_span("render", points=len(cached["series"])):
+            body = await compute_pool.run(len(cached["series"]), _render_json, cached, params, cache_status)
+    except OverloadedError as e:
         raise HTTPException(status_code=503, detail={
-            "error": "ServiceUnavailable",
-            "message": "Both API and local fallback failed"
-        })
+            "error": "Overloaded",
+            "message": str(e)
+        }, headers={"Retry-After": str(e.retry_after)})
+    _account_memoized(cache_key, cached)
 
-    # Check if we have data
-    if not rates:
-        raise HTTPException(status_code=404, detail={
-            "error": "NoDataFound",
-            "message": f"No exchange rates found for {from_currency}→{to} between {start} and {end}"
-        })
+    return Response(content=body, media_type="application/json")
+
+
+def _canonical_query(params: SummaryQueryParams) -> tuple[str, str, str, str] | None:
+    """
+    Build the query that equivalent requests share a cache entry under.
+
+    Dates are narrowed to the first and last publication days the range
+    covers and currency codes are uppercased, so e.g. a range starting on a
+    Saturday maps to the same entry as one starting on the next Monday.
+
+    Args:
+        params: Validated query parameters
+
+    Returns:
+        Tuple of (from_currency, to, start, end), or None if the range
+        contains no publication day
+    """
+    effective = calendar.effective_range(parse_date_ordinal(params.start), parse_date_ordinal(params.end))
+    if effective is None:
+        return None
+    first, last = effective
+    return (
+        params.from_currency.strip().upper(),
+        params.to.strip().upper(),
+        format_date_ordinal(first),
+        format_date_ordinal(last)
+    )
+
+
+def _spans(base: str, quotes: list[str], start: str, end: str) -> list[tuple[str, int, int]]:
+    """Index spans of an entry covering quotes against base from start to end."""
+    first, last = parse_date_ordinal(start), parse_date_ordinal(end)
+    return [(f"{base}/{quote}", first, last) for quote in quotes]
+
+
+async def _fill_cache(query: tuple[str, str, str, str]) -> dict | None:
+    """
+    Fetch rates for a query, compute the summary and store it in cache.
+
+    Used by cache misses and by the background refresher.
+
+    Args:
+        query: Tuple of (from_currency, to, start, end)
+
+    Returns:
+        Cache entry, or None if the range has no data
+
+    Raises:
+        ServiceUnavailableError: If both API and fallback fail
+        OverloadedError: If upstream capacity is exhausted
+    """
+    from_currency, to, start, end = query
+    fx_client = _fx_client()
+    with start_span("fetch") as span:
+        async with upstream_limiter.slot():
+            rates, source = await fx_client.fetch_rates(start, end, from_currency, to)
+        span.set("source", source)
+        span.set("points", len(rates))
+    entry = _build_entry(query, rates, source)
+    spans = _spans(from_currency, [to], start, end)
+    if entry is None:
+        # Remember empty ranges so repeated requests do not go upstream
+        cache.set(
+            InMemoryCache.make_key(*query), NO_DATA, ttl_seconds=NEGATIVE_CACHE_TTL_SECONDS,
+            nbytes=NEGATIVE_CACHE_ENTRY_BYTES, spans=spans
+        )
+    else:
+        cache.set(InMemoryCache.make_key(*query), entry, nbytes=deep_sizeof(entry), spans=spans)
+    return entry
+
+
+def _local_entry(query: tuple[str, str, str, str]) -> dict | None:
+    """
+    Build an uncached entry from the local dataset for a shed request.
+
+    Args:
+        query: Tuple of (from_currency, to, start, end)
+
+    Returns:
+        Entry, or None if the range has no local data
+
+    Raises:
+        ServiceUnavailableError: If the local dataset cannot serve the pair
+    """
+    from_currency, to, start, end = query
+    try:
+        with start_span("fallback.read", reason="overloaded"):
+            rates = _fx_client().fetch_local_rates(start, end, from_currency, to)
+    except Exception as e:
+        raise ServiceUnavailableError("Local fallback failed") from e
+    return _build_entry(query, rates, "local_file")
 
-    # Compute summary
-    totals, daily, pattern = Calculator.compute_summary(rates, breakdown)
 
-    # Build response
+def _build_entry(query: tuple[str, str, str, str], rates: RateSeries, source: str) -> dict | None:
+    """
+    Compute the cacheable summary entry for fetched rates.
+
+    The entry keeps the rate series compressed rather than serialized
+    sections; totals, pattern, daily, period and analytics sections are
+    derived from it on demand, decoding only the blocks they need.
+
+    Args:
+        query: Tuple of (from_currency, to, start, end)
+        rates: Sorted rate series
+        source: Data source of the rates
+
+    Returns:
+        Entry with meta and encoded series, or None if rates is empty
+    """
+    from_currency, to, start, end = query
+    if not rates:
+        return None
+
     meta = MetaInfo(
         cache="MISS",
         source=source,
@@ -125,25 +690,461 @@ async def summary(
         quote=to,
         start=start,
         end=end,
-        breakdown=breakdown
+        breakdown="none"
     )
 
-    response = SummaryResponse(
-        meta=meta,
-        totals=totals,
-        daily=daily,
-        pattern=pattern
+    return {
+        "meta": meta.model_dump(),
+        "series": EncodedSeries.encode(rates),
+        "sections": {},
+        "rollups": {},
+        # Sizes of memoized sections and rollups not yet charged to the cache
+        "memoized_bytes": []
+    }
+
+
+def _render(cached: dict, params: SummaryQueryParams, cache_status: str) -> dict:
+    """
+    Build the response for a request from a cache entry.
+
+    Only the sections selected by params.fields are computed.
+
+    Args:
+        cached: Cache entry holding the encoded series
+        params: Validated query parameters
+        cache_status: "HIT" or "MISS"
+
+    Returns:
+        Response data shaped for the requested breakdown, analytics and fields
+    """
+    selection = params.field_selection()
+    result = {
+        "meta": {
+            **cached["meta"],
+            "cache": cache_status,
+            "breakdown": params.breakdown,
+            # Entries are shared between equivalent queries; echo this request
+            "base": params.from_currency,
+            "quote": params.to,
+            "start": params.start,
+            "end": params.end
+        }
+    }
+    for section in SUMMARY_FIELDS if selection is None else selection:
+        if section == "meta":
+            continue
+        if params.cursor is not None and section in ("totals", "pattern"):
+            # Only the first page carries range-wide sections
+            result[section] = None
+            continue
+        names = None if selection is None else selection[section]
+        result[section] = _render_section(cached, params, section, names)
+    if params.paginated():
+        result["next_cursor"] = _page(cached["series"], params)[2]
+    return result
+
+
+def _page(series: EncodedSeries, params: SummaryQueryParams) -> tuple[int, int, str | None]:
+    """
+    Locate the daily page selected by limit and cursor, decoding at most two blocks.
+
+    Args:
+        series: Cached encoded series
+        params: Validated query parameters
+
+    Returns:
+        Tuple of (first index, index past the last, next cursor or None)
+    """
+    lo = 0 if params.cursor is None else series.position(decode_cursor(params.cursor))
+    hi = len(series) if params.limit is None else min(lo + params.limit, len(series))
+    next_cursor = encode_cursor(series.ordinal(hi)) if hi < len(series) else None
+    return lo, hi, next_cursor
+
+
+def _render_section(
+    cached: dict,
+    params: SummaryQueryParams,
+    section: str,
+    names: list[str] | None
+):
+    """
+    Compute one response section from a cache entry.
+
+    Full totals and pattern sections are kept on the entry once computed.
+    When only some of their fields are requested and the section is not
+    cached yet, just those fields are computed.
+
+    Args:
+        cached: Cache entry holding the encoded series
+        params: Validated query parameters
+        section: Section name
+        names: Requested fields of the section, or None for all
+
+    Returns:
+        Section data
+    """
+    series = cached["series"]
+    if section in ("totals", "pattern"):
+        sections = cached["sections"]
+        if section not in sections:
+            if names is not None:
+                points = series.endpoints() if ENDPOINT_FIELDS.issuperset(names) else series.decode()
+                return Calculator.compute_fields(points, section, names)
+            _memoize(cached, "sections", section,
+                     Calculator.compute_fields(series.decode(), section, SUMMARY_FIELDS[section]))
+        full = sections[section]
+        return full if names is None else {name: full[name] for name in names}
+    if section == "daily":
+        if params.breakdown != "day":
+            return []
+        lo, hi, _ = _page(series, params)
+        # Decode one point before the page for the first row's change
+        first = max(lo - 1, 0)
+        return Calculator._compute_daily(series.decode(first, hi), lo - first)
+    if section == "periods":
+        return _cached_periods(cached, params.breakdown)
+    if section == "distribution":
+        if not params.distribution:
+            return None
+        meta = cached["meta"]
+        return DistributionStats.compute(series.decode(), sketches, (meta["base"], meta["quote"], meta["source"]))
+    if params.analytics:
+        return RollingAnalytics.compute(series.decode(), params.analytics_kinds(), params.window)
+    return None
+
+
+def _render_json(cached: dict, params: SummaryQueryParams, cache_status: str) -> bytes:
+    """
+    Render and serialize the response for a request.
+
+    Args:
+        cached: Cache entry holding the encoded series
+        params: Validated query parameters
+        cache_status: "HIT" or "MISS"
+
+    Returns:
+        JSON-encoded SummaryResponse, or only the selected fields of it
+    """
+    with start_span("compute"):
+        result = _render(cached, params, cache_status)
+    with start_span("serialize"):
+        if params.fields:
+            return to_json(result)
+        return SummaryResponse(**result).model_dump_json().encode()
+
+
+@app.get("/compare", response_model=CompareResponse)
+async def compare(
+    request: Request,
+    start: Annotated[str, Query(description="Start date (YYYY-MM-DD)")],
+    end: Annotated[str, Query(description="End date (YYYY-MM-DD)")],
+    quotes: Annotated[str, Query(description="Comma-separated quote currencies, e.g. USD,GBP,JPY")],
+    base: Annotated[str, Query(description="Base currency")] = "EUR"
+):
+    """
+    Compare several quote currencies against one base.
+
+    All quotes are fetched in one upstream request and joined on date;
+    change, volatility and pairwise correlation of daily returns are
+    computed from the aligned matrix in one pass.
+
+    Args:
+        start: Start date in YYYY-MM-DD format
+        end: End date in YYYY-MM-DD format
+        quotes: Quote currency codes
+        base: Base currency code (default: EUR)
+
+    Returns:
+        Per-quote statistics and correlation matrix
+
+    Raises:
+        HTTPException: 400 for invalid parameters, 404 for no data, 429 for client
+            rate limit, 503 for service unavailable or upstream overload
+    """
+    try:
+        rate_limiter.check(request.client.host if request.client else "unknown")
+    except OverloadedError as e:
+        raise HTTPException(status_code=429, detail={
+            "error": "RateLimited",
+            "message": str(e)
+        }, headers={"Retry-After": str(e.retry_after)})
+
+    try:
+        params = CompareQueryParams(start=start, end=end, base=base, quotes=quotes)
+        params.validate_request()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={
+            "error": "ValidationError",
+            "message": str(e)
+        })
+
+    no_data = HTTPException(status_code=404, detail={
+        "error": "NoDataFound",
+        "message": f"No exchange rates found for {params.base}→{params.quotes} between {start} and {end}"
+    })
+
+    effective = calendar.effective_range(parse_date_ordinal(start), parse_date_ordinal(end))
+    if effective is None:
+        raise no_data
+
+    # One entry per quote set, independent of quote order
+    query = (params.base, sorted(params.quote_list()), *map(format_date_ordinal, effective))
+    cache_key = "compare_" + InMemoryCache.make_key(params.base, ",".join(query[1]), query[2], query[3])
+    cached = cache.get(cache_key)
+    cache_status = "HIT"
+
+    if cached is NO_DATA:
+        raise no_data
+
+    if cached is None:
+        cache_status = "MISS"
+        try:
+            cached = await coalescer.do(cache_key, lambda: _fill_comparison(cache_key, query))
+        except OverloadedError as e:
+            raise HTTPException(status_code=503, detail={
+                "error": "Overloaded",
+                "message": str(e)
+            }, headers={"Retry-After": str(e.retry_after)})
+        except ServiceUnavailableError:
+            raise HTTPException(status_code=503, detail={
+                "error": "ServiceUnavailable",
+                "message": "Both API and local fallback failed"
+            })
+
+    if cached is None:
+        raise no_data
+
+    return CompareResponse(
+        meta=CompareMeta(
+            cache=cache_status,
+            source=cached["source"],
+            base=params.base,
+            quotes=params.quote_list(),
+            start=start,
+            end=end,
+            points=cached["points"]
+        ),
+        pairs=[cached["pairs"][quote] for quote in params.quote_list()],
+        correlation={
+            a: {b: cached["correlation"][a][b] for b in params.quote_list()}
+            for a in params.quote_list()
+        }
     )
 
-    # Cache the response (always with full daily breakdown for reuse)
-    cache_data = response.model_dump()
-    cache.set(cache_key, cache_data)
 
-    # Adjust daily based on breakdown parameter for this response
-    if breakdown == "none":
-        response.daily = []
+async def _fill_comparison(cache_key: str, query: tuple) -> dict | None:
+    """
+    Fetch all quotes of a comparison in one request and store the result.
+
+    Args:
+        cache_key: Cache key of the comparison
+        query: Tuple of (base, quotes, start, end)
 
-    return response
+    Returns:
+        Cached comparison, or None if the quotes share no dates
+
+    Raises:
+        ServiceUnavailableError: If both API and fallback fail
+        OverloadedError: If upstream capacity is exhausted
+    """
+    base, quotes, start, end = query
+    async with upstream_limiter.slot():
+        matrix, source = await _fx_client().fetch_matrix(start, end, base, quotes)
+    from app.services.comparison import PairComparison
+
+    result = PairComparison.compute(matrix)
+    spans = _spans(base, quotes, start, end)
+    if result is None:
+        cache.set(
+            cache_key, NO_DATA, ttl_seconds=NEGATIVE_CACHE_TTL_SECONDS,
+            nbytes=NEGATIVE_CACHE_ENTRY_BYTES, spans=spans
+        )
+        return None
+    result["source"] = source
+    cache.set(cache_key, result, nbytes=deep_sizeof(result), spans=spans)
+    return result
+
+
+@app.get("/stream")
+async def stream(
+    pairs: Annotated[str, Query(description="Comma-separated pairs, e.g. EUR/USD,EUR/GBP")] = "EUR/USD"
+):
+    """
+    Stream latest-rate updates as Server-Sent Events.
+
+    Every pair is polled by one shared background poller regardless of the
+    number of subscribers, and only changed values are pushed.
+
+    Args:
+        pairs: Currency pairs to subscribe to
+
+    Returns:
+        text/event-stream response of "rate" events
+
+    Raises:
+        HTTPException: 400 for invalid pairs, 503 when the live subscription
+            or polled-pair limit is reached
+    """
+    try:
+        parsed = parse_pairs(pairs, LIVE_MAX_PAIRS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={
+            "error": "ValidationError",
+            "message": str(e)
+        })
+
+    try:
+        subscription = live_hub.subscribe(parsed)
+    except OverloadedError as e:
+        raise HTTPException(status_code=503, detail={
+            "error": "Overloaded",
+            "message": str(e)
+        }, headers={"Retry-After": str(e.retry_after)})
+    return StreamingResponse(
+        live_hub.events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.post("/convert")
+async def convert(
+    request: Request,
+    to: Annotated[str, Query(description="Target currency")] = "USD",
+    gap_policy: Annotated[str, Query(description="Gap policy: previous, next or error")] = CONVERT_GAP_POLICY
+):
+    """
+    Convert a stream of (date, amount, currency) records.
+
+    The body is CSV with a header row (Content-Type: text/csv) or NDJSON.
+    The upload is spooled to a temporary file, then records are converted
+    batch by batch and streamed back in the same format, so memory stays
+    bounded regardless of input size.
+
+    Args:
+        request: Incoming request with the record stream as body
+        to: Target currency code (default: USD)
+        gap_policy: Fixing to use for dates without one
+
+    Upstream fetches go through the same admission control as /summary:
+    the client rate limit applies to the request and every fetch takes an
+    upstream slot.
+
+    Returns:
+        Streaming response with converted records
+
+    Raises:
+        HTTPException: 400 for invalid parameters, 429 for client rate limit
+    """
+    try:
+        rate_limiter.check(request.client.host if request.client else "unknown")
+    except OverloadedError as e:
+        raise HTTPException(status_code=429, detail={
+            "error": "RateLimited",
+            "message": str(e)
+        }, headers={"Retry-After": str(e.retry_after)})
+
+    try:
+        params = ConvertQueryParams(to=to, gap_policy=gap_policy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail={
+            "error": "ValidationError",
+            "message": str(e)
+        })
+
+    # Only bulk conversion needs these; keep them off the startup path
+    from app.services.converter import (
+        CSV_FIELDS,
+        BulkConverter,
+        format_record,
+        iter_file,
+        iter_lines,
+        parse_records,
+        spool_upload,
+    )
+
+    fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    converter = BulkConverter(
+        _fx_client(), params.to.upper(), params.gap_policy, upstream_limiter
+    )
+    # Buffer the upload first: the streaming response consumes receive()
+    # while it runs, so the body cannot be read lazily from the request.
+    # The spool stays open until the response body is done.
+    spool = AsyncExitStack()
+    upload = await spool.enter_async_context(spool_upload(request.stream()))
+    records = parse_records(iter_lines(iter_file(upload)), fmt)
+
+    async def body():
+        async with spool:
+            if fmt == "csv":
+                yield ",".join(CSV_FIELDS) + "\n"
+            async for record in converter.convert(records):
+                yield format_record(record, fmt)
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+def _cached_periods(cached: dict, breakdown: str) -> list[dict]:
+    """
+    Get resampled periods for a cached response.
+
+    Rollups are computed once from the cached rate series and kept on the
+    cache entry, so repeated chart requests skip the aggregation.
+
+    Args:
+        cached: Cached response data
+        breakdown: Requested breakdown type
+
+    Returns:
+        List of period dicts (empty for non-period breakdowns)
+    """
+    if breakdown not in PERIOD_BREAKDOWNS:
+        return []
+
+    rollups = cached["rollups"]
+    if breakdown not in rollups:
+        _memoize(cached, "rollups", breakdown, [
+            p.model_dump() for p in Calculator.compute_periods(cached["series"].decode(), breakdown)
+        ])
+    return rollups[breakdown]
+
+
+def _memoize(cached: dict, store: str, name: str, value: Any) -> None:
+    """
+    Keep a derived view on a cache entry and note its size for the byte budget.
+
+    Renders may run in the compute pool, so sizes are only queued here;
+    the event loop applies them to the cache with _account_memoized.
+
+    Args:
+        cached: Cache entry
+        store: "sections" or "rollups"
+        name: Section or breakdown name
+        value: Derived view to keep
+    """
+    cached[store][name] = value
+    # list.append is atomic, so concurrent renders of one entry lose no sizes
+    cached["memoized_bytes"].append(deep_sizeof(value))
+
+
+def _account_memoized(cache_key: str, cached: dict) -> None:
+    """
+    Charge views memoized since the last call to the entry's cache size.
+
+    Args:
+        cache_key: Key the entry is cached under
+        cached: Cache entry
+    """
+    pending = cached["memoized_bytes"]
+    count = len(pending)
+    if not count:
+        return
+    delta = sum(pending[:count])
+    del pending[:count]
+    # Shed requests render uncached local entries; never charge those to the key
+    if cache.get(cache_key) is cached:
+        cache.resize(cache_key, delta)
 
 
 if __name__ == "__main__":
@@ -1,45 +1,195 @@
 """Pydantic models for the FX Summary Service."""
 
-from typing import Optional, Literal
+from typing import Literal
 from pydantic import BaseModel, Field, field_validator
-from datetime import datetime
+
+from app.config import (
+    COMPARE_MAX_QUOTES,
+    ADMIN_WARM_CONCURRENCY,
+    ADMIN_WARM_MAX_CONCURRENCY,
+    ADMIN_WARM_MAX_QUERIES,
+)
+from app.utils.validators import parse_date_ordinal, decode_cursor
+
+
+Breakdown = Literal["none", "day", "week", "month", "quarter", "year"]
+ANALYTICS_KINDS = ("sma", "volatility", "range", "drawdown")
 
 
 class SummaryQueryParams(BaseModel):
     """Query parameters for the summary endpoint."""
     start: str = Field(..., description="Start date in YYYY-MM-DD format")
     end: str = Field(..., description="End date in YYYY-MM-DD format")
-    breakdown: Literal["none", "day"] = Field(default="none", description="Breakdown type")
+    breakdown: Breakdown = Field(default="none", description="Breakdown type")
     from_currency: str = Field(default="EUR", alias="from", description="Source currency")
     to: str = Field(default="USD", description="Target currency")
+    analytics: str | None = Field(default=None, description="Comma-separated rolling analytics")
+    window: int = Field(default=20, ge=2, le=1000, description="Rolling window size in data points")
+    allow_fallback: bool = Field(default=False, description="Serve local data when upstream is overloaded")
+    distribution: bool = Field(default=False, description="Include median, quantiles and histogram")
+    fields: str | None = Field(default=None, description="Comma-separated response sections or fields")
+    limit: int | None = Field(default=None, ge=1, le=1000, description="Daily rows per page")
+    cursor: str | None = Field(default=None, description="Opaque cursor from next_cursor")
 
     @field_validator("start", "end")
     @classmethod
     def validate_date_format(cls, v: str) -> str:
         """Validate date format is YYYY-MM-DD."""
-        try:
-            datetime.strptime(v, "%Y-%m-%d")
+        parse_date_ordinal(v)
+        return v
+
+    @field_validator("analytics")
+    @classmethod
+    def validate_analytics(cls, v: str | None) -> str | None:
+        """Validate analytics is a comma-separated list of known kinds."""
+        if v is None:
             return v
-        except ValueError:
-            raise ValueError(f"Date must be in YYYY-MM-DD format, got: {v}")
+        kinds = [kind.strip() for kind in v.split(",") if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in ANALYTICS_KINDS]
+        if unknown or not kinds:
+            raise ValueError(
+                f"analytics must be a comma-separated list of {', '.join(ANALYTICS_KINDS)}, got: {v}"
+            )
+        return ",".join(kinds)
+
+    @field_validator("fields")
+    @classmethod
+    def validate_fields(cls, v: str | None) -> str | None:
+        """Validate fields is a comma-separated list of sections or section.field paths."""
+        if v is None:
+            return v
+        paths = [path.strip() for path in v.split(",") if path.strip()]
+        for path in paths:
+            section, _, name = path.partition(".")
+            if section not in SUMMARY_FIELDS or (name and name not in SUMMARY_FIELDS[section]):
+                raise ValueError(f"Unknown field: {path}")
+        if not paths:
+            raise ValueError("fields must not be empty")
+        return ",".join(paths)
+
+    def field_selection(self) -> dict[str, list[str] | None] | None:
+        """
+        Return requested fields grouped by section.
+
+        Returns:
+            None if all fields are requested, otherwise a mapping of section
+            to its requested field names (None for the whole section)
+        """
+        if not self.fields:
+            return None
+        selection: dict[str, list[str] | None] = {}
+        for path in self.fields.split(","):
+            section, _, name = path.partition(".")
+            if not name:
+                selection[section] = None
+            elif selection.get(section, []) is not None and name not in selection.setdefault(section, []):
+                selection[section].append(name)
+        return selection
+
+    @field_validator("cursor")
+    @classmethod
+    def validate_cursor(cls, v: str | None) -> str | None:
+        """Validate cursor decodes to a date ordinal."""
+        if v is not None:
+            decode_cursor(v)
+        return v
+
+    def paginated(self) -> bool:
+        """Return whether the daily breakdown is requested page by page."""
+        return self.limit is not None or self.cursor is not None
+
+    def validate_pagination(self):
+        """Validate that pagination is only used with the daily breakdown."""
+        if self.paginated() and self.breakdown != "day":
+            raise ValueError("limit and cursor require breakdown=day")
+
+    def analytics_kinds(self) -> list[str]:
+        """Return requested analytics kinds as a list."""
+        return self.analytics.split(",") if self.analytics else []
 
     def validate_date_range(self):
         """Validate that start date is before or equal to end date."""
-        start_date = datetime.strptime(self.start, "%Y-%m-%d")
-        end_date = datetime.strptime(self.end, "%Y-%m-%d")
-        if start_date > end_date:
+        if parse_date_ordinal(self.start) > parse_date_ordinal(self.end):
+            raise ValueError("start date must be before or equal to end date")
+
+
+class ConvertQueryParams(BaseModel):
+    """Query parameters for the bulk conversion endpoint."""
+    to: str = Field(default="USD", description="Target currency")
+    gap_policy: Literal["previous", "next", "error"] = Field(
+        default="previous", description="How to rate dates without a fixing"
+    )
+
+
+class CompareQueryParams(BaseModel):
+    """Query parameters for the compare endpoint."""
+    start: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end: str = Field(..., description="End date in YYYY-MM-DD format")
+    base: str = Field(default="EUR", description="Base currency")
+    quotes: str = Field(..., description="Comma-separated quote currencies")
+
+    @field_validator("start", "end")
+    @classmethod
+    def validate_date_format(cls, v: str) -> str:
+        """Validate date format is YYYY-MM-DD."""
+        parse_date_ordinal(v)
+        return v
+
+    @field_validator("base")
+    @classmethod
+    def validate_base(cls, v: str) -> str:
+        """Validate and uppercase the base currency code."""
+        v = v.strip().upper()
+        if len(v) != 3 or not v.isalpha():
+            raise ValueError(f"base must be a 3-letter currency code, got: {v}")
+        return v
+
+    @field_validator("quotes")
+    @classmethod
+    def validate_quotes(cls, v: str) -> str:
+        """Validate quotes is a comma-separated list of currency codes."""
+        quotes = []
+        for quote in v.split(","):
+            quote = quote.strip().upper()
+            if len(quote) != 3 or not quote.isalpha():
+                raise ValueError(f"quotes must be comma-separated 3-letter currency codes, got: {v}")
+            if quote not in quotes:
+                quotes.append(quote)
+        if len(quotes) > COMPARE_MAX_QUOTES:
+            raise ValueError(f"At most {COMPARE_MAX_QUOTES} quotes may be compared at once")
+        return ",".join(quotes)
+
+    def quote_list(self) -> list[str]:
+        """Return requested quote currencies as a list."""
+        return self.quotes.split(",")
+
+    def validate_request(self):
+        """Validate the date range and that the base is not also a quote."""
+        if parse_date_ordinal(self.start) > parse_date_ordinal(self.end):
             raise ValueError("start date must be before or equal to end date")
+        if self.base in self.quote_list():
+            raise ValueError("quotes must not include the base currency")
+
+
+class WarmRequest(BaseModel):
+    """Body of the cache warm-up endpoint."""
+    queries: list[SummaryQueryParams] = Field(
+        ..., min_length=1, max_length=ADMIN_WARM_MAX_QUERIES, description="Summary queries to load"
+    )
+    concurrency: int = Field(
+        default=ADMIN_WARM_CONCURRENCY, ge=1, le=ADMIN_WARM_MAX_CONCURRENCY, description="Queries filled at once"
+    )
 
 
 class MetaInfo(BaseModel):
     """Metadata about the response."""
     cache: Literal["HIT", "MISS"]
-    source: Literal["frankfurter", "local_file"]
+    source: str
     base: str
     quote: str
     start: str
     end: str
-    breakdown: Literal["day", "none"]
+    breakdown: Breakdown
 
     class Config:
         populate_by_name = True
@@ -49,7 +199,7 @@ class Totals(BaseModel):
     """Total statistics for the date range."""
     start_rate: float
     end_rate: float
-    total_pct_change: Optional[float]
+    total_pct_change: float | None
     mean_rate: float
 
 
@@ -57,7 +207,21 @@ class DailyRate(BaseModel):
     """Daily rate information."""
     date: str
     rate: float
-    pct_change: Optional[float]
+    pct_change: float | None
+
+
+class PeriodRate(BaseModel):
+    """OHLC-style statistics for one resampled period."""
+    period: str
+    start_date: str
+    end_date: str
+    open: float
+    close: float
+    min: float
+    max: float
+    mean: float
+    pct_change: float | None
+    count: int
 
 
 class RatePoint(BaseModel):
@@ -73,12 +237,95 @@ class Pattern(BaseModel):
     max_rate: RatePoint
 
 
+class RollingPoint(BaseModel):
+    """A rolling statistic value at the end of a window."""
+    date: str
+    value: float | None
+
+
+class Drawdown(BaseModel):
+    """Largest peak-to-trough decline over the period."""
+    max_drawdown_pct: float
+    peak: RatePoint
+    trough: RatePoint
+
+
+class Analytics(BaseModel):
+    """Rolling analytics over a sliding window of rates."""
+    window: int
+    moving_average: list[RollingPoint] = []
+    volatility: list[RollingPoint] = []
+    rolling_min: list[RollingPoint] = []
+    rolling_max: list[RollingPoint] = []
+    drawdown: Drawdown | None = None
+
+
+class HistogramBin(BaseModel):
+    """Number of rates within [lower, upper)."""
+    lower: float
+    upper: float
+    count: int
+
+
+class Distribution(BaseModel):
+    """Distribution of rates over the range."""
+    method: Literal["exact", "sketch"]
+    count: int
+    median: float
+    p5: float
+    p95: float
+    histogram: list[HistogramBin]
+
+
 class SummaryResponse(BaseModel):
     """Complete summary response."""
     meta: MetaInfo
-    totals: Totals
+    totals: Totals | None
     daily: list[DailyRate]
-    pattern: Pattern
+    periods: list[PeriodRate] = []
+    pattern: Pattern | None
+    analytics: Analytics | None = None
+    distribution: Distribution | None = None
+    next_cursor: str | None = None
+
+
+# Response sections selectable with fields=, with their selectable sub-fields
+SUMMARY_FIELDS: dict[str, tuple[str, ...]] = {
+    "meta": (),
+    "totals": tuple(Totals.model_fields),
+    "daily": (),
+    "periods": (),
+    "pattern": tuple(Pattern.model_fields),
+    "analytics": (),
+    "distribution": (),
+}
+
+
+class PairStats(BaseModel):
+    """Change and volatility of one quote currency over the aligned dates."""
+    quote: str
+    start_rate: float
+    end_rate: float
+    pct_change: float | None
+    volatility: float | None
+
+
+class CompareMeta(BaseModel):
+    """Metadata about a comparison response."""
+    cache: Literal["HIT", "MISS"]
+    source: str
+    base: str
+    quotes: list[str]
+    start: str
+    end: str
+    points: int
+
+
+class CompareResponse(BaseModel):
+    """Aligned statistics for several quotes against one base."""
+    meta: CompareMeta
+    pairs: list[PairStats]
+    correlation: dict[str, dict[str, float | None]]
 
 
 class FrankfurterResponse(BaseModel):
@@ -90,6 +337,14 @@ class FrankfurterResponse(BaseModel):
     rates: dict[str, dict[str, float]]
 
 
+class FrankfurterLatestResponse(BaseModel):
+    """Response from Frankfurter latest endpoint."""
+    amount: float
+    base: str
+    date: str
+    rates: dict[str, float]
+
+
 class LocalFallbackData(BaseModel):
     """Structure of local fallback JSON file."""
     base: str
@@ -0,0 +1,297 @@
+"""Replay captured /summary traffic and report cache behavior."""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+import zlib
+from collections import Counter
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from app.services.capture import read_capture
+from app.services.trading_calendar import TradingCalendar
+from app.utils.validators import format_date_ordinal, parse_date_ordinal
+
+
+class StubUpstream:
+    """
+    Deterministic Frankfurter-compatible upstream served in-process.
+
+    Rates are a pure function of pair and day, so every replay of a log
+    sees identical data; only the service's own behavior varies.
+    """
+
+    def __init__(self, latency: float = 0.02):
+        """
+        Initialize stub.
+
+        Args:
+            latency: Seconds each call takes
+        """
+        self.latency = latency
+        self.calls = 0
+        self.calendar = TradingCalendar()
+
+    @staticmethod
+    def rate(base: str, quote: str, ordinal: int) -> float:
+        """
+        Synthetic rate of a pair on a day.
+
+        Args:
+            base: Base currency
+            quote: Quote currency
+            ordinal: Day ordinal
+
+        Returns:
+            Rate, stable across processes and runs
+        """
+        level = 0.5 + (zlib.crc32(f"{base}{quote}".encode()) % 1000) / 500
+        return round(level * (1 + 0.05 * math.sin(ordinal / 30)), 6)
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        """Answer a Frankfurter range request."""
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        span = request.url.path.strip("/")
+        if ".." not in span:
+            return httpx.Response(404)
+        start, end = span.split("..", 1)
+        try:
+            first, last = parse_date_ordinal(start), parse_date_ordinal(end)
+        except ValueError:
+            return httpx.Response(422)
+        base = request.url.params.get("from", "EUR")
+        quotes = request.url.params.get("to", "USD").split(",")
+        rates = {
+            format_date_ordinal(o): {
+                quote: self.rate(base, quote, o) for quote in quotes
+            }
+            for o in range(first, last + 1)
+            if self.calendar.is_publication_day(o)
+        }
+        return httpx.Response(
+            200,
+            json={
+                "amount": 1.0,
+                "base": base,
+                "start_date": start,
+                "end_date": end,
+                "rates": rates,
+            },
+        )
+
+
+def _percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+def summarize(
+    results: list[tuple[int, str | None, float]],
+    upstream_calls: int | None,
+    elapsed: float,
+) -> dict:
+    """
+    Build the replay report.
+
+    Args:
+        results: (status, cache status, latency seconds) per request
+        upstream_calls: Upstream requests made during the replay, if known
+        elapsed: Wall-clock seconds of the replay
+
+    Returns:
+        Request count, throughput, status counts, cache hit rate, upstream
+        calls and latency percentiles in milliseconds
+    """
+    latencies = sorted(latency * 1000 for _, _, latency in results)
+    cache_statuses = Counter(cache_status for _, cache_status, _ in results)
+    served = cache_statuses["HIT"] + cache_statuses["MISS"]
+    return {
+        "requests": len(results),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 1) if elapsed > 0 else None,
+        "status": {
+            str(status): count
+            for status, count in sorted(Counter(r[0] for r in results).items())
+        },
+        "hit_rate": round(cache_statuses["HIT"] / served, 4) if served else None,
+        "upstream_calls": upstream_calls,
+        "latency_ms": {
+            name: None if value is None else round(value, 2)
+            for name, value in (
+                ("p50", _percentile(latencies, 0.5)),
+                ("p90", _percentile(latencies, 0.9)),
+                ("p99", _percentile(latencies, 0.99)),
+                ("max", latencies[-1] if latencies else None),
+            )
+        },
+    }
+
+
+async def replay(
+    records: list[dict],
+    send: Callable[[dict], Awaitable[httpx.Response]],
+    speed: float = 1.0,
+) -> list[tuple[int, str | None, float]]:
+    """
+    Send captured requests at their recorded offsets.
+
+    Arrivals are open-loop: each request starts at its scheduled time
+    whether or not earlier ones have finished, as in production.
+
+    Args:
+        records: Capture records in arrival order
+        send: Sends one record's request
+        speed: Time compression factor (2 replays twice as fast; 0 sends
+            everything at once)
+
+    Returns:
+        (status, cache status, latency seconds) per record, in log order
+    """
+
+    async def one(record: dict) -> tuple[int, str | None, float]:
+        sent = time.perf_counter()
+        response = await send(record)
+        latency = time.perf_counter() - sent
+        try:
+            cache_status = response.json()["meta"]["cache"]
+        except (ValueError, KeyError, TypeError):
+            cache_status = None
+        return response.status_code, cache_status, latency
+
+    if not records:
+        return []
+    started = time.perf_counter()
+    t0 = records[0]["t"]
+    tasks = []
+    for record in records:
+        if speed > 0:
+            delay = (record["t"] - t0) / 1000 / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(record)))
+    return list(await asyncio.gather(*tasks))
+
+
+async def replay_in_process(
+    records: list[dict], speed: float = 1.0, upstream_latency: float = 0.02
+) -> dict:
+    """
+    Replay against this codebase's app with a stubbed upstream.
+
+    Each captured client token gets its own client address, so per-client
+    rate limits apply as they did in production. The background refresher
+    runs if it is enabled, as its refetches are part of cache behavior.
+
+    Args:
+        records: Capture records in arrival order
+        speed: Time compression factor
+        upstream_latency: Seconds each stubbed upstream call takes
+
+    Returns:
+        Replay report
+    """
+    from app import main
+    from app.config import REFRESH_ENABLED
+
+    stub = StubUpstream(upstream_latency)
+    main.cache.clear()
+    main.rate_limiter.clear()
+    previous = main.http_client
+    main.http_client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+    clients: dict[str, httpx.AsyncClient] = {}
+
+    async def send(record: dict) -> httpx.Response:
+        client = clients.get(record["c"])
+        if client is None:
+            transport = httpx.ASGITransport(app=main.app, client=(record["c"], 0))
+            client = clients[record["c"]] = httpx.AsyncClient(
+                transport=transport, base_url="http://replay"
+            )
+        return await client.get("/summary", params=record["q"])
+
+    if REFRESH_ENABLED:
+        main.refresher.start()
+    started = time.perf_counter()
+    try:
+        results = await replay(records, send, speed)
+        elapsed = time.perf_counter() - started
+    finally:
+        await main.refresher.stop()
+        for client in clients.values():
+            await client.aclose()
+        await main.http_client.aclose()
+        main.http_client = previous
+    return summarize(results, stub.calls, elapsed)
+
+
+async def _upstream_requests(client: httpx.AsyncClient) -> int | None:
+    """Total routed provider requests reported by /metrics, if available."""
+    try:
+        response = await client.get("/metrics")
+        return sum(stats["requests"] for stats in response.json()["providers"].values())
+    except (httpx.HTTPError, ValueError, KeyError, TypeError):
+        return None
+
+
+async def replay_against(url: str, records: list[dict], speed: float = 1.0) -> dict:
+    """
+    Replay against a running service.
+
+    Upstream calls are read from the service's /metrics, which with
+    pre-forked workers covers only the worker that answered.
+
+    Args:
+        url: Service base URL, e.g. http://localhost:8000
+        records: Capture records in arrival order
+        speed: Time compression factor
+
+    Returns:
+        Replay report
+    """
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        before = await _upstream_requests(client)
+        started = time.perf_counter()
+        results = await replay(
+            records, lambda record: client.get("/summary", params=record["q"]), speed
+        )
+        elapsed = time.perf_counter() - started
+        after = await _upstream_requests(client)
+    calls = None if before is None or after is None else after - before
+    return summarize(results, calls, elapsed)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point: python -m app.replay."""
+    parser = argparse.ArgumentParser(description="Replay captured /summary traffic")
+    parser.add_argument(
+        "paths", nargs="+", help="Capture logs, e.g. capture-*.jsonl.gz"
+    )
+    parser.add_argument(
+        "--url", help="Replay against a running service instead of in-process"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Time compression (0 = no pacing)"
+    )
+    parser.add_argument(
+        "--upstream-latency-ms", type=float, default=20, help="Stubbed upstream latency"
+    )
+    args = parser.parse_args(argv)
+
+    records = read_capture(args.paths)
+    if args.url:
+        report = asyncio.run(replay_against(args.url, records, args.speed))
+    else:
+        report = asyncio.run(
+            replay_in_process(records, args.speed, args.upstream_latency_ms / 1000)
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""Pre-fork multi-worker server sharing preloaded data copy-on-write."""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from collections.abc import Callable
+from datetime import date
+
+from app.config import (
+    LOCAL_FALLBACK_PATH,
+    SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    SERVER_MAX_DEFAULT_WORKERS,
+    SERVER_PORT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def preload() -> None:
+    """
+    Import the application and load shared read-only data.
+
+    Runs in the master before workers are forked: the fallback dataset and
+    backfilled history are parsed once and the publication calendar is materialized, then every
+    object is moved to the GC's permanent generation so collections in the
+    workers do not write to (and thereby copy) the shared pages.
+    """
+    from app import main
+    from app.services.providers import HistoryProvider, LocalFileProvider
+
+    try:
+        LocalFileProvider.preload(LOCAL_FALLBACK_PATH)
+        HistoryProvider.preload_all()
+    except (OSError, ValueError):
+        logger.warning("Local datasets not fully preloaded", exc_info=True)
+    main.calendar.warm(range(1999, date.today().year + 2))
+
+    gc.collect()
+    gc.freeze()
+
+
+def serve_worker(sock: socket.socket) -> None:
+    """
+    Run one uvicorn worker on an inherited listening socket.
+
+    Args:
+        sock: Socket bound by the master
+    """
+    import uvicorn
+
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, lifespan="on", log_level="info"))
+    asyncio.run(server.serve(sockets=[sock]))
+
+
+class PreforkServer:
+    """
+    Master process that forks workers sharing one listening socket.
+
+    SIGHUP reloads the shared data in the master and replaces workers one at
+    a time, each old worker draining gracefully after its replacement has
+    started. Replacement advances from the supervision loop without waiting
+    on the draining worker, so the master keeps reaping and respawning.
+    Workers that exit unexpectedly are respawned. SIGTERM or SIGINT stops
+    all workers gracefully.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        workers: int,
+        serve: Callable[[socket.socket], None] = serve_worker,
+        load: Callable[[], None] = preload,
+        graceful_timeout: float = SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize master.
+
+        Args:
+            sock: Bound, listening socket shared with workers
+            workers: Number of worker processes
+            serve: Worker body, run in each forked child
+            load: Loads shared data in the master (before forking and on reload)
+            graceful_timeout: Seconds a worker may take to drain before SIGKILL
+        """
+        self.sock = sock
+        self.workers = workers
+        self.serve = serve
+        self.load = load
+        self.graceful_timeout = graceful_timeout
+        self.pids: set[int] = set()
+        # Draining workers by pid: monotonic time after which they are killed
+        self.retiring: dict[int, float] = {}
+        # Old workers still to be replaced by the current reload
+        self._outdated: list[int] = []
+        self._stopping = False
+        self._reload_requested = False
+
+    @property
+    def reloading(self) -> bool:
+        """Whether a reload is still replacing workers."""
+        return bool(self._outdated or self.retiring)
+
+    def spawn(self) -> int:
+        """
+        Fork one worker.
+
+        Returns:
+            Worker pid
+        """
+        pid = os.fork()
+        if pid == 0:
+            # Child: restore default signal handling and serve until told to stop
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                signal.signal(sig, signal.SIG_DFL)
+            code = 0
+            try:
+                self.serve(self.sock)
+            except BaseException:
+                logger.exception("Worker %s crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.pids.add(pid)
+        return pid
+
+    def reap(self) -> list[int]:
+        """
+        Collect exited workers without blocking.
+
+        Retiring workers are collected too but not reported.
+
+        Returns:
+            Pids of workers that exited unexpectedly
+        """
+        exited = []
+        while self.pids or self.retiring:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                exited.extend(self.pids)
+                self.pids.clear()
+                self.retiring.clear()
+                break
+            if pid == 0:
+                break
+            self.retiring.pop(pid, None)
+            if pid in self.pids:
+                self.pids.discard(pid)
+                exited.append(pid)
+        return exited
+
+    def terminate(self, pid: int) -> None:
+        """
+        Stop one worker gracefully, killing it after the graceful timeout.
+
+        Args:
+            pid: Worker pid
+        """
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        deadline = time.monotonic() + self.graceful_timeout
+        try:
+            while time.monotonic() < deadline:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+                if done:
+                    break
+                time.sleep(0.05)
+            else:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+        self.pids.discard(pid)
+
+    def retire(self, pid: int) -> None:
+        """
+        Ask a worker to drain without waiting for it.
+
+        Args:
+            pid: Worker pid
+        """
+        self.pids.discard(pid)
+        self.retiring[pid] = time.monotonic() + self.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def reload(self) -> None:
+        """Reload shared data and schedule every current worker for replacement."""
+        self._reload_requested = False
+        gc.unfreeze()
+        self.load()
+        self._outdated = list(self.pids)
+
+    def supervise(self) -> None:
+        """
+        Do one round of supervision without blocking.
+
+        Kills workers that overran their drain deadline, starts the next
+        replacement once the previous old worker has exited, and respawns
+        workers that died.
+        """
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now >= deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.retiring[pid] = float("inf")
+
+        while self._outdated and not self.retiring:
+            pid = self._outdated.pop()
+            if pid in self.pids:
+                self.spawn()
+                self.retire(pid)
+
+        for pid in self.reap():
+            if not self._stopping:
+                logger.warning("Worker %s exited, respawning", pid)
+                self.spawn()
+
+    def stop(self) -> None:
+        """Stop all workers, including ones still draining."""
+        self._outdated.clear()
+        self.pids.update(self.retiring)
+        self.retiring.clear()
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.pids):
+            self.terminate(pid)
+
+    def run(self) -> None:
+        """Load data, fork workers and supervise them until stopped."""
+        self.load()
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for _ in range(self.workers):
+            self.spawn()
+        logger.info("Master %s started %s workers", os.getpid(), self.workers)
+
+        while not self._stopping:
+            if self._reload_requested:
+                self.reload()
+            self.supervise()
+            time.sleep(0.2)
+
+        self.stop()
+
+    def _handle_stop(self, signum, frame) -> None:
+        """Signal handler requesting shutdown."""
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame) -> None:
+        """Signal handler requesting a data reload."""
+        self._reload_requested = True
+
+
+def bind(host: str, port: int) -> socket.socket:
+    """
+    Create the listening socket shared by all workers.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+
+    Returns:
+        Listening socket
+    """
+    sock = socket.socket(
+        socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM
+    )
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def default_workers() -> int:
+    """
+    Number of workers when --workers is not given.
+
+    WEB_CONCURRENCY if set, otherwise the CPUs this process may run on,
+    capped at SERVER_MAX_DEFAULT_WORKERS: container CPU limits are often
+    not visible to the process, and each worker holds its own cache and
+    admission limits.
+
+    Returns:
+        Worker count
+    """
+    configured = int(os.environ.get("WEB_CONCURRENCY", "0"))
+    if configured > 0:
+        return configured
+    cpus = (
+        len(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else os.cpu_count() or 1
+    )
+    return max(1, min(cpus, SERVER_MAX_DEFAULT_WORKERS))
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point: python -m app.server."""
+    parser = argparse.ArgumentParser(
+        description="Run the FX service with pre-forked workers"
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    PreforkServer(bind(args.host, args.port), args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Admission control for upstream-bound requests."""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from app.config import (
+    CLIENT_BURST,
+    CLIENT_MAX_TRACKED,
+    CLIENT_RATE_PER_SECOND,
+    UPSTREAM_MAX_CONCURRENCY,
+    UPSTREAM_MAX_QUEUE,
+    UPSTREAM_QUEUE_DEADLINE_SECONDS,
+)
+
+
+class OverloadedError(Exception):
+    """Raised when a request is shed instead of queued."""
+
+    def __init__(self, message: str, retry_after: float):
+        """
+        Initialize error.
+
+        Args:
+            message: Reason the request was shed
+            retry_after: Suggested seconds before retrying
+        """
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize bucket full.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float | None:
+        """
+        Take one token if available.
+
+        Returns:
+            None if a token was taken, otherwise seconds until one is available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return None
+        return (1 - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """Per-client token buckets with a bounded number of tracked clients."""
+
+    def __init__(
+        self,
+        rate: float = CLIENT_RATE_PER_SECOND,
+        burst: int = CLIENT_BURST,
+        max_clients: int = CLIENT_MAX_TRACKED,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            rate: Requests per second allowed per client
+            burst: Requests a client may make at once
+            max_clients: Clients tracked before the least recent is dropped
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.limited = 0
+
+    def check(self, client: str) -> None:
+        """
+        Admit a request from a client.
+
+        Args:
+            client: Client identifier (e.g. IP address)
+
+        Raises:
+            OverloadedError: If the client exceeded its rate
+        """
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+
+        wait = bucket.take()
+        if wait is not None:
+            self.limited += 1
+            raise OverloadedError("Client rate limit exceeded", wait)
+
+    def clear(self) -> None:
+        """Forget all tracked clients."""
+        self._buckets.clear()
+
+
+class UpstreamLimiter:
+    """Bounded upstream concurrency with a short queue and early shedding."""
+
+    def __init__(
+        self,
+        max_concurrency: int = UPSTREAM_MAX_CONCURRENCY,
+        max_queue: int = UPSTREAM_MAX_QUEUE,
+        deadline: float = UPSTREAM_QUEUE_DEADLINE_SECONDS,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            max_concurrency: Upstream calls allowed at once
+            max_queue: Requests allowed to wait for a slot
+            deadline: Longest a request may wait for a slot, in seconds
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.shed = 0
+        self.avg_latency = 0.0
+
+    def _estimated_wait(self) -> float:
+        """Estimate queueing delay for a new request from recent latency."""
+        return (self.queued + 1) / self.max_concurrency * self.avg_latency
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold an upstream slot for the duration of the block.
+
+        Requests are shed immediately when the queue is full or the estimated
+        wait would exceed the deadline, so queued requests never time out
+        after having occupied the queue.
+
+        Raises:
+            OverloadedError: If the request is shed
+        """
+        if self._semaphore.locked():
+            estimate = self._estimated_wait()
+            if self.queued >= self.max_queue or estimate > self.deadline:
+                self.shed += 1
+                raise OverloadedError(
+                    "Upstream capacity exhausted", estimate or self.deadline
+                )
+
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.deadline)
+            except TimeoutError:
+                self.shed += 1
+                raise OverloadedError(
+                    "Timed out waiting for upstream capacity", self.deadline
+                )
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.avg_latency = (
+                elapsed
+                if not self.avg_latency
+                else 0.8 * self.avg_latency + 0.2 * elapsed
+            )
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        """Return current limiter state."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "shed": self.shed,
+            "avg_latency_seconds": self.avg_latency,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key; concurrent callers share its result.
+
+        fn runs in its own task and every caller, including the one that
+        started it, waits through a shield. A cancelled caller (e.g. a
+        disconnected client) therefore neither cancels the call nor fails
+        the others waiting on it.
+
+        Args:
+            key: Coalescing key
+            fn: Coroutine factory to run
+
+        Returns:
+            Result of fn (or its exception, re-raised to every caller)
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark retrieved so an exception nobody awaited is not logged
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,208 @@
+"""Rolling analytics computed with single-pass sliding-window algorithms."""
+
+import itertools
+from collections import deque
+from collections.abc import Mapping
+
+from app.models import Analytics, Drawdown, RatePoint, RollingPoint
+from app.services.rate_series import RateSeries
+
+
+class RollingAnalytics:
+    """Moving averages, volatility, rolling range and drawdown in O(n)."""
+
+    @staticmethod
+    def compute(rates: Mapping, kinds: list[str], window: int) -> Analytics:
+        """
+        Compute the requested rolling analytics.
+
+        Args:
+            rates: RateSeries (or mapping of date strings to rates)
+            kinds: Analytics to compute ("sma", "volatility", "range", "drawdown")
+            window: Window size in data points
+
+        Returns:
+            Analytics object with only the requested sections filled
+        """
+        series = RateSeries.from_mapping(rates)
+        sorted_dates = series.dates()
+        values = series.rates
+
+        analytics = Analytics(window=window)
+        if "sma" in kinds:
+            analytics.moving_average = RollingAnalytics._moving_average(
+                sorted_dates, values, window
+            )
+        if "volatility" in kinds:
+            analytics.volatility = RollingAnalytics._volatility(
+                sorted_dates, values, window
+            )
+        if "range" in kinds:
+            analytics.rolling_min = RollingAnalytics._rolling_extreme(
+                sorted_dates, values, window, lowest=True
+            )
+            analytics.rolling_max = RollingAnalytics._rolling_extreme(
+                sorted_dates, values, window, lowest=False
+            )
+        if "drawdown" in kinds:
+            analytics.drawdown = RollingAnalytics._max_drawdown(sorted_dates, values)
+
+        return analytics
+
+    @staticmethod
+    def _moving_average(
+        dates: list[str], values: list[float], window: int
+    ) -> list[RollingPoint]:
+        """
+        Compute a simple moving average with a running sum.
+
+        Args:
+            dates: Sorted date strings
+            values: Rates matching dates
+            window: Window size
+
+        Returns:
+            One point per full window, dated at the window's last day
+        """
+        points = []
+        running_sum = 0.0
+
+        for i, value in enumerate(values):
+            running_sum += value
+            if i >= window:
+                running_sum -= values[i - window]
+            if i >= window - 1:
+                points.append(RollingPoint(date=dates[i], value=running_sum / window))
+
+        return points
+
+    @staticmethod
+    def _volatility(
+        dates: list[str], values: list[float], window: int
+    ) -> list[RollingPoint]:
+        """
+        Compute rolling standard deviation of daily percentage returns.
+
+        Uses the sliding-window form of Welford's update, so each step costs
+        O(1) regardless of window size. Windows containing an undefined
+        return (previous rate is zero) report None.
+
+        Args:
+            dates: Sorted date strings
+            values: Rates matching dates
+            window: Number of returns per window
+
+        Returns:
+            One point per full window of returns, in percent
+        """
+        returns: list[float | None] = [
+            None if prev == 0 else ((cur - prev) / prev) * 100
+            for prev, cur in itertools.pairwise(values)
+        ]
+
+        points = []
+        mean = 0.0
+        m2 = 0.0
+        count = 0
+        undefined = 0
+
+        for i, ret in enumerate(returns):
+            x_in = 0.0 if ret is None else ret
+            undefined += ret is None
+
+            if count < window:
+                count += 1
+                delta = x_in - mean
+                mean += delta / count
+                m2 += delta * (x_in - mean)
+            else:
+                x_out = returns[i - window]
+                undefined -= x_out is None
+                x_out = 0.0 if x_out is None else x_out
+                old_mean = mean
+                mean += (x_in - x_out) / window
+                m2 += (x_in - x_out) * (x_in - mean + x_out - old_mean)
+
+            if count == window:
+                if undefined:
+                    value = None
+                else:
+                    value = (max(m2, 0.0) / (window - 1)) ** 0.5
+                points.append(RollingPoint(date=dates[i + 1], value=value))
+
+        return points
+
+    @staticmethod
+    def _rolling_extreme(
+        dates: list[str], values: list[float], window: int, lowest: bool
+    ) -> list[RollingPoint]:
+        """
+        Compute rolling minimum or maximum with a monotonic deque.
+
+        Args:
+            dates: Sorted date strings
+            values: Rates matching dates
+            window: Window size
+            lowest: True for rolling minimum, False for rolling maximum
+
+        Returns:
+            One point per full window, dated at the window's last day
+        """
+        points = []
+        candidates: deque[int] = deque()
+
+        for i, value in enumerate(values):
+            while candidates and (
+                values[candidates[-1]] >= value
+                if lowest
+                else values[candidates[-1]] <= value
+            ):
+                candidates.pop()
+            candidates.append(i)
+
+            if candidates[0] <= i - window:
+                candidates.popleft()
+            if i >= window - 1:
+                points.append(RollingPoint(date=dates[i], value=values[candidates[0]]))
+
+        return points
+
+    @staticmethod
+    def _max_drawdown(dates: list[str], values: list[float]) -> Drawdown | None:
+        """
+        Find the largest peak-to-trough decline in one pass.
+
+        Args:
+            dates: Sorted date strings
+            values: Rates matching dates
+
+        Returns:
+            Drawdown details, or None if the rate never declined from a peak
+        """
+        peak_idx = 0
+        worst = 0.0
+        worst_peak = worst_trough = None
+
+        for i, value in enumerate(values):
+            if value > values[peak_idx]:
+                peak_idx = i
+                continue
+
+            peak = values[peak_idx]
+            # Handle division by zero
+            if peak == 0:
+                continue
+
+            drawdown = ((value - peak) / peak) * 100
+            if drawdown < worst:
+                worst = drawdown
+                worst_peak, worst_trough = peak_idx, i
+
+        if worst_peak is None:
+            return None
+
+        return Drawdown(
+            max_drawdown_pct=worst,
+            peak=RatePoint(date=dates[worst_peak], rate=values[worst_peak]),
+            trough=RatePoint(date=dates[worst_trough], rate=values[worst_trough]),
+        )
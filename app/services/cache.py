@@ -1,23 +1,41 @@
-"""In-memory cache with TTL support."""
+"""In-memory cache with TTL support and an optional byte budget."""
 
 import time
-from typing import Optional, Any
+from typing import Any
+from collections.abc import Iterable
 
 
 class InMemoryCache:
-    """Simple in-memory cache with TTL-based expiration."""
+    """
+    Simple in-memory cache with TTL-based expiration.
 
-    def __init__(self, ttl_seconds: int):
+    With a byte budget, entries are kept in least-recently-used order and
+    the oldest are evicted once the sizes reported to set() exceed it.
+
+    Entries can be indexed by group (e.g. currency pair) and the inclusive
+    day-ordinal range they cover, so the entries touching part of one
+    pair's history can be found and dropped without scanning the cache.
+    """
+
+    def __init__(self, ttl_seconds: int, max_bytes: int | None = None):
         """
         Initialize cache.
 
         Args:
             ttl_seconds: Time to live for cache entries in seconds
+            max_bytes: Budget for the summed entry sizes (None for unbounded)
         """
         self.ttl_seconds = ttl_seconds
-        self._cache: dict[str, tuple[Any, float]] = {}
-
-    def get(self, key: str) -> Optional[Any]:
+        self.max_bytes = max_bytes
+        self._cache: dict[str, tuple[Any, float, float]] = {}
+        self._sizes: dict[str, int] = {}
+        # group -> key -> (first ordinal, last ordinal), and key -> groups
+        self._index: dict[str, dict[str, tuple[int, int]]] = {}
+        self._groups: dict[str, list[str]] = {}
+        self.bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
         """
         Get value from cache if not expired.
 
@@ -30,26 +48,171 @@ class InMemoryCache:
         if key not in self._cache:
             return None
 
-        value, timestamp = self._cache[key]
-        if time.time() - timestamp > self.ttl_seconds:
-            del self._cache[key]
+        value, timestamp, ttl = self._cache[key]
+        if time.time() - timestamp > ttl:
+            self._remove(key)
             return None
 
+        if self.max_bytes is not None:
+            # Move to the most recently used end
+            self._cache[key] = self._cache.pop(key)
         return value
 
-    def set(self, key: str, value: Any) -> None:
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: float | None = None,
+        nbytes: int = 0,
+        spans: Iterable[tuple[str, int, int]] = (),
+    ) -> None:
         """
         Store value in cache with current timestamp.
 
         Args:
             key: Cache key
             value: Value to cache
+            ttl_seconds: Entry-specific TTL (defaults to the cache TTL)
+            nbytes: Size of the entry counted against the byte budget
+            spans: (group, first ordinal, last ordinal) the entry is indexed
+                under, e.g. ("EUR/USD", first, last)
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._remove(key)
+        self._cache[key] = (value, time.time(), ttl)
+        if nbytes:
+            self._sizes[key] = nbytes
+            self.bytes += nbytes
+        for group, first, last in spans:
+            self._index.setdefault(group, {})[key] = (first, last)
+            self._groups.setdefault(key, []).append(group)
+        self._evict()
+
+    def resize(self, key: str, delta: int) -> None:
+        """
+        Adjust the size of a stored entry, e.g. after memoizing into it.
+
+        Evicts least-recently-used entries if the budget is now exceeded.
+        Does nothing if the key is not cached.
+
+        Args:
+            key: Cache key
+            delta: Bytes added to (or, if negative, removed from) the entry
+        """
+        if key not in self._cache or not delta:
+            return
+        self._sizes[key] = self._sizes.get(key, 0) + delta
+        self.bytes += delta
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the byte budget is met."""
+        if self.max_bytes is not None:
+            while self.bytes > self.max_bytes and self._cache:
+                self._remove(next(iter(self._cache)))
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry, its size and its index spans, if present."""
+        self._cache.pop(key, None)
+        self.bytes -= self._sizes.pop(key, 0)
+        for group in self._groups.pop(key, ()):
+            keys = self._index[group]
+            del keys[key]
+            if not keys:
+                del self._index[group]
+
+    def invalidate(
+        self, group: str, first: int | None = None, last: int | None = None
+    ) -> list[str]:
+        """
+        Drop the entries of a group whose range overlaps an inclusive range.
+
+        Args:
+            group: Index group, e.g. "EUR/USD"
+            first: First day ordinal (None for unbounded)
+            last: Last day ordinal (None for unbounded)
+
+        Returns:
+            Keys dropped
+        """
+        keys = [
+            key
+            for key, (lo, hi) in self._index.get(group, {}).items()
+            if (last is None or lo <= last) and (first is None or hi >= first)
+        ]
+        for key in keys:
+            self._remove(key)
+        return keys
+
+    def occupancy(self) -> dict[str, dict]:
+        """
+        Summarize live entries by index group.
+
+        Returns:
+            Entry count, bytes and covered ordinal range by group
+        """
+        now = time.time()
+        usage = {}
+        for group, keys in self._index.items():
+            live = [
+                (key, span)
+                for key, span in keys.items()
+                if now - self._cache[key][1] <= self._cache[key][2]
+            ]
+            if live:
+                usage[group] = {
+                    "entries": len(live),
+                    "bytes": sum(self._sizes.get(key, 0) for key, _ in live),
+                    "first": min(lo for _, (lo, _) in live),
+                    "last": max(hi for _, (_, hi) in live),
+                }
+        return usage
+
+    def age(self, key: str) -> float | None:
+        """
+        Get seconds since a live entry was stored.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Entry age in seconds, or None if not found or expired
+        """
+        if self.get(key) is None:
+            return None
+        return time.time() - self._cache[key][1]
+
+    def items(self) -> list[tuple[str, Any]]:
+        """
+        Get all live entries.
+
+        Returns:
+            List of (key, value) pairs that have not expired
         """
-        self._cache[key] = (value, time.time())
+        now = time.time()
+        return [
+            (key, value)
+            for key, (value, timestamp, ttl) in list(self._cache.items())
+            if now - timestamp <= ttl
+        ]
 
     def clear(self) -> None:
         """Clear all cache entries."""
         self._cache.clear()
+        self._sizes.clear()
+        self._index.clear()
+        self._groups.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        """Return occupancy against the byte budget for /metrics."""
+        return {
+            "entries": len(self._cache),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
 
     @staticmethod
     def make_key(from_currency: str, to: str, start: str, end: str) -> str:
@@ -1,8 +1,15 @@
 """Business logic for computing FX rate summaries."""
 
-from typing import Optional, Literal
+from collections.abc import Mapping
+from datetime import date
+from typing import Literal
 
-from app.models import Totals, DailyRate, Pattern, RatePoint
+from app.models import DailyRate, Pattern, PeriodRate, RatePoint, Totals
+from app.services.rate_series import RateSeries
+
+PERIOD_BREAKDOWNS = ("week", "month", "quarter", "year")
+# Totals and pattern fields computed from the first and last points alone
+ENDPOINT_FIELDS = frozenset(("start_rate", "end_rate", "total_pct_change", "direction"))
 
 
 class Calculator:
@@ -10,41 +17,180 @@ class Calculator:
 
     @staticmethod
     def compute_summary(
-        rates: dict[str, float],
+        rates: Mapping,
         breakdown: Literal["none", "day"]
     ) -> tuple[Totals, list[DailyRate], Pattern]:
         """
         Compute complete summary statistics.
 
         Args:
-            rates: Dictionary mapping date strings to rates
+            rates: RateSeries (or mapping of date strings to rates)
             breakdown: Whether to include daily breakdown
 
         Returns:
             Tuple of (totals, daily, pattern)
         """
-        sorted_dates = sorted(rates.keys())
+        series = RateSeries.from_mapping(rates)
 
-        totals = Calculator._compute_totals(rates, sorted_dates)
-        daily = Calculator._compute_daily(rates, sorted_dates) if breakdown == "day" else []
-        pattern = Calculator._compute_pattern(rates, sorted_dates)
+        totals = Calculator._compute_totals(series)
+        daily = Calculator._compute_daily(series) if breakdown == "day" else []
+        pattern = Calculator._compute_pattern(series)
 
         return totals, daily, pattern
 
     @staticmethod
-    def _compute_totals(rates: dict[str, float], sorted_dates: list[str]) -> Totals:
+    def compute_fields(
+        rates: Mapping,
+        section: Literal["totals", "pattern"],
+        names: list[str]
+    ) -> dict:
+        """
+        Compute only selected fields of the totals or pattern section.
+
+        Fields in ENDPOINT_FIELDS read only the first and last points, so
+        callers requesting just those may pass a series holding only the
+        endpoints (see EncodedSeries.endpoints); mean_rate, min_rate and
+        max_rate need the full series.
+
+        Args:
+            rates: RateSeries (or mapping of date strings to rates)
+            section: "totals" or "pattern"
+            names: Field names within the section
+
+        Returns:
+            Dict of the requested fields in the section's JSON shape
+        """
+        series = RateSeries.from_mapping(rates)
+        values = series.rates
+        start_rate = values[0]
+        end_rate = values[-1]
+
+        fields = {}
+        for name in names:
+            if name == "start_rate":
+                fields[name] = start_rate
+            elif name == "end_rate":
+                fields[name] = end_rate
+            elif name == "total_pct_change":
+                # Handle division by zero
+                fields[name] = None if start_rate == 0 else ((end_rate - start_rate) / start_rate) * 100
+            elif name == "mean_rate":
+                fields[name] = sum(values) / len(values)
+            elif name == "direction":
+                fields[name] = "up" if end_rate > start_rate else "down" if end_rate < start_rate else "flat"
+            elif name in ("min_rate", "max_rate"):
+                pick = min if name == "min_rate" else max
+                idx = pick(range(len(values)), key=values.__getitem__)
+                fields[name] = RatePoint(date=series.date(idx), rate=values[idx]).model_dump()
+            else:
+                raise ValueError(f"Unknown {section} field: {name}")
+
+        return fields
+
+    @staticmethod
+    def compute_periods(
+        rates: Mapping,
+        breakdown: Literal["week", "month", "quarter", "year"]
+    ) -> list[PeriodRate]:
+        """
+        Resample rates into calendar periods in a single pass.
+
+        Args:
+            rates: RateSeries (or mapping of date strings to rates)
+            breakdown: Period length to group by
+
+        Returns:
+            List of PeriodRate buckets in chronological order
+        """
+        series = RateSeries.from_mapping(rates)
+        periods = []
+        label = None
+        first = 0
+
+        for i, ordinal in enumerate(series.ordinals):
+            current = Calculator._period_label(ordinal, breakdown)
+            if current != label and i > first:
+                periods.append(Calculator._make_period(label, series, first, i))
+                first = i
+            label = current
+
+        if len(series) > first:
+            periods.append(Calculator._make_period(label, series, first, len(series)))
+
+        return periods
+
+    @staticmethod
+    def _period_label(ordinal: int, breakdown: str) -> str:
+        """
+        Build the period label a date belongs to.
+
+        Args:
+            ordinal: Day ordinal
+            breakdown: Period length
+
+        Returns:
+            Label such as "2025-W27", "2025-07", "2025-Q3" or "2025"
+        """
+        day = date.fromordinal(ordinal)
+        if breakdown == "week":
+            year, week, _ = day.isocalendar()
+            return f"{year}-W{week:02d}"
+        if breakdown == "month":
+            return f"{day.year}-{day.month:02d}"
+        if breakdown == "quarter":
+            return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+        return str(day.year)
+
+    @staticmethod
+    def _make_period(label: str, series: RateSeries, lo: int, hi: int) -> PeriodRate:
+        """
+        Build OHLC-style statistics for one period.
+
+        Args:
+            label: Period label
+            series: Full rate series
+            lo: Index of the first point in the period
+            hi: Index past the last point in the period
+
+        Returns:
+            PeriodRate for the period
+        """
+        values = series.rates[lo:hi]
+        open_rate = values[0]
+        close_rate = values[-1]
+
+        # Handle division by zero
+        if open_rate == 0:
+            pct_change = None
+        else:
+            pct_change = ((close_rate - open_rate) / open_rate) * 100
+
+        return PeriodRate(
+            period=label,
+            start_date=series.date(lo),
+            end_date=series.date(hi - 1),
+            open=open_rate,
+            close=close_rate,
+            min=min(values),
+            max=max(values),
+            mean=sum(values) / len(values),
+            pct_change=pct_change,
+            count=len(values)
+        )
+
+    @staticmethod
+    def _compute_totals(series: RateSeries) -> Totals:
         """
         Compute total statistics.
 
         Args:
-            rates: Rate dictionary
-            sorted_dates: Sorted list of date strings
+            series: Sorted rate series
 
         Returns:
             Totals object with aggregate statistics
         """
-        start_rate = rates[sorted_dates[0]]
-        end_rate = rates[sorted_dates[-1]]
+        start_rate = series.rates[0]
+        end_rate = series.rates[-1]
 
         # Handle division by zero
         if start_rate == 0:
@@ -52,7 +198,7 @@ class Calculator:
         else:
             total_pct_change = ((end_rate - start_rate) / start_rate) * 100
 
-        mean_rate = sum(rates.values()) / len(rates)
+        mean_rate = sum(series.rates) / len(series)
 
         return Totals(
             start_rate=start_rate,
@@ -62,55 +208,53 @@ class Calculator:
         )
 
     @staticmethod
-    def _compute_daily(rates: dict[str, float], sorted_dates: list[str]) -> list[DailyRate]:
+    def _compute_daily(series: RateSeries, lo: int = 0, hi: int | None = None) -> list[DailyRate]:
         """
         Compute daily rate changes.
 
         Args:
-            rates: Rate dictionary
-            sorted_dates: Sorted list of date strings
+            series: Sorted rate series
+            lo: Index of the first point to include
+            hi: Index past the last point to include (default: end of series)
 
         Returns:
             List of DailyRate objects with pct_change vs previous day
         """
+        hi = len(series) if hi is None else hi
         daily = []
+        prev_rate = series.rates[lo - 1] if lo > 0 else None
 
-        for i, date in enumerate(sorted_dates):
-            rate = rates[date]
-
-            # First day has no previous rate
-            if i == 0:
+        for i, rate in enumerate(series.rates[lo:hi], lo):
+            date_str = series.date(i)
+            # First day has no previous rate; handle division by zero
+            if prev_rate is None or prev_rate == 0:
                 pct_change = None
             else:
-                prev_rate = rates[sorted_dates[i - 1]]
-                # Handle division by zero
-                if prev_rate == 0:
-                    pct_change = None
-                else:
-                    pct_change = ((rate - prev_rate) / prev_rate) * 100
+                pct_change = ((rate - prev_rate) / prev_rate) * 100
 
             daily.append(DailyRate(
-                date=date,
+                date=date_str,
                 rate=rate,
                 pct_change=pct_change
             ))
+            prev_rate = rate
 
         return daily
 
     @staticmethod
-    def _compute_pattern(rates: dict[str, float], sorted_dates: list[str]) -> Pattern:
+    def _compute_pattern(series: RateSeries) -> Pattern:
         """
         Analyze rate pattern over the period.
 
         Args:
-            rates: Rate dictionary
-            sorted_dates: Sorted list of date strings
+            series: Sorted rate series
 
         Returns:
             Pattern object with direction and min/max
         """
-        start_rate = rates[sorted_dates[0]]
-        end_rate = rates[sorted_dates[-1]]
+        rates = series.rates
+        start_rate = rates[0]
+        end_rate = rates[-1]
 
         # Determine direction
         if end_rate > start_rate:
@@ -121,11 +265,11 @@ class Calculator:
             direction = "flat"
 
         # Find min and max with dates
-        min_date = min(rates.keys(), key=lambda d: rates[d])
-        max_date = max(rates.keys(), key=lambda d: rates[d])
+        min_idx = min(range(len(rates)), key=rates.__getitem__)
+        max_idx = max(range(len(rates)), key=rates.__getitem__)
 
         return Pattern(
             direction=direction,
-            min_rate=RatePoint(date=min_date, rate=rates[min_date]),
-            max_rate=RatePoint(date=max_date, rate=rates[max_date])
+            min_rate=RatePoint(date=series.date(min_idx), rate=rates[min_idx]),
+            max_rate=RatePoint(date=series.date(max_idx), rate=rates[max_idx])
         )
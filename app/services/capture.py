@@ -0,0 +1,185 @@
+"""Opt-in capture of anonymized /summary traffic for replay."""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Mapping
+from typing import IO
+
+from app.config import (
+    CAPTURE_FLUSH_INTERVAL_SECONDS,
+    CAPTURE_MAX_BUFFERED,
+    CAPTURE_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+# Query parameters worth replaying; anything else is not recorded
+CAPTURED_PARAMS = (
+    "start",
+    "end",
+    "breakdown",
+    "from",
+    "to",
+    "analytics",
+    "window",
+    "allow_fallback",
+    "distribution",
+    "fields",
+    "limit",
+    "cursor",
+)
+
+
+class TrafficRecorder:
+    """
+    Record /summary parameters and arrival times to a compact log.
+
+    Each line is {"t": epoch ms, "c": client token, "q": params}, gzipped
+    when the path ends in .gz. Client addresses are replaced by a salted
+    hash that is stable within one capture, so per-client behavior such as
+    rate limiting replays faithfully without storing addresses. Recording
+    only appends to a bounded deque; a thread writes batches to disk.
+    """
+
+    def __init__(
+        self,
+        path: str = CAPTURE_PATH,
+        interval: float = CAPTURE_FLUSH_INTERVAL_SECONDS,
+        max_buffered: int = CAPTURE_MAX_BUFFERED,
+    ):
+        """
+        Initialize recorder.
+
+        Args:
+            path: Log file; "{pid}" is replaced so pre-forked workers write
+                separate files
+            interval: Seconds between writes
+            max_buffered: Records held before new ones are dropped
+        """
+        self.path = path
+        self.interval = interval
+        self.max_buffered = max_buffered
+        self.recorded = 0
+        self.dropped = 0
+        self._buffer: deque[tuple[int, str, dict]] = deque()
+        self._salt = b""
+        self._tokens: dict[str, str] = {}
+        self._file: IO[str] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether capture is on."""
+        return self._file is not None
+
+    def _token(self, client: str) -> str:
+        """Map a client address to its anonymous token."""
+        token = self._tokens.get(client)
+        if token is None:
+            token = hashlib.blake2b(
+                client.encode(), key=self._salt, digest_size=4
+            ).hexdigest()
+            self._tokens[client] = token
+        return token
+
+    def record(self, client: str, query: Mapping[str, str]) -> None:
+        """
+        Record one request if capture is on.
+
+        Args:
+            client: Client address
+            query: Request query parameters
+        """
+        if self._file is None:
+            return
+        if len(self._buffer) >= self.max_buffered:
+            self.dropped += 1
+            return
+        params = {name: query[name] for name in CAPTURED_PARAMS if name in query}
+        self._buffer.append((time.time_ns() // 1_000_000, self._token(client), params))
+        self.recorded += 1
+
+    def flush(self) -> None:
+        """Write buffered records."""
+        if self._file is None:
+            return
+        lines = []
+        while self._buffer:
+            t, client, params = self._buffer.popleft()
+            lines.append(
+                json.dumps({"t": t, "c": client, "q": params}, separators=(",", ":"))
+                + "\n"
+            )
+        if lines:
+            self._file.writelines(lines)
+            self._file.flush()
+
+    def _run(self) -> None:
+        """Write periodically until stopped."""
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except OSError:
+                logger.warning("Writing traffic capture failed", exc_info=True)
+
+    def start(self) -> None:
+        """Open the log with a fresh anonymization salt and start writing."""
+        if self._file is not None:
+            return
+        path = self.path.replace("{pid}", str(os.getpid()))
+        opener = gzip.open if path.endswith(".gz") else open
+        self._file = opener(path, "at")
+        self._salt = os.urandom(16)
+        self._tokens.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="traffic-capture", daemon=True
+        )
+        self._thread.start()
+        logger.info("Capturing /summary traffic to %s", path)
+
+    def stop(self) -> None:
+        """Stop writing, flush the rest and close the log."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict:
+        """Return capture counters for /metrics."""
+        return {
+            "running": self.running,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "buffered": len(self._buffer),
+        }
+
+
+def read_capture(paths: Iterable[str]) -> list[dict]:
+    """
+    Load capture logs, merged in arrival order.
+
+    Args:
+        paths: Log files (plain or gzipped), e.g. one per worker
+
+    Returns:
+        Records sorted by arrival time
+    """
+    records = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    records.sort(key=lambda record: record["t"])
+    return records
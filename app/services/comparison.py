@@ -0,0 +1,102 @@
+"""Date-aligned comparison of several quote currencies against one base."""
+
+import itertools
+
+from app.models import PairStats
+from app.services.rate_series import RateSeries
+
+
+class PairComparison:
+    """Per-pair change and volatility plus pairwise return correlation."""
+
+    @staticmethod
+    def align(
+        series_by_quote: dict[str, RateSeries],
+    ) -> tuple[list[int], list[list[float]]]:
+        """
+        Inner-join series on date into a row-major matrix.
+
+        Args:
+            series_by_quote: Rate series by quote currency
+
+        Returns:
+            Tuple of (day ordinals, rows of rates in quote order)
+        """
+        columns = [dict(zip(s.ordinals, s.rates)) for s in series_by_quote.values()]
+        if not columns:
+            return [], []
+        common = set(columns[0]).intersection(*columns[1:])
+        ordinals = sorted(common)
+        return ordinals, [[column[o] for column in columns] for o in ordinals]
+
+    @staticmethod
+    def compute(series_by_quote: dict[str, RateSeries]) -> dict | None:
+        """
+        Compare quotes over the dates on which all of them have a rate.
+
+        Change, volatility and correlation sums are accumulated for every
+        column in one pass over the aligned matrix. Days whose return is
+        undefined for any quote (previous rate is zero) are skipped for all.
+
+        Args:
+            series_by_quote: Rate series by quote currency
+
+        Returns:
+            Dict with "points", "pairs" (PairStats by quote) and "correlation"
+            (quote -> quote -> coefficient), or None if no date is shared
+        """
+        quotes = list(series_by_quote)
+        ordinals, rows = PairComparison.align(series_by_quote)
+        if not rows:
+            return None
+
+        k = len(quotes)
+        sums = [0.0] * k
+        squares = [0.0] * k
+        cross = [[0.0] * k for _ in range(k)]
+        n = 0
+
+        for prev, cur in itertools.pairwise(rows):
+            if 0 in prev:
+                continue
+            returns = [((c - p) / p) * 100 for p, c in zip(prev, cur)]
+            n += 1
+            for i, x in enumerate(returns):
+                sums[i] += x
+                squares[i] += x * x
+                row = cross[i]
+                for j in range(i + 1, k):
+                    row[j] += x * returns[j]
+
+        # Centered sums of squares and cross products
+        ss = [squares[i] - sums[i] * sums[i] / n if n else 0.0 for i in range(k)]
+
+        pairs = {}
+        for i, quote in enumerate(quotes):
+            start_rate = rows[0][i]
+            end_rate = rows[-1][i]
+            pairs[quote] = PairStats(
+                quote=quote,
+                start_rate=start_rate,
+                end_rate=end_rate,
+                # Handle division by zero
+                pct_change=None
+                if start_rate == 0
+                else ((end_rate - start_rate) / start_rate) * 100,
+                volatility=(max(ss[i], 0.0) / (n - 1)) ** 0.5 if n >= 2 else None,
+            )
+
+        correlation: dict[str, dict[str, float | None]] = {q: {} for q in quotes}
+        for i, a in enumerate(quotes):
+            correlation[a][a] = 1.0 if n >= 2 and ss[i] > 0 else None
+            for j in range(i + 1, k):
+                b = quotes[j]
+                value = None
+                if n >= 2 and ss[i] > 0 and ss[j] > 0:
+                    value = (cross[i][j] - sums[i] * sums[j] / n) / (
+                        ss[i] * ss[j]
+                    ) ** 0.5
+                    value = max(-1.0, min(1.0, value))
+                correlation[a][b] = correlation[b][a] = value
+
+        return {"points": len(ordinals), "pairs": pairs, "correlation": correlation}
@@ -0,0 +1,99 @@
+"""Bounded worker pool for CPU-heavy summary work."""
+
+import asyncio
+import contextvars
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.config import (
+    COMPUTE_OFFLOAD_MIN_POINTS,
+    COMPUTE_POOL_MAX_PENDING,
+    COMPUTE_POOL_WORKERS,
+)
+from app.services.admission import OverloadedError
+
+
+class ComputePool:
+    """Run large computations off the event loop with backpressure."""
+
+    def __init__(
+        self,
+        max_workers: int = COMPUTE_POOL_WORKERS,
+        max_pending: int = COMPUTE_POOL_MAX_PENDING,
+        threshold: int = COMPUTE_OFFLOAD_MIN_POINTS,
+    ):
+        """
+        Initialize pool.
+
+        Threads are used rather than processes: the work reads cache entries
+        shared with the event loop, which processes would have to pickle on
+        every call.
+
+        Args:
+            max_workers: Worker threads
+            max_pending: Offloaded jobs allowed at once (running or queued)
+            threshold: Minimum job size, in data points, worth offloading
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.threshold = threshold
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="compute"
+        )
+        self.pending = 0
+        self.offloaded = 0
+        self.inline = 0
+        self.rejected = 0
+
+    async def run(self, size: int, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn inline for small jobs, or in the pool for large ones.
+
+        Args:
+            size: Job size in data points
+            fn: Function to call
+            *args: Arguments for fn
+
+        Returns:
+            Result of fn
+
+        Raises:
+            OverloadedError: If the pool already has max_pending jobs
+        """
+        if size < self.threshold:
+            self.inline += 1
+            return fn(*args)
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise OverloadedError("Compute pool saturated", 1)
+
+        self.pending += 1
+        self.offloaded += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # Run in a copy of the caller's context so tracing spans nest correctly
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(context.run, fn, *args)
+            )
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        """Return pool counters, including current queue depth."""
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "queue_depth": max(0, self.pending - self.max_workers),
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "rejected": self.rejected,
+            "threshold": self.threshold,
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and release worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
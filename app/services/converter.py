@@ -0,0 +1,409 @@
+"""Streaming bulk conversion of amounts between currencies."""
+
+import asyncio
+import csv
+import io
+import json
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, nullcontext
+from datetime import date
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Literal
+
+from app.config import (
+    CONVERT_BATCH_SIZE,
+    CONVERT_LOOKBACK_DAYS,
+    CONVERT_RETRY_BACKOFF_SECONDS,
+    CONVERT_RETRY_MAX_BACKOFF_SECONDS,
+    CONVERT_SPOOL_MAX_BYTES,
+)
+from app.services.admission import OverloadedError, UpstreamLimiter
+from app.services.fx_client import FXClient, ServiceUnavailableError
+from app.services.rate_series import RateSeries
+from app.utils.validators import format_date_ordinal, parse_date_ordinal
+
+CSV_FIELDS = [
+    "date",
+    "amount",
+    "currency",
+    "to",
+    "rate",
+    "rate_date",
+    "converted",
+    "error",
+]
+
+GapPolicy = Literal["previous", "next", "error"]
+
+
+class RateTable:
+    """Dense per-day rate lookup indexed by date ordinal."""
+
+    def __init__(
+        self, series: RateSeries, first: int, last: int, gap_policy: GapPolicy
+    ):
+        """
+        Build the lookup table for a covered ordinal range.
+
+        Args:
+            series: Rates fetched for the range
+            first: First covered date ordinal
+            last: Last covered date ordinal
+            gap_policy: Which fixing to use for dates without one
+        """
+        self.first = first
+        self.last = last
+        self.series = series
+
+        # Each slot holds the index of the applicable point in series
+        by_ordinal = {ordinal: i for i, ordinal in enumerate(series.ordinals)}
+        size = last - first + 1
+        self._slots: list[int | None] = [None] * size
+
+        carried = None
+        if gap_policy == "next":
+            for i in range(size - 1, -1, -1):
+                carried = by_ordinal.get(first + i, carried)
+                self._slots[i] = carried
+        else:
+            for i in range(size):
+                exact = by_ordinal.get(first + i)
+                if gap_policy == "error":
+                    self._slots[i] = exact
+                else:
+                    carried = carried if exact is None else exact
+                    self._slots[i] = carried
+
+    def covers(self, first: int, last: int) -> bool:
+        """Check whether the table covers an ordinal range."""
+        return self.first <= first and last <= self.last
+
+    def lookup(self, ordinal: int) -> tuple[float, str] | None:
+        """
+        Look up the rate for a date ordinal.
+
+        Args:
+            ordinal: Date ordinal inside the covered range
+
+        Returns:
+            Tuple of (rate, fixing_date) or None if no fixing applies
+        """
+        index = self._slots[ordinal - self.first]
+        if index is None:
+            return None
+        return self.series.rates[index], self.series.date(index)
+
+
+class BulkConverter:
+    """Convert streams of (date, amount, currency) records in bounded memory."""
+
+    def __init__(
+        self,
+        fx_client: FXClient,
+        to: str,
+        gap_policy: GapPolicy = "previous",
+        limiter: UpstreamLimiter | None = None,
+    ):
+        """
+        Initialize converter.
+
+        Args:
+            fx_client: Client used to fetch rate series
+            to: Target currency code
+            gap_policy: Which fixing to use for weekends and holidays
+            limiter: Upstream admission every fetch goes through, if any
+        """
+        self.fx_client = fx_client
+        self.to = to
+        self.gap_policy = gap_policy
+        self.limiter = limiter
+        self._tables: dict[str, RateTable] = {}
+        # Currency -> (consecutive failures, monotonic time of next attempt)
+        self._failed: dict[str, tuple[int, float]] = {}
+
+    async def convert(self, records: AsyncIterator[dict]) -> AsyncIterator[dict]:
+        """
+        Convert records batch by batch.
+
+        Only one batch of records is held in memory at a time. Rate series
+        are fetched once per currency and only extended when a batch falls
+        outside the range already loaded.
+
+        Args:
+            records: Async iterator of dicts with date, amount and currency
+
+        Yields:
+            Records extended with rate, rate_date and converted, or error
+        """
+        batch = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= CONVERT_BATCH_SIZE:
+                for converted in await self._convert_batch(batch):
+                    yield converted
+                batch = []
+
+        if batch:
+            for converted in await self._convert_batch(batch):
+                yield converted
+
+    async def _convert_batch(self, batch: list[dict]) -> list[dict]:
+        """
+        Convert one batch of records.
+
+        Args:
+            batch: Raw records
+
+        Returns:
+            Converted records in input order
+        """
+        parsed = [self._parse(record) for record in batch]
+
+        # Collect the ordinal span needed per currency
+        spans: dict[str, tuple[int, int]] = {}
+        for item in parsed:
+            if "error" in item or item["currency"] == self.to:
+                continue
+            ordinal = item["ordinal"]
+            low, high = spans.get(item["currency"], (ordinal, ordinal))
+            spans[item["currency"]] = (min(low, ordinal), max(high, ordinal))
+
+        for currency, (low, high) in spans.items():
+            await self._ensure_table(currency, low, high)
+
+        return [self._apply(item) for item in parsed]
+
+    def _parse(self, record: dict) -> dict:
+        """
+        Validate a raw record.
+
+        Args:
+            record: Raw record with date, amount and currency
+
+        Returns:
+            Normalized record, with an error field if it is invalid
+        """
+        out = {
+            "date": record.get("date"),
+            "amount": record.get("amount"),
+            "currency": str(record.get("currency") or "").upper(),
+            "to": self.to,
+        }
+        try:
+            out["ordinal"] = parse_date_ordinal(out["date"])
+            out["amount"] = float(out["amount"])
+        except (TypeError, ValueError):
+            out["error"] = "invalid date or amount"
+            return out
+        if not out["currency"]:
+            out["error"] = "missing currency"
+        return out
+
+    async def _ensure_table(self, currency: str, low: int, high: int) -> None:
+        """
+        Make sure the rate table for a currency covers an ordinal range.
+
+        After a failed fetch the currency is not retried until a backoff
+        has passed, doubling with each consecutive failure up to
+        CONVERT_RETRY_MAX_BACKOFF_SECONDS; records needing it meanwhile
+        get an error.
+
+        Args:
+            currency: Source currency code
+            low: First ordinal needed
+            high: Last ordinal needed
+        """
+        failure = self._failed.get(currency)
+        if failure is not None and time.monotonic() < failure[1]:
+            return
+
+        table = self._tables.get(currency)
+        if table is not None and table.covers(low, high):
+            return
+
+        # Look around the range so weekend and holiday gaps can be filled
+        today = date.today().toordinal()
+        first = low - CONVERT_LOOKBACK_DAYS
+        last = min(high + CONVERT_LOOKBACK_DAYS, today)
+        series = table.series if table is not None else RateSeries()
+
+        segments = [(first, last)]
+        if table is not None:
+            first, last = min(first, table.first), max(last, table.last)
+            segments = [(first, table.first - 1), (table.last + 1, last)]
+
+        try:
+            for seg_first, seg_last in segments:
+                if seg_first > seg_last:
+                    continue
+                async with (
+                    self.limiter.slot() if self.limiter is not None else nullcontext()
+                ):
+                    fetched, _ = await self.fx_client.fetch_rates(
+                        format_date_ordinal(seg_first),
+                        format_date_ordinal(seg_last),
+                        currency,
+                        self.to,
+                    )
+                series = series.merge(RateSeries.from_mapping(fetched))
+        except (ServiceUnavailableError, OverloadedError):
+            failures = 1 if failure is None else failure[0] + 1
+            backoff = min(
+                CONVERT_RETRY_BACKOFF_SECONDS * 2 ** (failures - 1),
+                CONVERT_RETRY_MAX_BACKOFF_SECONDS,
+            )
+            self._failed[currency] = (failures, time.monotonic() + backoff)
+            return
+
+        self._failed.pop(currency, None)
+        self._tables[currency] = RateTable(
+            series, first, max(last, high), self.gap_policy
+        )
+
+    def _apply(self, item: dict) -> dict:
+        """
+        Apply the looked-up rate to a parsed record.
+
+        Args:
+            item: Parsed record
+
+        Returns:
+            Output record
+        """
+        ordinal = item.pop("ordinal", None)
+        if "error" in item:
+            return item
+
+        if item["currency"] == self.to:
+            found = (1.0, item["date"])
+        else:
+            table = self._tables.get(item["currency"])
+            if table is None or not table.covers(ordinal, ordinal):
+                item["error"] = "rates unavailable"
+                return item
+            found = table.lookup(ordinal)
+
+        if found is None:
+            item["error"] = "no fixing for date"
+            return item
+
+        rate, rate_date = found
+        item["rate"] = rate
+        item["rate_date"] = rate_date
+        item["converted"] = item["amount"] * rate
+        return item
+
+
+@asynccontextmanager
+async def spool_upload(chunks: AsyncIterator[bytes]) -> AsyncIterator[BinaryIO]:
+    """
+    Buffer an upload to a spooled temporary file, closed on exit.
+
+    Small uploads stay in memory; larger ones roll over to disk, so the body
+    can be read independently of the response's receive loop. Writes run in
+    a thread since they may hit the disk.
+
+    Args:
+        chunks: Async iterator of raw body chunks
+
+    Yields:
+        File object positioned at the start of the upload
+    """
+    with SpooledTemporaryFile(max_size=CONVERT_SPOOL_MAX_BYTES) as spool:
+        async for chunk in chunks:
+            await asyncio.to_thread(spool.write, chunk)
+        spool.seek(0)
+        yield spool
+
+
+async def iter_file(
+    file: BinaryIO, chunk_size: int = 64 * 1024
+) -> AsyncIterator[bytes]:
+    """
+    Read a file in chunks, each read in a thread.
+
+    Args:
+        file: Binary file object
+        chunk_size: Bytes per chunk
+
+    Yields:
+        Raw chunks
+    """
+    while chunk := await asyncio.to_thread(file.read, chunk_size):
+        yield chunk
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a byte stream into decoded, non-empty lines.
+
+    Undecodable bytes are replaced so the affected record fails validation
+    instead of aborting the stream.
+
+    Args:
+        chunks: Async iterator of raw body chunks
+
+    Yields:
+        Lines without trailing newline
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line.decode("utf-8", errors="replace").rstrip("\r")
+    if buffer.strip():
+        yield buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+async def parse_records(
+    lines: AsyncIterator[str], fmt: Literal["csv", "ndjson"]
+) -> AsyncIterator[dict]:
+    """
+    Parse CSV (with header row) or NDJSON lines into record dicts.
+
+    Args:
+        lines: Async iterator of text lines
+        fmt: Input format
+
+    Yields:
+        Record dicts; unparsable lines yield an empty dict
+    """
+    header = None
+    async for line in lines:
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = {}
+            yield record if isinstance(record, dict) else {}
+            continue
+
+        row = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip().lower() for name in row]
+            continue
+        yield dict(zip(header, row))
+
+
+def format_record(record: dict, fmt: Literal["csv", "ndjson"]) -> str:
+    """
+    Serialize an output record as one CSV or NDJSON line.
+
+    Args:
+        record: Output record
+        fmt: Output format
+
+    Returns:
+        Line including trailing newline
+    """
+    if fmt == "ndjson":
+        return json.dumps(record) + "\n"
+
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(
+        [record.get(field, "") for field in CSV_FIELDS]
+    )
+    return buffer.getvalue()
@@ -0,0 +1,277 @@
+"""Production diagnostics: event-loop lag, slow callbacks and memory."""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from array import array
+from collections import deque
+from typing import Any
+
+from pydantic import BaseModel
+
+from app.config import (
+    LOOP_LAG_BUCKETS_MS,
+    LOOP_LAG_INTERVAL_SECONDS,
+    SLOW_CALLBACK_HISTORY,
+    SLOW_CALLBACK_SECONDS,
+    TRACEMALLOC_FRAMES,
+)
+from app.services.cache import InMemoryCache
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Measure event-loop lag continuously and watch for blocking callbacks.
+
+    A task sleeps for a fixed interval and records how late it wakes up into
+    a histogram. A watchdog thread checks that the task keeps ticking; when
+    the loop has been stuck for longer than the slow-callback threshold it
+    captures the loop thread's current stack, so the blocking code is named
+    while it is still running.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_INTERVAL_SECONDS,
+        buckets_ms: tuple[float, ...] = LOOP_LAG_BUCKETS_MS,
+        slow_threshold: float = SLOW_CALLBACK_SECONDS,
+        history: int = SLOW_CALLBACK_HISTORY,
+    ):
+        """
+        Initialize monitor.
+
+        Args:
+            interval: Seconds between lag samples
+            buckets_ms: Upper bounds of histogram buckets in milliseconds
+            slow_threshold: Seconds of loop stall reported as a slow callback
+            history: Slow callbacks kept for /diagnostics
+        """
+        self.interval = interval
+        self.buckets_ms = buckets_ms
+        self.slow_threshold = slow_threshold
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.samples = 0
+        self.max_ms = 0.0
+        self.slow_callbacks: deque[dict] = deque(maxlen=history)
+        self._beat = time.monotonic()
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def record(self, lag_ms: float) -> None:
+        """
+        Add one lag sample to the histogram.
+
+        Args:
+            lag_ms: Milliseconds the loop woke up late
+        """
+        i = 0
+        while i < len(self.buckets_ms) and lag_ms > self.buckets_ms[i]:
+            i += 1
+        self.counts[i] += 1
+        self.samples += 1
+        self.max_ms = max(self.max_ms, lag_ms)
+
+    async def _sample(self) -> None:
+        """Sample lag until cancelled."""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            self.record(max(now - expected, 0.0) * 1000)
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop's stack once per stall."""
+        reported_beat = None
+        while not self._stop.wait(self.slow_threshold / 2):
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.slow_threshold or beat == reported_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            reported_beat = beat
+            stack = "".join(traceback.format_stack(frame))
+            self.slow_callbacks.append(
+                {
+                    "at": time.time(),
+                    "blocked_ms": round(stalled * 1000, 1),
+                    "stack": stack,
+                }
+            )
+            logger.warning(
+                "Event loop blocked for %.0f ms in:\n%s", stalled * 1000, stack
+            )
+
+    def start(self) -> None:
+        """Start sampling on the running loop and the watchdog thread."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop sampling and the watchdog."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def stats(self) -> dict:
+        """Return the lag histogram and recent slow callbacks."""
+        labels = [f"le_{b:g}ms" for b in self.buckets_ms] + ["inf"]
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "max_ms": round(self.max_ms, 1),
+            "histogram": dict(zip(labels, self.counts)),
+            "slow_callbacks": list(self.slow_callbacks),
+        }
+
+
+class MemoryProfiler:
+    """On-demand tracemalloc snapshots and diffs against a baseline."""
+
+    def __init__(self, frames: int = TRACEMALLOC_FRAMES):
+        """
+        Initialize profiler.
+
+        Args:
+            frames: Stack frames stored per allocation while tracing
+        """
+        self.frames = frames
+        self._baseline: tracemalloc.Snapshot | None = None
+
+    @property
+    def tracing(self) -> bool:
+        """Whether tracemalloc is running."""
+        return tracemalloc.is_tracing()
+
+    def snapshot(self) -> dict:
+        """
+        Start tracing if needed and take the baseline snapshot.
+
+        Tracing costs CPU and memory, so it only runs between snapshot()
+        and stop().
+
+        Returns:
+            Traced memory at the baseline
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._baseline = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        return {"tracing": True, "current_bytes": current, "peak_bytes": peak}
+
+    def diff(self, limit: int = 20) -> dict:
+        """
+        Compare current allocations with the baseline.
+
+        Args:
+            limit: Number of top differences to return
+
+        Returns:
+            Top allocation differences grouped by line
+
+        Raises:
+            RuntimeError: If no baseline was taken
+        """
+        if self._baseline is None or not tracemalloc.is_tracing():
+            raise RuntimeError("Take a snapshot first")
+        current = tracemalloc.take_snapshot()
+        stats = current.compare_to(self._baseline, "lineno")[:limit]
+        return {
+            "top": [
+                {
+                    "location": str(stat.traceback[0]) if stat.traceback else "?",
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats
+            ]
+        }
+
+    def stop(self) -> dict:
+        """Stop tracing and drop the baseline."""
+        self._baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return {"tracing": False}
+
+
+def deep_sizeof(obj: Any, seen: set[int] | None = None) -> int:
+    """
+    Estimate the memory held by a cache value.
+
+    Follows dicts, sequences, pydantic models and slotted objects such as
+    RateSeries; shared objects are counted once. Containers are copied
+    before they are walked, so this can run in a thread while the event
+    loop keeps changing them.
+
+    Args:
+        obj: Object to measure
+        seen: Ids already counted
+
+    Returns:
+        Approximate size in bytes
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, array)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(
+            deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in list(obj.items())
+        )
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(deep_sizeof(item, seen) for item in tuple(obj))
+    if isinstance(obj, BaseModel):
+        return size + deep_sizeof(obj.__dict__, seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def cache_memory_by_pair(cache: InMemoryCache) -> dict[str, dict]:
+    """
+    Break cache memory down by currency pair.
+
+    Args:
+        cache: Cache to inspect
+
+    Returns:
+        Entry count and approximate bytes by pair (e.g. "EUR/USD"), largest first
+    """
+    pairs: dict[str, dict] = {}
+    for key, value in cache.items():
+        parts = key.removeprefix("compare_").split("_")
+        pair = f"{parts[0]}/{parts[1]}" if len(parts) >= 2 else key
+        usage = pairs.setdefault(pair, {"entries": 0, "bytes": 0})
+        usage["entries"] += 1
+        usage["bytes"] += deep_sizeof(key) + deep_sizeof(value)
+    return dict(sorted(pairs.items(), key=lambda item: item[1]["bytes"], reverse=True))
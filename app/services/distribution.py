@@ -0,0 +1,295 @@
+"""Rate distribution statistics: exact for short ranges, sketched for long ones."""
+
+import math
+from bisect import bisect_right
+from collections.abc import Callable, Hashable, Iterable
+from datetime import date
+
+from app.config import (
+    DISTRIBUTION_BINS,
+    DISTRIBUTION_EXACT_MAX_POINTS,
+    DISTRIBUTION_SKETCH_ACCURACY,
+)
+from app.models import Distribution, HistogramBin
+from app.services.rate_series import RateSeries
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error (DDSketch-style).
+
+    Positive values fall into logarithmic buckets of ratio gamma, so any
+    quantile is answered within the configured relative accuracy and two
+    sketches merge by adding bucket counts.
+    """
+
+    __slots__ = ("_log_gamma", "buckets", "count", "gamma", "max", "min", "zeros")
+
+    def __init__(self, accuracy: float = DISTRIBUTION_SKETCH_ACCURACY):
+        """
+        Initialize empty sketch.
+
+        Args:
+            accuracy: Relative accuracy of quantile estimates
+        """
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add_all(self, values: Iterable[float]) -> "QuantileSketch":
+        """
+        Add values to the sketch.
+
+        Args:
+            values: Rates to add (non-positive rates share one bucket)
+
+        Returns:
+            This sketch
+        """
+        buckets = self.buckets
+        for value in values:
+            self.count += 1
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+            if value <= 0:
+                self.zeros += 1
+                continue
+            key = math.ceil(math.log(value) / self._log_gamma)
+            buckets[key] = buckets.get(key, 0) + 1
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Add another sketch's counts into this one.
+
+        Args:
+            other: Sketch built with the same accuracy
+
+        Returns:
+            This sketch
+        """
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _value(self, key: int) -> float:
+        """Representative value of a bucket, clamped to the observed range."""
+        value = 2 * self.gamma**key / (self.gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    def _points(self) -> list[tuple[float, int]]:
+        """Return (representative value, count) pairs in ascending order."""
+        points = [(self.min, self.zeros)] if self.zeros else []
+        points.extend(
+            (self._value(key), self.buckets[key]) for key in sorted(self.buckets)
+        )
+        return points
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value
+        """
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, count in self._points():
+            seen += count
+            if seen > rank:
+                return value
+        return self.max
+
+    def histogram(self, bins: int) -> list[HistogramBin]:
+        """
+        Approximate an equal-width histogram from bucket counts.
+
+        Args:
+            bins: Number of bins between min and max
+
+        Returns:
+            Histogram bins
+        """
+        edges = _edges(self.min, self.max, bins)
+        counts = [0] * len(edges)
+        for value, count in self._points():
+            counts[_bin_index(edges, value)] += count
+        return _bins(edges, self.max, counts)
+
+
+class SketchStore:
+    """Per-year sketches of complete past years, shared across requests."""
+
+    def __init__(self):
+        """Initialize empty store."""
+        self._sketches: dict[tuple[Hashable, int], QuantileSketch] = {}
+
+    def get(
+        self, key: Hashable, year: int, series: RateSeries, lo: int, hi: int
+    ) -> QuantileSketch:
+        """
+        Get the sketch of a year, building it from series points on first use.
+
+        Args:
+            key: Identifies the rate series (e.g. the currency pair)
+            year: Calendar year
+            series: Series containing the whole year
+            lo: Index of the year's first point
+            hi: Index past the year's last point
+
+        Returns:
+            Sketch of the year's rates
+        """
+        sketch = self._sketches.get((key, year))
+        if sketch is None:
+            sketch = QuantileSketch().add_all(series.rates[lo:hi])
+            self._sketches[(key, year)] = sketch
+        return sketch
+
+    def discard(self, match: Callable[[Hashable, int], bool]) -> int:
+        """
+        Drop the sketches of selected series and years.
+
+        Args:
+            match: Called with (key, year); True drops the sketch
+
+        Returns:
+            Number of sketches dropped
+        """
+        stale = [item for item in self._sketches if match(*item)]
+        for item in stale:
+            del self._sketches[item]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all stored sketches."""
+        self._sketches.clear()
+
+    def __len__(self) -> int:
+        return len(self._sketches)
+
+
+class DistributionStats:
+    """Median, p5/p95 and histogram of the rates in a range."""
+
+    @staticmethod
+    def compute(
+        series: RateSeries,
+        store: SketchStore | None = None,
+        key: Hashable = None,
+        bins: int = DISTRIBUTION_BINS,
+        exact_max: int = DISTRIBUTION_EXACT_MAX_POINTS,
+        today: date | None = None,
+    ) -> Distribution:
+        """
+        Compute the distribution of a series.
+
+        Ranges up to exact_max points are sorted and answered exactly. Longer
+        ranges merge stored sketches of every complete past year they cover
+        with sketches of the partial years at either end, so a multi-decade
+        query only touches the points of its edge years.
+
+        Args:
+            series: Non-empty sorted rate series
+            store: Sketch store for complete years (None builds them per call)
+            key: Identifies the series in the store
+            bins: Histogram bins
+            exact_max: Largest range computed exactly
+            today: Current date (years before it are complete)
+
+        Returns:
+            Distribution statistics
+        """
+        if len(series) <= exact_max:
+            return DistributionStats._exact(series.rates, bins)
+
+        store = SketchStore() if store is None else store
+        current_year = (today or date.today()).year
+        first = date.fromordinal(series.ordinals[0])
+        last = date.fromordinal(series.ordinals[-1])
+        sketch = QuantileSketch()
+
+        for year in range(first.year, last.year + 1):
+            lo = series.position(date(year, 1, 1).toordinal())
+            hi = series.position(date(year + 1, 1, 1).toordinal())
+            covers_year = first.year < year < last.year and year < current_year
+            if covers_year:
+                sketch.merge(store.get(key, year, series, lo, hi))
+            else:
+                sketch.add_all(series.rates[lo:hi])
+
+        return Distribution(
+            method="sketch",
+            count=sketch.count,
+            median=sketch.quantile(0.5),
+            p5=sketch.quantile(0.05),
+            p95=sketch.quantile(0.95),
+            histogram=sketch.histogram(bins),
+        )
+
+    @staticmethod
+    def _exact(values: Iterable[float], bins: int) -> Distribution:
+        """
+        Compute exact quantiles (linear interpolation) and histogram.
+
+        Args:
+            values: Rates
+            bins: Histogram bins
+
+        Returns:
+            Distribution statistics
+        """
+        ordered = sorted(values)
+
+        def quantile(q: float) -> float:
+            pos = q * (len(ordered) - 1)
+            lower = int(pos)
+            upper = min(lower + 1, len(ordered) - 1)
+            return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+        edges = _edges(ordered[0], ordered[-1], bins)
+        counts = [0] * len(edges)
+        for value in ordered:
+            counts[_bin_index(edges, value)] += 1
+
+        return Distribution(
+            method="exact",
+            count=len(ordered),
+            median=quantile(0.5),
+            p5=quantile(0.05),
+            p95=quantile(0.95),
+            histogram=_bins(edges, ordered[-1], counts),
+        )
+
+
+def _edges(lowest: float, highest: float, bins: int) -> list[float]:
+    """Lower edges of equal-width bins (a single bin if all values are equal)."""
+    if highest <= lowest:
+        return [lowest]
+    width = (highest - lowest) / bins
+    return [lowest + i * width for i in range(bins)]
+
+
+def _bin_index(edges: list[float], value: float) -> int:
+    """Index of the bin a value falls into; the last bin includes its upper edge."""
+    return max(bisect_right(edges, value) - 1, 0)
+
+
+def _bins(edges: list[float], highest: float, counts: list[int]) -> list[HistogramBin]:
+    """Build histogram bins from lower edges and counts."""
+    uppers = edges[1:] + [highest]
+    return [
+        HistogramBin(lower=lower, upper=upper, count=count)
+        for lower, upper, count in zip(edges, uppers, counts)
+    ]
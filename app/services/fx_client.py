@@ -1,31 +1,45 @@
-"""FX rate client with API and local fallback support."""
+"""FX rate client routing requests across rate providers."""
+
 
-import json
 import httpx
-from pathlib import Path
-from typing import Literal
-from datetime import datetime
 
-from app.config import FRANKFURTER_BASE_URL, LOCAL_FALLBACK_PATH, REQUEST_TIMEOUT
-from app.models import FrankfurterResponse, LocalFallbackData
+from app.services.providers import (
+    HistoryProvider,
+    ProviderRouter,
+    RateProvider,
+    default_providers,
+)
+from app.services.rate_series import RateSeries
+from app.services.tracing import start_span
 
 
 class ServiceUnavailableError(Exception):
-    """Raised when both API and fallback fail."""
+    """Raised when every provider, including the local fallback, fails."""
     pass
 
 
 class FXClient:
-    """Client for fetching FX rates from API with local file fallback."""
+    """Client for fetching FX rates from the fastest healthy provider."""
 
-    def __init__(self, http_client: httpx.AsyncClient):
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        router: ProviderRouter | None = None,
+        providers: list[RateProvider] | None = None
+    ):
         """
         Initialize FX client.
 
         Args:
             http_client: Async HTTP client for API requests
+            router: Router holding provider stats shared across requests
+                (a fresh one if omitted)
+            providers: Rate providers (default: Frankfurter, configured
+                mirrors and the local dataset)
         """
         self.http_client = http_client
+        self.router = ProviderRouter() if router is None else router
+        self.providers = default_providers(http_client) if providers is None else providers
 
     async def fetch_rates(
         self,
@@ -33,11 +47,12 @@ class FXClient:
         end: str,
         from_currency: str = "EUR",
         to: str = "USD"
-    ) -> tuple[dict[str, float], Literal["frankfurter", "local_file"]]:
+    ) -> tuple[RateSeries, str]:
         """
         Fetch exchange rates for date range.
 
-        Tries Frankfurter API first, falls back to local file on failure.
+        Reads history the backfill has covered, otherwise tries providers
+        in routing order, falling back to the local file.
 
         Args:
             start: Start date (YYYY-MM-DD)
@@ -46,102 +61,110 @@ class FXClient:
             to: Target currency code
 
         Returns:
-            Tuple of (rates_dict, source) where rates_dict maps date -> rate
+            Tuple of (series, source) where series maps date -> rate and
+            source is the name of the provider that answered
 
         Raises:
-            ServiceUnavailableError: If both API and fallback fail
+            ServiceUnavailableError: If every provider fails
         """
-        # Try API first
-        try:
-            rates = await self._fetch_from_api(start, end, from_currency, to)
-            return rates, "frankfurter"
-        except Exception:
-            # Fall back to local file
-            try:
-                rates = self._fetch_from_local(start, end, from_currency, to)
-                return rates, "local_file"
-            except Exception as e:
-                raise ServiceUnavailableError(
-                    "Both API and local fallback failed"
-                ) from e
-
-    async def _fetch_from_api(
+        matrix, source = await self.fetch_matrix(start, end, from_currency, [to])
+        return matrix[to], source
+
+    async def fetch_matrix(
         self,
         start: str,
         end: str,
-        from_currency: str,
-        to: str
-    ) -> dict[str, float]:
+        base: str,
+        quotes: list[str]
+    ) -> tuple[dict[str, RateSeries], str]:
         """
-        Fetch rates from Frankfurter API.
+        Fetch rates of several quote currencies against one base.
+
+        All quotes come from a single upstream request. Ranges the backfill
+        has fully covered for every quote are read from history instead.
 
         Args:
-            start: Start date
-            end: End date
-            from_currency: Source currency
-            to: Target currency
+            start: Start date (YYYY-MM-DD)
+            end: End date (YYYY-MM-DD)
+            base: Base currency code
+            quotes: Quote currency codes
 
         Returns:
-            Dictionary mapping date strings to rates
+            Tuple of (series by quote, source)
+
+        Raises:
+            ServiceUnavailableError: If every provider fails
         """
-        url = f"{FRANKFURTER_BASE_URL}/{start}..{end}"
-        params = {"from": from_currency, "to": to}
+        for provider in self.providers:
+            if isinstance(provider, HistoryProvider) and all(
+                provider.covers(start, end, base, quote) for quote in quotes
+            ):
+                try:
+                    with start_span("history.read", provider=provider.name):
+                        return await provider.fetch_matrix(start, end, base, quotes), provider.name
+                except (OSError, ValueError):
+                    # A missing or mismatched file: route as if not covered
+                    break
+        try:
+            return await self.router.call(
+                self.providers,
+                lambda provider, timeout: provider.fetch_matrix(start, end, base, quotes, timeout)
+            )
+        except Exception as e:
+            raise ServiceUnavailableError("Both API and local fallback failed") from e
 
-        response = await self.http_client.get(
-            url,
-            params=params,
-            timeout=REQUEST_TIMEOUT
-        )
-        response.raise_for_status()
+    async def fetch_latest(self, from_currency: str = "EUR", to: str = "USD") -> tuple[str, float]:
+        """
+        Fetch the latest published rate from the routed providers.
 
-        data = FrankfurterResponse(**response.json())
+        Args:
+            from_currency: Source currency code
+            to: Target currency code
 
-        # Transform nested rates to flat dict
-        rates = {}
-        for date_str, currencies in data.rates.items():
-            if to in currencies:
-                rates[date_str] = currencies[to]
+        Returns:
+            Tuple of (date, rate) for the latest fixing
 
-        return rates
+        Raises:
+            Exception: The last provider's error if every provider fails
+        """
+        routed = [p for p in self.providers if not p.fallback]
+        latest, _ = await self.router.call(
+            routed,
+            lambda provider, timeout: provider.fetch_latest(from_currency, to, timeout)
+        )
+        return latest
 
-    def _fetch_from_local(
+    def fetch_local_rates(
         self,
         start: str,
         end: str,
-        from_currency: str,
-        to: str
-    ) -> dict[str, float]:
+        from_currency: str = "EUR",
+        to: str = "USD"
+    ) -> RateSeries:
         """
-        Fetch rates from local fallback file.
+        Fetch exchange rates from the local datasets only.
+
+        Used when upstream calls are shed under load. Local providers are
+        tried in order, e.g. backfilled history before the bundled dataset.
 
         Args:
-            start: Start date
-            end: End date
-            from_currency: Source currency
-            to: Target currency
+            start: Start date (YYYY-MM-DD)
+            end: End date (YYYY-MM-DD)
+            from_currency: Source currency code
+            to: Target currency code
 
         Returns:
-            Dictionary mapping date strings to rates, filtered by date range
-        """
-        file_path = Path(LOCAL_FALLBACK_PATH)
-        with open(file_path, "r") as f:
-            data = LocalFallbackData(**json.load(f))
-
-        # Validate currency match
-        if data.base != from_currency or data.to != to:
-            raise ValueError(
-                f"Local file has {data.base}->{data.to}, "
-                f"requested {from_currency}->{to}"
-            )
+            RateSeries for the date range
 
-        # Filter rates by date range
-        start_date = datetime.strptime(start, "%Y-%m-%d")
-        end_date = datetime.strptime(end, "%Y-%m-%d")
-
-        filtered_rates = {}
-        for date_str, rate in data.rates.items():
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-            if start_date <= date_obj <= end_date:
-                filtered_rates[date_str] = rate
-
-        return filtered_rates
+        Raises:
+            Exception: The last local provider's error, or LookupError if
+                none is configured
+        """
+        error: Exception = LookupError("No local dataset configured")
+        for provider in self.providers:
+            if provider.fallback:
+                try:
+                    return provider.load(start, end, from_currency, to)
+                except Exception as e:
+                    error = e
+        raise error
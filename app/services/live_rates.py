@@ -0,0 +1,240 @@
+"""Live latest-rate subscriptions with one shared poller per pair."""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from app.config import (
+    LIVE_KEEPALIVE_SECONDS,
+    LIVE_MAX_POLLERS,
+    LIVE_MAX_SUBSCRIPTIONS,
+    LIVE_POLL_INTERVAL_SECONDS,
+    LIVE_SUBSCRIBER_BUFFER,
+)
+from app.services.admission import OverloadedError
+
+logger = logging.getLogger(__name__)
+
+# (from_currency, to)
+Pair = tuple[str, str]
+
+
+class Subscription:
+    """A subscriber's bounded queue of pre-serialized events."""
+
+    def __init__(self, pairs: list[Pair], buffer: int = LIVE_SUBSCRIBER_BUFFER):
+        """
+        Initialize subscription.
+
+        Args:
+            pairs: Currency pairs subscribed to
+            buffer: Events held for a slow consumer before dropping the oldest
+        """
+        self.pairs = pairs
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=buffer)
+        self.dropped = 0
+
+    def offer(self, event: str) -> None:
+        """
+        Enqueue an event without blocking the publisher.
+
+        When the consumer has fallen behind, the oldest event is dropped so
+        it always catches up to the newest values.
+
+        Args:
+            event: Serialized SSE event
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class LiveRateHub:
+    """
+    Poll each subscribed pair once and fan changes out to all subscribers.
+
+    Upstream cost is bounded by capping the number of distinct pairs
+    polled, and memory by capping open subscriptions.
+    """
+
+    def __init__(
+        self,
+        fetch_latest: Callable[[Pair], Awaitable[tuple[str, float]]],
+        interval: float = LIVE_POLL_INTERVAL_SECONDS,
+        max_pollers: int = LIVE_MAX_POLLERS,
+        max_subscriptions: int = LIVE_MAX_SUBSCRIPTIONS,
+    ):
+        """
+        Initialize hub.
+
+        Args:
+            fetch_latest: Coroutine returning (date, rate) for a pair
+            interval: Seconds between polls of one pair
+            max_pollers: Most distinct pairs polled at once
+            max_subscriptions: Most open subscriptions
+        """
+        self.fetch_latest = fetch_latest
+        self.interval = interval
+        self.max_pollers = max_pollers
+        self.max_subscriptions = max_subscriptions
+        self._subscriptions: set[Subscription] = set()
+        self._subscribers: dict[Pair, set[Subscription]] = {}
+        self._pollers: dict[Pair, asyncio.Task] = {}
+        self._last: dict[Pair, tuple[str, float]] = {}
+        self._events: dict[Pair, str] = {}
+        self.polls = 0
+
+    def subscribe(self, pairs: list[Pair]) -> Subscription:
+        """
+        Subscribe to pairs, starting a poller for any pair not yet polled.
+
+        The last known value of each pair is delivered immediately.
+
+        Args:
+            pairs: Currency pairs to subscribe to
+
+        Returns:
+            New subscription
+
+        Raises:
+            OverloadedError: If the subscription or poller limit is reached
+        """
+        if len(self._subscriptions) >= self.max_subscriptions:
+            raise OverloadedError("Too many live subscriptions", self.interval)
+        new_pairs = sum(1 for pair in pairs if pair not in self._pollers)
+        if len(self._pollers) + new_pairs > self.max_pollers:
+            raise OverloadedError("Too many distinct live pairs", self.interval)
+
+        subscription = Subscription(pairs)
+        self._subscriptions.add(subscription)
+        for pair in pairs:
+            self._subscribers.setdefault(pair, set()).add(subscription)
+            if pair in self._events:
+                subscription.offer(self._events[pair])
+            if pair not in self._pollers:
+                self._pollers[pair] = asyncio.create_task(self._poll(pair))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a subscription, stopping pollers that have no subscribers left.
+
+        Args:
+            subscription: Subscription to remove
+        """
+        self._subscriptions.discard(subscription)
+        for pair in subscription.pairs:
+            subscribers = self._subscribers.get(pair)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[pair]
+                poller = self._pollers.pop(pair, None)
+                if poller is not None:
+                    poller.cancel()
+
+    def subscriber_count(self, pair: Pair) -> int:
+        """Return the number of subscribers for a pair."""
+        return len(self._subscribers.get(pair, ()))
+
+    async def _poll(self, pair: Pair) -> None:
+        """
+        Poll one pair until cancelled, publishing only changed values.
+
+        Args:
+            pair: Currency pair to poll
+        """
+        while True:
+            try:
+                self.polls += 1
+                latest = await self.fetch_latest(pair)
+            except Exception:
+                logger.warning("Latest rate poll failed for %s", pair, exc_info=True)
+            else:
+                if latest != self._last.get(pair):
+                    self._last[pair] = latest
+                    self._publish(pair, latest)
+            await asyncio.sleep(self.interval)
+
+    def _publish(self, pair: Pair, latest: tuple[str, float]) -> None:
+        """
+        Serialize an update once and offer it to every subscriber of the pair.
+
+        Args:
+            pair: Currency pair
+            latest: Tuple of (date, rate)
+        """
+        date, rate = latest
+        payload = json.dumps(
+            {"base": pair[0], "quote": pair[1], "date": date, "rate": rate}
+        )
+        event = f"event: rate\ndata: {payload}\n\n"
+        self._events[pair] = event
+        for subscription in self._subscribers.get(pair, ()):
+            subscription.offer(event)
+
+    async def events(
+        self, subscription: Subscription, keepalive: float = LIVE_KEEPALIVE_SECONDS
+    ) -> AsyncIterator[str]:
+        """
+        Yield SSE events for a subscription, with keepalive comments.
+
+        The subscription is removed when the consumer stops iterating.
+
+        Args:
+            subscription: Subscription to drain
+            keepalive: Seconds of silence before a keepalive comment
+
+        Yields:
+            SSE-formatted strings
+        """
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(
+                        subscription.queue.get(), timeout=keepalive
+                    )
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    async def close(self) -> None:
+        """Cancel all pollers."""
+        pollers = list(self._pollers.values())
+        self._pollers.clear()
+        self._subscribers.clear()
+        self._subscriptions.clear()
+        for poller in pollers:
+            poller.cancel()
+        await asyncio.gather(*pollers, return_exceptions=True)
+
+
+def parse_pairs(value: str, max_pairs: int) -> list[Pair]:
+    """
+    Parse a comma-separated list of pairs such as "EUR/USD,EUR/GBP".
+
+    Args:
+        value: Raw query value
+        max_pairs: Maximum number of pairs allowed
+
+    Returns:
+        Distinct (from_currency, to) tuples in request order
+
+    Raises:
+        ValueError: If a pair is malformed or there are too many
+    """
+    pairs: list[Pair] = []
+    for item in value.split(","):
+        parts = item.strip().upper().split("/")
+        if len(parts) != 2 or not all(len(p) == 3 and p.isalpha() for p in parts):
+            raise ValueError(f"Pairs must look like EUR/USD, got: {item.strip()}")
+        pair = (parts[0], parts[1])
+        if pair not in pairs:
+            pairs.append(pair)
+    if len(pairs) > max_pairs:
+        raise ValueError(f"At most {max_pairs} pairs may be subscribed at once")
+    return pairs
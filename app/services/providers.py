@@ -0,0 +1,653 @@
+"""Rate providers and latency-aware routing between them."""
+
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from pathlib import Path
+from typing import ClassVar, Protocol, TypeVar
+
+import httpx
+
+from app.config import (
+    FRANKFURTER_BASE_URL,
+    HISTORY_DIR,
+    LOCAL_FALLBACK_PATH,
+    PROVIDER_COOLDOWN_SECONDS,
+    PROVIDER_ERROR_THRESHOLD,
+    PROVIDER_EWMA_ALPHA,
+    PROVIDER_MIN_TIMEOUT_SECONDS,
+    PROVIDER_TIMEOUT_FACTOR,
+    RATE_MIRRORS,
+    REQUEST_TIMEOUT,
+)
+from app.models import FrankfurterLatestResponse, FrankfurterResponse, LocalFallbackData
+from app.services.rate_series import RateSeries
+from app.services.tracing import start_span
+from app.utils.validators import parse_date_ordinal
+
+T = TypeVar("T")
+
+
+class RateProvider(Protocol):
+    """
+    A source of historical and latest rates.
+
+    Fallback providers are only used after every routed provider failed.
+    """
+
+    name: str
+    fallback: bool
+
+    async def fetch_matrix(
+        self, start: str, end: str, base: str, quotes: list[str], timeout: float
+    ) -> dict[str, RateSeries]:
+        """Fetch rates of each quote against base for a date range."""
+
+    async def fetch_latest(
+        self, base: str, quote: str, timeout: float
+    ) -> tuple[str, float]:
+        """Fetch the latest (date, rate) of a pair."""
+
+
+class HTTPProvider:
+    """Any HTTP source serving the Frankfurter API shape."""
+
+    fallback = False
+
+    def __init__(self, name: str, base_url: str, http_client: httpx.AsyncClient):
+        """
+        Initialize provider.
+
+        Args:
+            name: Provider name reported as the response source
+            base_url: Base URL of the Frankfurter-compatible API
+            http_client: Async HTTP client for requests
+        """
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.http_client = http_client
+
+    async def fetch_matrix(
+        self,
+        start: str,
+        end: str,
+        base: str,
+        quotes: list[str],
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> dict[str, RateSeries]:
+        """
+        Fetch rates of one or more quote currencies in one request.
+
+        Args:
+            start: Start date
+            end: End date
+            base: Source currency
+            quotes: Target currencies
+            timeout: Request timeout in seconds
+
+        Returns:
+            RateSeries for the date range by quote currency
+        """
+        response = await self.http_client.get(
+            f"{self.base_url}/{start}..{end}",
+            params={"from": base, "to": ",".join(quotes)},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+
+        data = FrankfurterResponse(**response.json())
+
+        # Transform nested rates to one sorted series per quote
+        return {
+            quote: RateSeries.from_mapping(
+                {
+                    date_str: currencies[quote]
+                    for date_str, currencies in data.rates.items()
+                    if quote in currencies
+                }
+            )
+            for quote in quotes
+        }
+
+    async def warm(self, timeout: float) -> None:
+        """
+        Open a pooled connection (DNS, TCP and TLS) before the first request.
+
+        Args:
+            timeout: Seconds to wait for the connection
+        """
+        await self.http_client.head(f"{self.base_url}/", timeout=timeout)
+
+    async def fetch_latest(
+        self, base: str, quote: str, timeout: float = REQUEST_TIMEOUT
+    ) -> tuple[str, float]:
+        """
+        Fetch the latest published rate.
+
+        Args:
+            base: Source currency
+            quote: Target currency
+            timeout: Request timeout in seconds
+
+        Returns:
+            Tuple of (date, rate) for the latest fixing
+
+        Raises:
+            httpx.HTTPError: If the request fails
+            KeyError: If the response has no rate for the target currency
+        """
+        response = await self.http_client.get(
+            f"{self.base_url}/latest",
+            params={"from": base, "to": quote},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+
+        data = FrankfurterLatestResponse(**response.json())
+        return data.date, data.rates[quote]
+
+
+class FrankfurterProvider(HTTPProvider):
+    """The public Frankfurter API."""
+
+    def __init__(
+        self, http_client: httpx.AsyncClient, base_url: str = FRANKFURTER_BASE_URL
+    ):
+        """
+        Initialize provider.
+
+        Args:
+            http_client: Async HTTP client for requests
+            base_url: Frankfurter base URL
+        """
+        super().__init__("frankfurter", base_url, http_client)
+
+
+class LocalFileProvider:
+    """
+    The bundled single-pair JSON dataset, used as the last resort.
+
+    The file is read on every call unless it was preloaded, which the
+    pre-fork server does once in the master so workers share the parsed
+    series copy-on-write.
+    """
+
+    name = "local_file"
+    fallback = True
+
+    # Parsed datasets by path: (base, quote, series)
+    _preloaded: ClassVar[dict[str, tuple[str, str, RateSeries]]] = {}
+
+    @classmethod
+    def preload(cls, path: str = LOCAL_FALLBACK_PATH) -> None:
+        """
+        Parse a dataset once and serve it from memory from now on.
+
+        Args:
+            path: Path of the local dataset
+        """
+        cls._preloaded[path] = cls._read(path)
+
+    @classmethod
+    def is_preloaded(cls, path: str = LOCAL_FALLBACK_PATH) -> bool:
+        """Whether a dataset is already served from memory."""
+        return path in cls._preloaded
+
+    @classmethod
+    def unload(cls) -> None:
+        """Drop all preloaded datasets."""
+        cls._preloaded.clear()
+
+    @staticmethod
+    def _read(path: str) -> tuple[str, str, RateSeries]:
+        """Read and parse a dataset into (base, quote, series)."""
+        with open(Path(path), "r") as f:
+            data = LocalFallbackData(**json.load(f))
+        return data.base, data.to, RateSeries.from_mapping(data.rates)
+
+    def __init__(self, path: str = LOCAL_FALLBACK_PATH):
+        """
+        Initialize provider.
+
+        Args:
+            path: Path of the local dataset
+        """
+        self.path = path
+
+    def load(self, start: str, end: str, base: str, quote: str) -> RateSeries:
+        """
+        Read one pair from the local dataset.
+
+        Args:
+            start: Start date
+            end: End date
+            base: Source currency
+            quote: Target currency
+
+        Returns:
+            RateSeries filtered by date range
+
+        Raises:
+            ValueError: If the dataset holds a different pair
+        """
+        data_base, data_quote, series = self._preloaded.get(self.path) or self._read(
+            self.path
+        )
+
+        # Validate currency match
+        if data_base != base or data_quote != quote:
+            raise ValueError(
+                f"Local file has {data_base}->{data_quote}, requested {base}->{quote}"
+            )
+
+        # Filter rates by date range with a binary search over the sorted series
+        return series.slice_dates(start, end)
+
+    async def fetch_matrix(
+        self,
+        start: str,
+        end: str,
+        base: str,
+        quotes: list[str],
+        timeout: float = REQUEST_TIMEOUT,
+    ) -> dict[str, RateSeries]:
+        """Read every quote from the local dataset (see load)."""
+        return {quote: self.load(start, end, base, quote) for quote in quotes}
+
+    async def fetch_latest(
+        self, base: str, quote: str, timeout: float = REQUEST_TIMEOUT
+    ) -> tuple[str, float]:
+        """The local dataset has no live rates."""
+        raise LookupError("Local dataset has no latest rates")
+
+
+class HistoryProvider(LocalFileProvider):
+    """
+    Per-pair datasets written by the backfill command.
+
+    Each pair lives in its own file in the fallback format, named
+    ``{BASE}_{QUOTE}.json``. The backfill records the date spans it has
+    covered per pair in ``.checkpoint.json``; ranges inside those spans are
+    served from here without going upstream. Otherwise consulted before the
+    bundled dataset when upstream providers fail.
+    """
+
+    name = "history"
+
+    COVERAGE_FILE = ".checkpoint.json"
+
+    # Covered (first, last) ordinal spans by directory, then by "BASE/QUOTE"
+    _coverage: ClassVar[dict[str, dict[str, list[tuple[int, int]]]]] = {}
+
+    @staticmethod
+    def path_for(directory: str, base: str, quote: str) -> str:
+        """
+        Path of one pair's dataset.
+
+        Args:
+            directory: History directory
+            base: Source currency
+            quote: Target currency
+
+        Returns:
+            Dataset path
+        """
+        return str(Path(directory) / f"{base}_{quote}.json")
+
+    @classmethod
+    def preload_all(cls, directory: str = HISTORY_DIR) -> None:
+        """
+        Preload every pair's dataset in a directory.
+
+        Args:
+            directory: History directory (a missing one is skipped)
+        """
+        for path in sorted(Path(directory).glob("*_*.json")):
+            cls.preload(str(path))
+        cls._coverage[directory] = cls.read_coverage(cls.coverage_path(directory))
+
+    @classmethod
+    def unload(cls) -> None:
+        """Drop all preloaded datasets and coverage."""
+        super().unload()
+        cls._coverage.clear()
+
+    @classmethod
+    def coverage_path(cls, directory: str) -> str:
+        """Path of the backfill checkpoint in a history directory."""
+        return str(Path(directory) / cls.COVERAGE_FILE)
+
+    @staticmethod
+    def read_coverage(path: str) -> dict[str, list[tuple[int, int]]]:
+        """
+        Read the spans the backfill has covered from its checkpoint.
+
+        Checkpoints from older runs, which listed finished chunks as
+        "BASE/QUOTE:start..end", are read as the spans of those chunks.
+
+        Args:
+            path: Checkpoint file
+
+        Returns:
+            Sorted, non-overlapping inclusive (first, last) ordinal spans
+            by "BASE/QUOTE" (empty if nothing was backfilled)
+        """
+        path = Path(path)
+        if not path.exists():
+            return {}
+        with open(path) as f:
+            data = json.load(f)
+        spans: dict[str, list[tuple[int, int]]] = {}
+        for pair, covered in data.get("covered", {}).items():
+            spans[pair] = [
+                (parse_date_ordinal(first), parse_date_ordinal(last))
+                for first, last in covered
+            ]
+        for key in data.get("done", ()):
+            pair, _, chunk = key.partition(":")
+            first, _, last = chunk.partition("..")
+            spans.setdefault(pair, []).append(
+                (parse_date_ordinal(first), parse_date_ordinal(last))
+            )
+        return {pair: merge_spans(pair_spans) for pair, pair_spans in spans.items()}
+
+    def __init__(self, directory: str = HISTORY_DIR):
+        """
+        Initialize provider.
+
+        Args:
+            directory: History directory
+        """
+        super().__init__(directory)
+        self.directory = directory
+
+    def load(self, start: str, end: str, base: str, quote: str) -> RateSeries:
+        """
+        Read one pair from its dataset.
+
+        Args:
+            start: Start date
+            end: End date
+            base: Source currency
+            quote: Target currency
+
+        Returns:
+            RateSeries filtered by date range
+
+        Raises:
+            OSError: If the pair has not been backfilled
+            ValueError: If the file holds a different pair
+        """
+        path = self.path_for(self.directory, base, quote)
+        data_base, data_quote, series = self._preloaded.get(path) or self._read(path)
+        if data_base != base or data_quote != quote:
+            raise ValueError(
+                f"{path} has {data_base}->{data_quote}, requested {base}->{quote}"
+            )
+        return series.slice_dates(start, end)
+
+    def covers(self, start: str, end: str, base: str, quote: str) -> bool:
+        """
+        Whether the backfill has covered every day of a range for a pair.
+
+        Args:
+            start: Start date
+            end: End date
+            base: Source currency
+            quote: Target currency
+
+        Returns:
+            True if one covered span contains the whole range
+        """
+        coverage = self._coverage.get(self.directory)
+        if coverage is None:
+            coverage = self.read_coverage(self.coverage_path(self.directory))
+        first, last = parse_date_ordinal(start), parse_date_ordinal(end)
+        return any(
+            lo <= first and last <= hi for lo, hi in coverage.get(f"{base}/{quote}", ())
+        )
+
+
+def merge_spans(spans: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    """
+    Merge overlapping or adjacent inclusive ordinal spans.
+
+    Args:
+        spans: (first, last) spans in any order
+
+    Returns:
+        Sorted, non-overlapping spans covering the same days
+    """
+    merged: list[tuple[int, int]] = []
+    for first, last in sorted(spans):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def _is_client_error(error: Exception) -> bool:
+    """Whether an upstream rejected the request itself, e.g. an unknown currency."""
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and 400 <= error.response.status_code < 500
+        and error.response.status_code != 429
+    )
+
+
+def _is_provider_failure(error: Exception) -> bool:
+    """Whether an error reflects the provider's health: a timeout, transport error, 429 or 5xx."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return not _is_client_error(error)
+    return isinstance(error, (asyncio.TimeoutError, httpx.TransportError))
+
+
+class ProviderStats:
+    """Smoothed latency and error rate of one provider."""
+
+    __slots__ = ("down_until", "error_rate", "failures", "latency", "requests")
+
+    def __init__(self):
+        """Initialize with no observations."""
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def as_dict(self) -> dict:
+        """Return stats for /metrics."""
+        return {
+            "latency_ms": None
+            if self.latency is None
+            else round(self.latency * 1000, 1),
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "healthy": time.monotonic() >= self.down_until,
+        }
+
+
+class ProviderRouter:
+    """
+    Order providers by observed health and latency, shared across requests.
+
+    Healthy providers are tried fastest first (unmeasured ones first, so new
+    sources get probed). A provider whose error rate crosses the threshold is
+    moved behind the healthy ones for a cooldown. While an alternative
+    remains, each attempt is cut off at a multiple of the provider's usual
+    latency, so a source that turns slow loses traffic after a few slow
+    calls instead of holding requests until the full timeout.
+    """
+
+    def __init__(
+        self,
+        alpha: float = PROVIDER_EWMA_ALPHA,
+        error_threshold: float = PROVIDER_ERROR_THRESHOLD,
+        cooldown: float = PROVIDER_COOLDOWN_SECONDS,
+        min_timeout: float = PROVIDER_MIN_TIMEOUT_SECONDS,
+        timeout_factor: float = PROVIDER_TIMEOUT_FACTOR,
+    ):
+        """
+        Initialize router.
+
+        Args:
+            alpha: Weight of the newest observation in the moving averages
+            error_threshold: Error rate above which a provider cools down
+            cooldown: Seconds an unhealthy provider is deprioritized
+            min_timeout: Lower bound of the adaptive per-attempt timeout
+            timeout_factor: Multiple of smoothed latency allowed per attempt
+        """
+        self.alpha = alpha
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self.min_timeout = min_timeout
+        self.timeout_factor = timeout_factor
+        self._stats: dict[str, ProviderStats] = {}
+
+    def _get(self, name: str) -> ProviderStats:
+        """Get or create the stats of a provider."""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = ProviderStats()
+        return stats
+
+    def order(self, providers: list[RateProvider]) -> list[RateProvider]:
+        """
+        Order providers for one request.
+
+        Args:
+            providers: Candidate providers
+
+        Returns:
+            Healthy routed providers by latency, then unhealthy ones, then fallbacks
+        """
+        now = time.monotonic()
+        routed = [p for p in providers if not p.fallback]
+        healthy = [p for p in routed if now >= self._get(p.name).down_until]
+        unhealthy = [p for p in routed if p not in healthy]
+        healthy.sort(key=lambda p: self._get(p.name).latency or 0.0)
+        unhealthy.sort(key=lambda p: self._get(p.name).down_until)
+        return healthy + unhealthy + [p for p in providers if p.fallback]
+
+    def timeout_for(self, provider: RateProvider, last: bool) -> float:
+        """
+        Per-attempt timeout of a provider.
+
+        Args:
+            provider: Provider about to be called
+            last: Whether no other routed provider is left to try
+
+        Returns:
+            Timeout in seconds
+        """
+        latency = self._get(provider.name).latency
+        if last or latency is None:
+            return REQUEST_TIMEOUT
+        return min(
+            REQUEST_TIMEOUT, max(self.min_timeout, self.timeout_factor * latency)
+        )
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        """
+        Record the outcome of one call.
+
+        Args:
+            name: Provider name
+            latency: Seconds the call took
+            ok: Whether it succeeded
+        """
+        stats = self._get(name)
+        stats.requests += 1
+        stats.latency = (
+            latency
+            if stats.latency is None
+            else (self.alpha * latency + (1 - self.alpha) * stats.latency)
+        )
+        stats.error_rate = self.alpha * (not ok) + (1 - self.alpha) * stats.error_rate
+        if not ok:
+            stats.failures += 1
+            if stats.error_rate > self.error_threshold:
+                stats.down_until = time.monotonic() + self.cooldown
+
+    async def call(
+        self,
+        providers: list[RateProvider],
+        fn: Callable[[RateProvider, float], Awaitable[T]],
+    ) -> tuple[T, str]:
+        """
+        Call providers in routing order until one succeeds.
+
+        Fallback providers are not timed and do not affect stats. Only
+        timeouts, transport errors and 429/5xx responses count against a
+        provider's error rate; a 4xx client error is raised at once, since
+        every other provider would reject the request too.
+
+        Args:
+            providers: Candidate providers
+            fn: Coroutine taking (provider, timeout)
+
+        Returns:
+            Tuple of (result, name of the provider that answered)
+
+        Raises:
+            httpx.HTTPStatusError: If a provider rejected the request (4xx)
+            Exception: The last provider's error if every provider failed
+        """
+        ordered = self.order(providers)
+        routed_left = sum(not p.fallback for p in ordered)
+        error: Exception = LookupError("No rate providers configured")
+        for provider in ordered:
+            if provider.fallback:
+                try:
+                    with start_span("fallback.read", provider=provider.name):
+                        return await fn(provider, REQUEST_TIMEOUT), provider.name
+                except (OSError, LookupError, ValueError) as e:
+                    error = e
+                    continue
+
+            routed_left -= 1
+            timeout = self.timeout_for(provider, last=routed_left == 0)
+            started = time.monotonic()
+            try:
+                with start_span(
+                    "upstream.attempt", provider=provider.name, timeout=timeout
+                ):
+                    result = await asyncio.wait_for(fn(provider, timeout), timeout)
+            except Exception as e:
+                if _is_client_error(e):
+                    raise
+                if _is_provider_failure(e):
+                    self.record(provider.name, time.monotonic() - started, ok=False)
+                error = e
+                continue
+            self.record(provider.name, time.monotonic() - started, ok=True)
+            return result, provider.name
+        raise error
+
+    def stats(self) -> dict:
+        """Return per-provider stats for /metrics."""
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+
+def default_providers(http_client: httpx.AsyncClient) -> list[RateProvider]:
+    """
+    Build the configured providers.
+
+    Args:
+        http_client: Async HTTP client shared by HTTP providers
+
+    Returns:
+        Frankfurter, any configured mirrors, backfilled history (if the
+        directory exists) and the local dataset
+    """
+    providers: list[RateProvider] = [FrankfurterProvider(http_client)]
+    providers.extend(
+        HTTPProvider(name, url, http_client) for name, url in RATE_MIRRORS.items()
+    )
+    if Path(HISTORY_DIR).is_dir():
+        providers.append(HistoryProvider(HISTORY_DIR))
+    providers.append(LocalFileProvider())
+    return providers
@@ -0,0 +1,129 @@
+"""Compact array-backed rate series shared by fetch, cache and calculator."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator, Mapping
+
+from app.utils.validators import format_date_ordinal, parse_date_ordinal
+
+
+class RateSeries(Mapping):
+    """
+    Sorted daily rates stored as parallel typed arrays.
+
+    Day ordinals are kept in an ``array('l')`` and rates in an
+    ``array('d')``, sorted once at construction. The series behaves as a
+    read-only mapping of ISO date strings to rates, so it compares equal to
+    the equivalent ``dict``.
+    """
+
+    __slots__ = ("ordinals", "rates")
+
+    def __init__(self, ordinals: Iterable[int] = (), rates: Iterable[float] = ()):
+        """
+        Initialize from already sorted, de-duplicated ordinals.
+
+        Args:
+            ordinals: Ascending day ordinals
+            rates: Rates matching ordinals
+        """
+        self.ordinals = array("l", ordinals)
+        self.rates = array("d", rates)
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping) -> "RateSeries":
+        """
+        Build a series from a mapping of date strings to rates.
+
+        Each date is parsed once and the points are sorted once.
+
+        Args:
+            mapping: Mapping of YYYY-MM-DD strings to rates
+
+        Returns:
+            New RateSeries
+        """
+        if isinstance(mapping, RateSeries):
+            return mapping
+        points = sorted((parse_date_ordinal(d), rate) for d, rate in mapping.items())
+        return cls((o for o, _ in points), (r for _, r in points))
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def __iter__(self) -> Iterator[str]:
+        return (format_date_ordinal(o) for o in self.ordinals)
+
+    def __getitem__(self, date_str: str) -> float:
+        try:
+            ordinal = parse_date_ordinal(date_str)
+        except ValueError:
+            raise KeyError(date_str)
+        i = bisect_left(self.ordinals, ordinal)
+        if i == len(self.ordinals) or self.ordinals[i] != ordinal:
+            raise KeyError(date_str)
+        return self.rates[i]
+
+    def __repr__(self) -> str:
+        return f"RateSeries({len(self)} points)"
+
+    def date(self, i: int) -> str:
+        """Return the ISO date of the i-th point."""
+        return format_date_ordinal(self.ordinals[i])
+
+    def dates(self) -> list[str]:
+        """Return all ISO dates in order."""
+        return [format_date_ordinal(o) for o in self.ordinals]
+
+    def position(self, ordinal: int) -> int:
+        """Return the index of the first point on or after ordinal in O(log n)."""
+        return bisect_left(self.ordinals, ordinal)
+
+    def slice(self, first: int, last: int) -> "RateSeries":
+        """
+        Select points within an inclusive ordinal range in O(log n).
+
+        Args:
+            first: First day ordinal
+            last: Last day ordinal
+
+        Returns:
+            New RateSeries with the points in range
+        """
+        lo = bisect_left(self.ordinals, first)
+        hi = bisect_right(self.ordinals, last)
+        return RateSeries(self.ordinals[lo:hi], self.rates[lo:hi])
+
+    def slice_dates(self, start: str, end: str) -> "RateSeries":
+        """
+        Select points within an inclusive date range.
+
+        Args:
+            start: Start date (YYYY-MM-DD)
+            end: End date (YYYY-MM-DD)
+
+        Returns:
+            New RateSeries with the points in range
+        """
+        return self.slice(parse_date_ordinal(start), parse_date_ordinal(end))
+
+    def merge(self, other: "RateSeries") -> "RateSeries":
+        """
+        Combine two series; points in other win on equal dates.
+
+        Args:
+            other: Series to merge in
+
+        Returns:
+            New merged RateSeries
+        """
+        points = dict(zip(self.ordinals, self.rates))
+        points.update(zip(other.ordinals, other.rates))
+        ordered = sorted(points)
+        return RateSeries(ordered, (points[o] for o in ordered))
+
+    def nbytes(self) -> int:
+        """Return the bytes used by the underlying arrays."""
+        return self.ordinals.itemsize * len(self.ordinals) + self.rates.itemsize * len(
+            self.rates
+        )
@@ -0,0 +1,165 @@
+"""Background refresher that keeps popular cache entries warm."""
+
+import asyncio
+import logging
+import random
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from datetime import time as dt_time
+
+from app.config import (
+    PUBLICATION_TIME_UTC,
+    REFRESH_AHEAD_FRACTION,
+    REFRESH_CONCURRENCY,
+    REFRESH_INTERVAL_SECONDS,
+    REFRESH_JITTER_SECONDS,
+    REFRESH_TOP_N,
+)
+from app.services.cache import InMemoryCache
+
+logger = logging.getLogger(__name__)
+
+# (from_currency, to, start, end)
+Query = tuple[str, str, str, str]
+
+
+class RefreshScheduler:
+    """Track hot queries and refresh them before their cache entries expire."""
+
+    def __init__(
+        self,
+        cache: InMemoryCache,
+        make_key: Callable[[Query], str],
+        refresh: Callable[[Query], Awaitable[None]],
+        interval: float = REFRESH_INTERVAL_SECONDS,
+        top_n: int = REFRESH_TOP_N,
+        concurrency: int = REFRESH_CONCURRENCY,
+        jitter: float = REFRESH_JITTER_SECONDS,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            cache: Cache whose entries are kept warm
+            make_key: Maps a query to its cache key
+            refresh: Coroutine that refetches a query and stores it in cache
+            interval: Seconds between refresh rounds
+            top_n: Number of hottest queries to keep warm
+            concurrency: Maximum refreshes running at once
+            jitter: Maximum random delay before each refresh, in seconds
+        """
+        self.cache = cache
+        self.make_key = make_key
+        self.refresh = refresh
+        self.interval = interval
+        self.top_n = top_n
+        self.jitter = jitter
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._hits: Counter[Query] = Counter()
+        self._task: asyncio.Task | None = None
+        self.refreshed = 0
+        self.failed = 0
+
+    def record(self, query: Query) -> None:
+        """
+        Count a request for a query.
+
+        Args:
+            query: Requested (from_currency, to, start, end)
+        """
+        self._hits[query] += 1
+
+    def hot(self) -> list[Query]:
+        """Return the most frequently requested queries, hottest first."""
+        return [query for query, _ in self._hits.most_common(self.top_n)]
+
+    def due(self, query: Query, now: datetime | None = None) -> bool:
+        """
+        Decide whether a query should be refreshed now.
+
+        An entry is due when it is missing, close to expiry, or covers today
+        and was stored before today's fixing was published.
+
+        Args:
+            query: Query to check
+            now: Current time (defaults to UTC now)
+
+        Returns:
+            True if the query should be refreshed
+        """
+        now = now or datetime.now(UTC)
+        age = self.cache.age(self.make_key(query))
+        if age is None or age >= self.cache.ttl_seconds * REFRESH_AHEAD_FRACTION:
+            return True
+
+        published = datetime.combine(
+            now.date(), dt_time.fromisoformat(PUBLICATION_TIME_UTC), tzinfo=UTC
+        )
+        stored_at = now.timestamp() - age
+        return (
+            query[3] >= now.date().isoformat()
+            and stored_at < published.timestamp() <= now.timestamp()
+        )
+
+    async def run_once(self) -> int:
+        """
+        Refresh every hot query that is due.
+
+        Popularity counts are halved after each round so the hot set follows
+        recent traffic.
+
+        Returns:
+            Number of queries refreshed
+        """
+        due = [query for query in self.hot() if self.due(query)]
+        results = await asyncio.gather(*(self._refresh_one(query) for query in due))
+
+        for query in list(self._hits):
+            self._hits[query] //= 2
+            if not self._hits[query]:
+                del self._hits[query]
+
+        return sum(results)
+
+    async def _refresh_one(self, query: Query) -> bool:
+        """
+        Refresh one query under the concurrency limit after a random delay.
+
+        Args:
+            query: Query to refresh
+
+        Returns:
+            True if the refresh succeeded
+        """
+        async with self._semaphore:
+            await asyncio.sleep(random.uniform(0, self.jitter))
+            try:
+                await self.refresh(query)
+            except Exception:
+                self.failed += 1
+                logger.warning("Background refresh failed for %s", query, exc_info=True)
+                return False
+        self.refreshed += 1
+        return True
+
+    async def _run(self) -> None:
+        """Run refresh rounds until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
+
+    def start(self) -> None:
+        """Start the background loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
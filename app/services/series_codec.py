@@ -0,0 +1,270 @@
+"""Compressed encoding of rate series held in the cache."""
+
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from itertools import accumulate, pairwise
+
+from app.config import SERIES_BLOCK_SIZE, SERIES_MAX_DECIMALS
+from app.services.rate_series import RateSeries
+
+# Signed typecodes from narrowest to widest
+_INT_TYPECODES = ("b", "h", "i", "q")
+
+
+def _narrowest(values: list[int]) -> str:
+    """Return the narrowest signed typecode holding every value."""
+    lo, hi = min(values, default=0), max(values, default=0)
+    for code in _INT_TYPECODES:
+        limit = 1 << (array(code).itemsize * 8 - 1)
+        if -limit <= lo and hi < limit:
+            return code
+    raise OverflowError("Deltas exceed 64 bits")
+
+
+def _deltas(values: list[int]) -> array:
+    """Encode values as differences from their predecessor (first delta 0)."""
+    deltas = [0] + [b - a for a, b in pairwise(values)]
+    return array(_narrowest(deltas), deltas)
+
+
+def _decimals(rates: Iterable[float], max_decimals: int) -> int | None:
+    """
+    Find the fewest decimal places that represent every rate exactly.
+
+    Args:
+        rates: Rates to check
+        max_decimals: Most decimal places to try
+
+    Returns:
+        Decimal places, or None if some rate needs more (or is too large)
+    """
+    rates = list(rates)
+    for decimals in range(max_decimals + 1):
+        scale = 10.0**decimals
+        if all(abs(r) * scale < 2**53 and round(r * scale) / scale == r for r in rates):
+            return decimals
+    return None
+
+
+def _shuffle(data: bytes, itemsize: int) -> bytes:
+    """Group the i-th byte of every item together, which deflate compresses better."""
+    return b"".join(data[i::itemsize] for i in range(itemsize))
+
+
+def _unshuffle(data: bytes, itemsize: int) -> bytes:
+    """Invert _shuffle."""
+    n = len(data) // itemsize
+    out = bytearray(len(data))
+    for i in range(itemsize):
+        out[i::itemsize] = data[i * n : (i + 1) * n]
+    return bytes(out)
+
+
+class EncodedSeries:
+    """
+    Rate series compressed for the cache, decoded lazily per block.
+
+    Day ordinals are stored as deltas from the previous day. Rates are
+    scaled to integers by the fewest decimal places that round-trip exactly
+    and also stored as deltas; series that do not round-trip keep raw
+    doubles. Both use the narrowest integer width that fits. Points are cut
+    into blocks whose first ordinal and scaled rate are kept uncompressed;
+    each block's deltas are byte-shuffled and deflated on their own, so a
+    slice only inflates the blocks it touches.
+    """
+
+    __slots__ = (
+        "block_ordinals",
+        "block_rates",
+        "block_size",
+        "blocks",
+        "decimals",
+        "length",
+        "ordinal_code",
+        "rate_code",
+    )
+
+    def __init__(
+        self,
+        length: int,
+        block_size: int,
+        decimals: int | None,
+        ordinal_code: str,
+        rate_code: str,
+        blocks: tuple[bytes, ...],
+        block_ordinals: array,
+        block_rates: array,
+    ):
+        """
+        Initialize from encoded parts; use encode() to build one.
+
+        Args:
+            length: Number of points
+            block_size: Points per block
+            decimals: Decimal places of scaled rates, or None for raw rates
+            ordinal_code: Typecode of ordinal deltas
+            rate_code: Typecode of scaled rate deltas ("d" for raw rates)
+            blocks: Deflated deltas of each block
+            block_ordinals: Ordinal at the start of each block
+            block_rates: Scaled rate at the start of each block (empty for raw rates)
+        """
+        self.length = length
+        self.block_size = block_size
+        self.decimals = decimals
+        self.ordinal_code = ordinal_code
+        self.rate_code = rate_code
+        self.blocks = blocks
+        self.block_ordinals = block_ordinals
+        self.block_rates = block_rates
+
+    @classmethod
+    def encode(
+        cls,
+        series: RateSeries,
+        block_size: int = SERIES_BLOCK_SIZE,
+        max_decimals: int = SERIES_MAX_DECIMALS,
+    ) -> "EncodedSeries":
+        """
+        Compress a rate series.
+
+        Args:
+            series: Series to encode
+            block_size: Points per block
+            max_decimals: Most decimal places tried when scaling rates
+
+        Returns:
+            Encoded series decoding to exactly the same points
+        """
+        ordinals = list(series.ordinals)
+        ordinal_deltas = _deltas(ordinals)
+        decimals = _decimals(series.rates, max_decimals)
+        if decimals is None:
+            scaled, rate_values = [], array("d", series.rates)
+        else:
+            scale = 10.0**decimals
+            scaled = [round(r * scale) for r in series.rates]
+            rate_values = _deltas(scaled)
+
+        blocks = []
+        for start in range(0, len(ordinals), block_size):
+            end = start + block_size
+            payload = ordinal_deltas[start:end].tobytes() + _shuffle(
+                rate_values[start:end].tobytes(), rate_values.itemsize
+            )
+            packer = zlib.compressobj(9, zlib.DEFLATED, -15)
+            blocks.append(packer.compress(payload) + packer.flush())
+
+        return cls(
+            length=len(ordinals),
+            block_size=block_size,
+            decimals=decimals,
+            ordinal_code=ordinal_deltas.typecode,
+            rate_code=rate_values.typecode,
+            blocks=tuple(blocks),
+            block_ordinals=array("l", ordinals[::block_size]),
+            block_rates=array("q", scaled[::block_size]),
+        )
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __repr__(self) -> str:
+        return f"EncodedSeries({self.length} points, {self.nbytes()} bytes)"
+
+    def _block_ordinals(self, block: int, payload: bytes) -> array:
+        """Rebuild the ordinals of a block from its inflated payload."""
+        deltas = array(self.ordinal_code)
+        deltas.frombytes(payload[: self._block_length(block) * deltas.itemsize])
+        return array("l", accumulate(deltas[1:], initial=self.block_ordinals[block]))
+
+    def _block_length(self, block: int) -> int:
+        """Number of points in a block."""
+        return min(self.block_size, self.length - block * self.block_size)
+
+    def _block(self, block: int) -> tuple[array, array]:
+        """
+        Decode one block.
+
+        Args:
+            block: Block index
+
+        Returns:
+            Tuple of (ordinals, rates) of the block
+        """
+        payload = zlib.decompress(self.blocks[block], -15)
+        ordinals = self._block_ordinals(block, payload)
+        values = array(self.rate_code)
+        ordinal_bytes = len(ordinals) * array(self.ordinal_code).itemsize
+        values.frombytes(_unshuffle(payload[ordinal_bytes:], values.itemsize))
+        if self.decimals is None:
+            return ordinals, values
+        scale = 10.0**self.decimals
+        return ordinals, array(
+            "d",
+            map(
+                scale.__rtruediv__,
+                accumulate(values[1:], initial=self.block_rates[block]),
+            ),
+        )
+
+    def decode(self, lo: int = 0, hi: int | None = None) -> RateSeries:
+        """
+        Decode a range of points, inflating only the blocks it covers.
+
+        Args:
+            lo: Index of the first point
+            hi: Index past the last point (default: end of series)
+
+        Returns:
+            RateSeries of the points in [lo, hi)
+        """
+        hi = self.length if hi is None else min(hi, self.length)
+        if lo >= hi:
+            return RateSeries()
+        first, last = lo // self.block_size, (hi - 1) // self.block_size
+        ordinals, rates = array("l"), array("d")
+        for block in range(first, last + 1):
+            block_ordinals, block_rates = self._block(block)
+            ordinals.extend(block_ordinals)
+            rates.extend(block_rates)
+        offset = first * self.block_size
+        return RateSeries(
+            ordinals[lo - offset : hi - offset], rates[lo - offset : hi - offset]
+        )
+
+    def endpoints(self) -> RateSeries:
+        """
+        Decode only the first and last points, inflating at most two blocks.
+
+        Returns:
+            RateSeries of the first and last points (one point for a
+            single-point series, empty for an empty one)
+        """
+        if self.length <= 1:
+            return self.decode()
+        first, last = self.decode(0, 1), self.decode(self.length - 1)
+        return RateSeries(first.ordinals + last.ordinals, first.rates + last.rates)
+
+    def ordinal(self, i: int) -> int:
+        """Return the day ordinal of the i-th point."""
+        block = i // self.block_size
+        ordinals = self._block_ordinals(block, zlib.decompress(self.blocks[block], -15))
+        return ordinals[i - block * self.block_size]
+
+    def position(self, ordinal: int) -> int:
+        """Return the index of the first point on or after ordinal, inflating one block."""
+        block = bisect_right(self.block_ordinals, ordinal) - 1
+        if block < 0:
+            return 0
+        ordinals = self._block_ordinals(block, zlib.decompress(self.blocks[block], -15))
+        return block * self.block_size + bisect_left(ordinals, ordinal)
+
+    def nbytes(self) -> int:
+        """Return the bytes used by the encoded data."""
+        return (
+            sum(len(block) for block in self.blocks)
+            + self.block_ordinals.itemsize * len(self.block_ordinals)
+            + self.block_rates.itemsize * len(self.block_rates)
+        )
@@ -0,0 +1,84 @@
+"""Concurrent startup warm-up with readiness and a measured time budget."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from app.config import STARTUP_BUDGET_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """
+    Run warm-up steps concurrently and report readiness.
+
+    Liveness (/health) does not depend on this; readiness (/ready) turns
+    true once every step has finished, successfully or not.
+    """
+
+    def __init__(self, imported_at: float, budget: float = STARTUP_BUDGET_SECONDS):
+        """
+        Initialize tracker.
+
+        Args:
+            imported_at: perf_counter() value when the app module started importing
+            budget: Seconds import plus warm-up should fit in
+        """
+        self.imported_at = imported_at
+        self.budget = budget
+        self.started_at: float | None = None
+        self.ready_at: float | None = None
+        self.steps: dict[str, float] = {}
+        self.failed: list[str] = []
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up has finished."""
+        return self.ready_at is not None
+
+    async def run(self, steps: dict[str, Callable[[], Awaitable[None]]]) -> None:
+        """
+        Run warm-up steps concurrently, timing each one.
+
+        A failing step is logged and does not block readiness; the request
+        path will do the same work lazily.
+
+        Args:
+            steps: Coroutine factories by step name
+        """
+        self.started_at = time.perf_counter()
+        await asyncio.gather(*(self._step(name, fn) for name, fn in steps.items()))
+        self.ready_at = time.perf_counter()
+
+        total = self.ready_at - self.imported_at
+        if total > self.budget:
+            logger.warning(
+                "Startup took %.0f ms, over the %.0f ms budget",
+                total * 1000,
+                self.budget * 1000,
+            )
+
+    async def _step(self, name: str, fn: Callable[[], Awaitable[None]]) -> None:
+        """Run and time one step."""
+        started = time.perf_counter()
+        try:
+            await fn()
+        except Exception:
+            logger.warning("Warm-up step %s failed", name, exc_info=True)
+            self.failed.append(name)
+        self.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    def report(self) -> dict:
+        """Return timings for /ready."""
+        if not self.ready:
+            return {"status": "starting"}
+        return {
+            "status": "ready",
+            "import_ms": round((self.started_at - self.imported_at) * 1000, 1),
+            "warmup_ms": round((self.ready_at - self.started_at) * 1000, 1),
+            "budget_ms": round(self.budget * 1000, 1),
+            "steps": self.steps,
+            "failed": self.failed,
+        }
@@ -0,0 +1,508 @@
+"""Lightweight per-request tracing with sampling and batched export."""
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Optional, Protocol, Self
+
+import httpx
+
+from app.config import (
+    TRACE_BATCH_SIZE,
+    TRACE_EXPORTER,
+    TRACE_FLUSH_INTERVAL_SECONDS,
+    TRACE_JSONL_PATH,
+    TRACE_MAX_QUEUED_SPANS,
+    TRACE_OTLP_ENDPOINT,
+    TRACE_SAMPLE_RATE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Innermost open span of the current task; asyncio tasks and to_thread copy it
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    One timed operation of a sampled trace.
+
+    Used as a context manager: entering makes it the parent of spans opened
+    inside, exiting records the end time and hands it to the processor.
+    """
+
+    __slots__ = (
+        "_processor",
+        "_token",
+        "attributes",
+        "end_ns",
+        "error",
+        "name",
+        "parent_id",
+        "span_id",
+        "start_ns",
+        "trace_id",
+    )
+
+    def __init__(
+        self,
+        processor: "SpanProcessor",
+        trace_id: str,
+        parent_id: str | None,
+        name: str,
+        attributes: dict[str, Any],
+    ):
+        """
+        Initialize span.
+
+        Args:
+            processor: Receives the span when it ends
+            trace_id: 32 hex digit trace id
+            parent_id: 16 hex digit id of the parent span, or None for a root
+            name: Operation name
+            attributes: Initial attributes
+        """
+        self._processor = processor
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: str | None = None
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Set an attribute.
+
+        Args:
+            key: Attribute name
+            value: str, int, float or bool value
+        """
+        self.attributes[key] = value
+
+    def __enter__(self) -> Self:
+        self.start_ns = time.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        _current.reset(self._token)
+        self._processor.on_end(self)
+
+    def as_dict(self) -> dict:
+        """Return the JSONL representation."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_unix_nano": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned when the request is not sampled."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(Protocol):
+    """Destination of finished spans, called from the processor thread."""
+
+    def export(self, spans: list[Span]) -> None:
+        """Write one batch of spans."""
+        ...
+
+
+class JsonlExporter:
+    """Append spans to a local file, one JSON object per line."""
+
+    def __init__(self, path: str = TRACE_JSONL_PATH):
+        """
+        Initialize exporter.
+
+        Args:
+            path: File to append to
+        """
+        self.path = path
+
+    def export(self, spans: list[Span]) -> None:
+        """
+        Append a batch of spans.
+
+        Args:
+            spans: Finished spans
+        """
+        with open(self.path, "a") as f:
+            f.writelines(
+                json.dumps(span.as_dict(), default=str) + "\n" for span in spans
+            )
+
+
+class OTLPExporter:
+    """Post spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(
+        self,
+        endpoint: str = TRACE_OTLP_ENDPOINT,
+        client: httpx.Client | None = None,
+        service_name: str = "fx-summary",
+    ):
+        """
+        Initialize exporter.
+
+        Args:
+            endpoint: Collector traces URL, e.g. http://localhost:4318/v1/traces
+            client: Sync HTTP client (a new one if omitted)
+            service_name: Value of the service.name resource attribute
+        """
+        self.endpoint = endpoint
+        self.client = httpx.Client(timeout=5) if client is None else client
+        self.service_name = service_name
+
+    @staticmethod
+    def _value(value: Any) -> dict:
+        """Encode an attribute value as an OTLP AnyValue."""
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": str(value)}
+
+    def encode(self, spans: list[Span]) -> dict:
+        """
+        Build an ExportTraceServiceRequest body.
+
+        Args:
+            spans: Finished spans
+
+        Returns:
+            OTLP JSON payload
+        """
+        encoded = []
+        for span in spans:
+            item = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                # SERVER for request roots, INTERNAL otherwise
+                "kind": 2 if span.parent_id is None else 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [
+                    {"key": k, "value": self._value(v)}
+                    for k, v in span.attributes.items()
+                ],
+                "status": {"code": 2, "message": span.error}
+                if span.error
+                else {"code": 0},
+            }
+            if span.parent_id is not None:
+                item["parentSpanId"] = span.parent_id
+            encoded.append(item)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": encoded}],
+                }
+            ]
+        }
+
+    def export(self, spans: list[Span]) -> None:
+        """
+        Post a batch of spans.
+
+        Args:
+            spans: Finished spans
+
+        Raises:
+            httpx.HTTPError: If the collector is unreachable or rejects the batch
+        """
+        response = self.client.post(self.endpoint, json=self.encode(spans))
+        response.raise_for_status()
+
+
+class SpanProcessor:
+    """
+    Queue finished spans and export them in batches from a thread.
+
+    The request path only appends to a bounded deque; spans arriving while
+    the queue is full are dropped and counted rather than slowing requests.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter | None,
+        batch_size: int = TRACE_BATCH_SIZE,
+        interval: float = TRACE_FLUSH_INTERVAL_SECONDS,
+        max_queued: int = TRACE_MAX_QUEUED_SPANS,
+    ):
+        """
+        Initialize processor.
+
+        Args:
+            exporter: Span destination, or None to discard spans
+            batch_size: Spans per export call
+            interval: Seconds between flushes
+            max_queued: Spans held before new ones are dropped
+        """
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_queued = max_queued
+        self._queue: deque[Span] = deque()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def on_end(self, span: Span) -> None:
+        """
+        Queue a finished span.
+
+        Args:
+            span: Finished span
+        """
+        if self.exporter is None or len(self._queue) >= self.max_queued:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+
+    def flush(self) -> None:
+        """Export every queued span."""
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            try:
+                self.exporter.export(batch)
+                self.exported += len(batch)
+            except Exception:
+                self.failed += len(batch)
+                logger.warning("Exporting %s spans failed", len(batch), exc_info=True)
+
+    def _run(self) -> None:
+        """Flush periodically until stopped."""
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def start(self) -> None:
+        """Start the export thread."""
+        if self._thread is not None or self.exporter is None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="span-export", daemon=True
+        )
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop the export thread and flush what is left."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.exporter is not None:
+            self.flush()
+
+    def stats(self) -> dict:
+        """Return export counters for /metrics."""
+        return {
+            "queued": len(self._queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str, bool] | None:
+    """
+    Parse a W3C traceparent header.
+
+    Args:
+        header: Header value, e.g. "00-<trace id>-<parent id>-01"
+
+    Returns:
+        Tuple of (trace id, parent span id, sampled), or None if absent or malformed
+    """
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if (
+        len(parts) < 4
+        or len(parts[1]) != 32
+        or len(parts[2]) != 16
+        or len(parts[3]) != 2
+    ):
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1].lower(), parts[2].lower(), bool(flags & 1)
+
+
+def start_span(name: str, **attributes: Any):
+    """
+    Open a child of the current span.
+
+    Costs one context variable lookup when no sampled trace is active, so
+    it is safe to call on every request.
+
+    Args:
+        name: Span name
+        **attributes: Initial attributes
+
+    Returns:
+        Span, or NOOP_SPAN if no sampled trace is active
+    """
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent._processor, parent.trace_id, parent.span_id, name, attributes)
+
+
+class Tracer:
+    """Decide sampling and open the root span of a trace."""
+
+    def __init__(
+        self, processor: SpanProcessor, sample_rate: float = TRACE_SAMPLE_RATE
+    ):
+        """
+        Initialize tracer.
+
+        Args:
+            processor: Receives finished spans
+            sample_rate: Fraction of requests traced (0 disables tracing)
+        """
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+    def start_trace(self, name: str, traceparent: str | None = None, **attributes: Any):
+        """
+        Open the root span of a request.
+
+        Requests are sampled with probability sample_rate. A sampled
+        request with a traceparent header continues the caller's trace;
+        the header's sampled flag is ignored, since an untrusted client
+        could otherwise force every request to be traced.
+
+        Args:
+            name: Root span name
+            traceparent: W3C traceparent header of the request
+            **attributes: Initial attributes
+
+        Returns:
+            Span, or NOOP_SPAN if the request is not sampled
+        """
+        if not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            return NOOP_SPAN
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, _ = parent
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        return Span(self.processor, trace_id, parent_id, name, attributes)
+
+
+def build_exporter(kind: str = TRACE_EXPORTER) -> SpanExporter | None:
+    """
+    Build the configured exporter.
+
+    Args:
+        kind: "jsonl", "otlp" or "none"
+
+    Returns:
+        Exporter, or None to discard spans
+
+    Raises:
+        ValueError: If kind is unknown
+    """
+    if kind == "jsonl":
+        return JsonlExporter()
+    if kind == "otlp":
+        return OTLPExporter()
+    if kind == "none":
+        return None
+    raise ValueError(f"Unknown trace exporter: {kind}")
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a root span per sampled HTTP request."""
+
+    def __init__(self, app, tracer: Tracer):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            tracer: Tracer deciding sampling
+        """
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        root = self.tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            traceparent,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        if root is NOOP_SPAN:
+            return await self.app(scope, receive, send)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                root.set("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.error = f"HTTP {message['status']}"
+            await send(message)
+
+        with root:
+            await self.app(scope, receive, send_with_status)
@@ -0,0 +1,127 @@
+"""ECB publication calendar used to answer no-data ranges locally."""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from datetime import date, timedelta
+
+
+class TradingCalendar:
+    """
+    Known publication dates of the ECB reference rates.
+
+    Rates are published on weekdays except TARGET closing days: New Year's
+    Day, Good Friday, Easter Monday, 1 May, 25 and 26 December. Publication
+    days are materialized once per year as sorted day ordinals.
+    """
+
+    def __init__(self):
+        """Initialize with no years materialized."""
+        self._years: dict[int, list[int]] = {}
+
+    @staticmethod
+    def _easter(year: int) -> date:
+        """Compute Easter Sunday with the anonymous Gregorian algorithm."""
+        a = year % 19
+        b, c = divmod(year, 100)
+        d, e = divmod(b, 4)
+        f = (b + 8) // 25
+        g = (b - f + 1) // 3
+        h = (19 * a + b - d - g + 15) % 30
+        i, k = divmod(c, 4)
+        l = (32 + 2 * e + 2 * i - h - k) % 7
+        m = (a + 11 * h + 22 * l) // 451
+        month, day = divmod(h + l - 7 * m + 114, 31)
+        return date(year, month, day + 1)
+
+    def _publication_days(self, year: int) -> list[int]:
+        """
+        Get the sorted publication day ordinals of a year.
+
+        Args:
+            year: Calendar year
+
+        Returns:
+            Sorted day ordinals
+        """
+        days = self._years.get(year)
+        if days is None:
+            easter = self._easter(year)
+            closed = {
+                date(year, 1, 1),
+                easter - timedelta(days=2),
+                easter + timedelta(days=1),
+                date(year, 5, 1),
+                date(year, 12, 25),
+                date(year, 12, 26),
+            }
+            first = date(year, 1, 1).toordinal()
+            last = date(year, 12, 31).toordinal()
+            days = [
+                o
+                for o in range(first, last + 1)
+                if o % 7 not in (0, 6) and date.fromordinal(o) not in closed
+            ]
+            self._years[year] = days
+        return days
+
+    def warm(self, years: Iterable[int]) -> None:
+        """
+        Materialize publication days ahead of use.
+
+        Args:
+            years: Calendar years to materialize
+        """
+        for year in years:
+            self._publication_days(year)
+
+    def is_publication_day(self, ordinal: int) -> bool:
+        """Check whether rates are published on a day."""
+        days = self._publication_days(date.fromordinal(ordinal).year)
+        i = bisect_left(days, ordinal)
+        return i < len(days) and days[i] == ordinal
+
+    def first_on_or_after(self, ordinal: int) -> int:
+        """Return the first publication day on or after a day."""
+        year = date.fromordinal(ordinal).year
+        while True:
+            days = self._publication_days(year)
+            i = bisect_left(days, ordinal)
+            if i < len(days):
+                return days[i]
+            year += 1
+
+    def last_on_or_before(self, ordinal: int) -> int:
+        """Return the last publication day on or before a day."""
+        year = date.fromordinal(ordinal).year
+        while True:
+            days = self._publication_days(year)
+            i = bisect_right(days, ordinal)
+            if i:
+                return days[i - 1]
+            year -= 1
+
+    def effective_range(
+        self, first: int, last: int, today: int | None = None
+    ) -> tuple[int, int] | None:
+        """
+        Narrow a range to the publication days it can contain.
+
+        Days after today cannot have fixings yet.
+
+        Args:
+            first: First day ordinal requested
+            last: Last day ordinal requested
+            today: Today's ordinal (defaults to the current date)
+
+        Returns:
+            Tuple of (first, last) publication ordinals, or None if the range
+            contains no publication day
+        """
+        today = date.today().toordinal() if today is None else today
+        last = min(last, today)
+        if first > last:
+            return None
+        first_pub = self.first_on_or_after(first)
+        if first_pub > last:
+            return None
+        return first_pub, self.last_on_or_before(last)
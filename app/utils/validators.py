@@ -1,6 +1,85 @@
-"""Validation utilities for dates."""
+"""Validation utilities for dates and date cursors."""
 
-from datetime import datetime
+import base64
+import binascii
+from datetime import date, datetime
+
+
+def parse_date_ordinal(date_str: str) -> int:
+    """
+    Parse a YYYY-MM-DD string into a proleptic Gregorian day ordinal.
+
+    Slices fixed positions instead of going through strptime, which is
+    several times faster for the per-entry parsing done on rate series.
+
+    Args:
+        date_str: Date string to parse
+
+    Returns:
+        Day ordinal as returned by date.toordinal()
+
+    Raises:
+        ValueError: If date format is invalid
+    """
+    try:
+        if len(date_str) != 10 or date_str[4] != "-" or date_str[7] != "-":
+            raise ValueError
+        year, month, day = date_str[:4], date_str[5:7], date_str[8:]
+        if not (year.isdigit() and month.isdigit() and day.isdigit()):
+            raise ValueError
+        return date(int(year), int(month), int(day)).toordinal()
+    except (TypeError, ValueError):
+        raise ValueError(f"Date must be in YYYY-MM-DD format, got: {date_str}")
+
+
+def format_date_ordinal(ordinal: int) -> str:
+    """
+    Format a day ordinal as a YYYY-MM-DD string.
+
+    Args:
+        ordinal: Day ordinal
+
+    Returns:
+        ISO date string
+    """
+    return date.fromordinal(ordinal).isoformat()
+
+
+def encode_cursor(ordinal: int) -> str:
+    """
+    Encode a day ordinal as an opaque pagination cursor.
+
+    Args:
+        ordinal: Day ordinal the next page starts at
+
+    Returns:
+        URL-safe cursor string
+    """
+    return base64.urlsafe_b64encode(f"d:{ordinal}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decode a pagination cursor back into a day ordinal.
+
+    Args:
+        cursor: Cursor returned as next_cursor
+
+    Returns:
+        Day ordinal the page starts at
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, ordinal = raw.partition(":")
+        if prefix != "d" or not ordinal.isdigit():
+            raise ValueError
+        date.fromordinal(int(ordinal))
+        return int(ordinal)
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError):
+        raise ValueError(f"Invalid cursor: {cursor}")
 
 
 def validate_date_format(date_str: str) -> datetime:
@@ -16,10 +95,8 @@ def validate_date_format(date_str: str) -> datetime:
     Raises:
         ValueError: If date format is invalid
     """
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d")
-    except ValueError:
-        raise ValueError(f"Date must be in YYYY-MM-DD format, got: {date_str}")
+    parsed = date.fromordinal(parse_date_ordinal(date_str))
+    return datetime(parsed.year, parsed.month, parsed.day)
 
 
 def validate_date_range(start: str, end: str) -> None:
@@ -33,8 +110,5 @@ def validate_date_range(start: str, end: str) -> None:
     Raises:
         ValueError: If start > end
     """
-    start_date = validate_date_format(start)
-    end_date = validate_date_format(end)
-
-    if start_date > end_date:
+    if parse_date_ordinal(start) > parse_date_ordinal(end):
         raise ValueError("start date must be before or equal to end date")
@@ -0,0 +1,169 @@
+"""Tests for the cache administration endpoints."""
+
+from unittest.mock import patch
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main
+from app.main import app, cache, rate_limiter, sketches
+from app.replay import StubUpstream
+from app.services.providers import LocalFileProvider
+from app.services.rate_series import RateSeries
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear cache and rate limits before and after each test."""
+    cache.clear()
+    rate_limiter.clear()
+    yield
+    cache.clear()
+    sketches.clear()
+    LocalFileProvider.unload()
+
+
+@pytest.fixture
+async def upstream():
+    """Serve upstream requests from the deterministic stub."""
+    stub = StubUpstream(latency=0)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(stub))
+    with patch("app.main.http_client", client):
+        yield stub
+    await client.aclose()
+
+
+@pytest.fixture
+async def client(monkeypatch):
+    """Client authenticated against a configured admin token."""
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+        headers={"X-Admin-Token": "secret"},
+    ) as client:
+        yield client
+
+
+WARM_BODY = {
+    "queries": [
+        {"from": "EUR", "to": "USD", "start": "2025-01-01", "end": "2025-03-31"},
+        {"from": "EUR", "to": "USD", "start": "2025-04-01", "end": "2025-06-30"},
+        {"from": "EUR", "to": "GBP", "start": "2025-01-01", "end": "2025-06-30"},
+        {"start": "2025-01-04", "end": "2025-01-05"},
+    ]
+}
+
+
+@pytest.mark.asyncio
+async def test_warm_then_invalidate_one_range(upstream, client):
+    """Test invalidation drops only the affected pair and dates."""
+    response = await client.post("/admin/cache/warm", json=WARM_BODY)
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["warmed"], report["no_data"], report["failed"]) == (3, 1, 0)
+    assert upstream.calls == 3
+
+    response = await client.post("/admin/cache/warm", json=WARM_BODY)
+    assert response.json()["cached"] == 3
+    assert upstream.calls == 3
+
+    occupancy = (await client.get("/admin/cache")).json()["pairs"]
+    assert occupancy["EUR/USD"]["entries"] == 2
+    assert (occupancy["EUR/GBP"]["first"], occupancy["EUR/GBP"]["last"]) == (
+        "2025-01-02",
+        "2025-06-30",
+    )
+
+    response = await client.post(
+        "/admin/cache/invalidate",
+        params={"pairs": "EUR/USD", "start": "2025-02-10", "end": "2025-02-10"},
+    )
+    assert response.json()["invalidated"] == 1
+
+    occupancy = (await client.get("/admin/cache")).json()["pairs"]
+    assert occupancy["EUR/USD"]["entries"] == 1 and occupancy["EUR/GBP"]["entries"] == 1
+
+    response = await client.get(
+        "/summary", params={"start": "2025-04-01", "end": "2025-06-30"}
+    )
+    assert response.json()["meta"]["cache"] == "HIT"
+    response = await client.get(
+        "/summary", params={"start": "2025-01-01", "end": "2025-03-31"}
+    )
+    assert response.json()["meta"]["cache"] == "MISS"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_covers_comparisons_and_sketches(upstream, client):
+    """Test comparisons and distribution sketches of the pair are dropped too."""
+    await client.get(
+        "/compare",
+        params={"start": "2025-01-01", "end": "2025-01-31", "quotes": "USD,GBP"},
+    )
+    sketches.get(("EUR", "USD", "frankfurter"), 2024, RateSeries(), 0, 0)
+    sketches.get(("EUR", "GBP", "frankfurter"), 2024, RateSeries(), 0, 0)
+
+    response = await client.post(
+        "/admin/cache/invalidate", params={"pairs": "EUR/GBP", "reload": "true"}
+    )
+
+    assert response.json()["keys"] == ["compare_EUR_GBP,USD_2025-01-02_2025-01-31"]
+    assert len(sketches) == 1
+    assert LocalFileProvider.is_preloaded()
+
+
+@pytest.mark.asyncio
+async def test_admin_validation(client):
+    """Test malformed pairs, ranges and queries are rejected."""
+    response = await client.post("/admin/cache/invalidate", params={"pairs": "EURUSD"})
+    assert response.status_code == 400
+    response = await client.post(
+        "/admin/cache/invalidate",
+        params={"pairs": "EUR/USD", "start": "2025-02-01", "end": "2025-01-01"},
+    )
+    assert response.status_code == 400
+    response = await client.post(
+        "/admin/cache/warm",
+        json={"queries": [{"start": "2025-02-01", "end": "2025-01-01"}]},
+    )
+    assert response.status_code == 400
+    response = await client.post(
+        "/admin/cache/warm", json={"queries": [], "concurrency": 100}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_admin_disabled_without_configured_token(monkeypatch):
+    """Test admin endpoints fail closed when no token is configured."""
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        assert (await client.get("/admin/cache")).status_code == 403
+        assert (
+            await client.get("/admin/cache", headers={"X-Admin-Token": ""})
+        ).status_code == 403
+        response = await client.post(
+            "/admin/cache/invalidate", params={"pairs": "EUR/USD"}
+        )
+        assert response.status_code == 403
+        assert (
+            await client.post("/admin/cache/warm", json=WARM_BODY)
+        ).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_admin_rejects_wrong_token(client):
+    """Test a wrong or missing token is refused when one is configured."""
+    assert (
+        await client.get("/admin/cache", headers={"X-Admin-Token": "wrong"})
+    ).status_code == 403
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as anonymous:
+        assert (await anonymous.get("/admin/cache")).status_code == 403
+    assert (await client.get("/admin/cache")).status_code == 200
@@ -0,0 +1,251 @@
+"""Tests for admission control and load shedding."""
+
+import asyncio
+import json
+from unittest.mock import mock_open, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main
+from app.main import app, cache, rate_limiter
+from app.services.admission import (
+    ClientRateLimiter,
+    OverloadedError,
+    SingleFlight,
+    TokenBucket,
+    UpstreamLimiter,
+)
+
+
+def test_token_bucket():
+    """Test bucket allows a burst then reports wait time."""
+    bucket = TokenBucket(rate=1, burst=2)
+
+    assert bucket.take() is None
+    assert bucket.take() is None
+    wait = bucket.take()
+    assert 0 < wait <= 1
+
+
+def test_client_rate_limiter():
+    """Test clients are limited independently and tracking is bounded."""
+    limiter = ClientRateLimiter(rate=0.1, burst=1, max_clients=2)
+
+    limiter.check("a")
+    with pytest.raises(OverloadedError) as exc:
+        limiter.check("a")
+    assert exc.value.retry_after >= 1
+    limiter.check("b")
+    limiter.check("c")
+
+    assert limiter.limited == 1
+    assert "a" not in limiter._buckets
+
+
+@pytest.mark.asyncio
+async def test_upstream_limiter_sheds_when_queue_full():
+    """Test requests beyond concurrency plus queue are shed immediately."""
+    limiter = UpstreamLimiter(max_concurrency=1, max_queue=1, deadline=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    first = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(OverloadedError):
+        async with limiter.slot():
+            pass
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert limiter.shed == 1
+    assert limiter.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_upstream_limiter_sheds_on_estimated_deadline():
+    """Test requests are shed early when the estimated wait is too long."""
+    limiter = UpstreamLimiter(max_concurrency=1, max_queue=10, deadline=0.5)
+    limiter.avg_latency = 5.0
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    task = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(OverloadedError) as exc:
+        async with limiter.slot():
+            pass
+    assert exc.value.retry_after == 5
+
+    release.set()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_upstream_limiter_deadline_timeout():
+    """Test a queued request is shed when the deadline passes."""
+    limiter = UpstreamLimiter(max_concurrency=1, max_queue=10, deadline=0.01)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    task = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(OverloadedError):
+        async with limiter.slot():
+            pass
+
+    release.set()
+    await task
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces():
+    """Test concurrent calls with one key run once and share the result."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    assert results == ["value"] * 5
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_errors():
+    """Test an exception reaches every waiting caller."""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+    )
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_first_caller():
+    """Test cancelling the caller that started a call does not fail the others."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "value"
+
+    first = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "value"
+    assert first.cancelled()
+    assert calls == 1
+    assert await flight.do("k", work) == "value"
+    assert calls == 2
+
+
+@pytest.fixture
+def overloaded():
+    """Force every upstream slot request to be shed."""
+
+    class Shedding:
+        def slot(self):
+            raise OverloadedError("Upstream capacity exhausted", 3)
+
+        def stats(self):
+            return {}
+
+    cache.clear()
+    rate_limiter.clear()
+    with patch.object(main, "upstream_limiter", Shedding()):
+        yield
+    cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_summary_shed_returns_503(overloaded):
+    """Test shed requests get 503 with Retry-After."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/summary?start=2025-07-01&end=2025-07-03")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["detail"]["error"] == "Overloaded"
+
+
+@pytest.mark.asyncio
+async def test_summary_shed_falls_back_to_local(overloaded):
+    """Test shed requests use the local dataset when allowed."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {"2025-07-01": 1.07, "2025-07-02": 1.08},
+    }
+
+    with patch("builtins.open", mock_open(read_data=json.dumps(local_data))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/summary?start=2025-07-01&end=2025-07-02&allow_fallback=true"
+            )
+
+    assert response.status_code == 200
+    assert response.json()["meta"]["source"] == "local_file"
+    assert cache.get("EUR_USD_2025-07-01_2025-07-02") is None
+
+
+@pytest.mark.asyncio
+async def test_summary_shed_fallback_unavailable(overloaded):
+    """Test 503 when shed and the local dataset cannot serve the pair."""
+    with patch("builtins.open", side_effect=FileNotFoundError()):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/summary?start=2025-07-01&end=2025-07-02&allow_fallback=true"
+            )
+
+    assert response.status_code == 503
+    assert response.json()["detail"]["error"] == "ServiceUnavailable"
+
+
+@pytest.mark.asyncio
+async def test_summary_client_rate_limited():
+    """Test 429 with Retry-After when a client exceeds its rate."""
+    with patch.object(main, "rate_limiter", ClientRateLimiter(rate=0.1, burst=1)):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/summary?start=invalid&end=2025-07-03")
+            response = await client.get("/summary?start=invalid&end=2025-07-03")
+            stats = await client.get("/metrics")
+
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    assert stats.json()["rate_limited"] == 1
@@ -0,0 +1,98 @@
+"""Tests for rolling analytics."""
+
+import itertools
+import statistics
+
+import pytest
+
+from app.services.analytics import RollingAnalytics
+
+RATES = {
+    "2025-07-01": 1.07,
+    "2025-07-02": 1.08,
+    "2025-07-03": 1.06,
+    "2025-07-04": 1.065,
+    "2025-07-07": 1.09,
+    "2025-07-08": 1.05,
+    "2025-07-09": 1.055,
+}
+
+
+def test_moving_average():
+    """Test moving average matches a naive window mean."""
+    values = list(RATES.values())
+
+    analytics = RollingAnalytics.compute(RATES, ["sma"], 3)
+
+    assert len(analytics.moving_average) == len(values) - 2
+    assert analytics.moving_average[0].date == "2025-07-03"
+    for i, point in enumerate(analytics.moving_average):
+        assert abs(point.value - sum(values[i : i + 3]) / 3) < 1e-12
+    assert analytics.volatility == []
+    assert analytics.drawdown is None
+
+
+def test_volatility_matches_stdev():
+    """Test sliding Welford volatility matches statistics.stdev."""
+    values = list(RATES.values())
+    returns = [(b - a) / a * 100 for a, b in itertools.pairwise(values)]
+
+    analytics = RollingAnalytics.compute(RATES, ["volatility"], 3)
+
+    assert len(analytics.volatility) == len(returns) - 2
+    assert analytics.volatility[0].date == "2025-07-04"
+    for i, point in enumerate(analytics.volatility):
+        assert abs(point.value - statistics.stdev(returns[i : i + 3])) < 1e-9
+
+
+def test_volatility_undefined_return():
+    """Test windows containing a zero previous rate report None."""
+    rates = {
+        "2025-07-01": 0.0,
+        "2025-07-02": 1.08,
+        "2025-07-03": 1.06,
+        "2025-07-04": 1.07,
+    }
+
+    analytics = RollingAnalytics.compute(rates, ["volatility"], 2)
+
+    assert [p.value is None for p in analytics.volatility] == [True, False]
+
+
+def test_rolling_range():
+    """Test rolling min/max match naive window extremes."""
+    values = list(RATES.values())
+
+    analytics = RollingAnalytics.compute(RATES, ["range"], 3)
+
+    for i, (low, high) in enumerate(zip(analytics.rolling_min, analytics.rolling_max)):
+        assert low.value == min(values[i : i + 3])
+        assert high.value == max(values[i : i + 3])
+
+
+def test_max_drawdown():
+    """Test max drawdown finds the largest peak-to-trough decline."""
+    analytics = RollingAnalytics.compute(RATES, ["drawdown"], 2)
+
+    drawdown = analytics.drawdown
+    assert drawdown.peak.date == "2025-07-07"
+    assert drawdown.trough.date == "2025-07-08"
+    assert drawdown.max_drawdown_pct == pytest.approx((1.05 - 1.09) / 1.09 * 100)
+
+
+def test_max_drawdown_none_when_rising():
+    """Test no drawdown is reported for a monotonic rise."""
+    rates = {"2025-07-01": 1.0, "2025-07-02": 1.1, "2025-07-03": 1.2}
+
+    analytics = RollingAnalytics.compute(rates, ["drawdown"], 2)
+
+    assert analytics.drawdown is None
+
+
+def test_window_larger_than_series():
+    """Test a window longer than the series yields no points."""
+    analytics = RollingAnalytics.compute(RATES, ["sma", "volatility", "range"], 50)
+
+    assert analytics.moving_average == []
+    assert analytics.volatility == []
+    assert analytics.rolling_min == []
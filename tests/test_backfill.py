@@ -0,0 +1,289 @@
+"""Tests for the historical backfill command."""
+
+import asyncio
+import json
+
+import pytest
+
+from app import backfill as backfill_module
+from app.backfill import Backfill, Checkpoint, chunk_span, main, merge_into_history
+from app.services import providers as providers_module
+from app.services.fx_client import FXClient, ServiceUnavailableError
+from app.services.providers import HistoryProvider, LocalFileProvider, default_providers
+from app.services.rate_series import RateSeries
+from app.utils.validators import parse_date_ordinal
+
+
+class FakeUpstream:
+    """Routed provider answering with one point per requested day."""
+
+    name = "fake"
+    fallback = False
+
+    def __init__(self, fail_starts=()):
+        self.calls = []
+        self.fail_starts = set(fail_starts)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch_matrix(self, start, end, base, quotes, timeout=10):
+        self.calls.append((start, end, base, tuple(quotes)))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if start in self.fail_starts:
+                raise ConnectionError("upstream down")
+            first, last = parse_date_ordinal(start), parse_date_ordinal(end)
+            return {
+                q: RateSeries(range(first, last + 1), [1.5] * (last - first + 1))
+                for q in quotes
+            }
+        finally:
+            self.in_flight -= 1
+
+    async def fetch_latest(self, base, quote, timeout=10):
+        raise LookupError
+
+
+@pytest.fixture(autouse=True)
+def unload():
+    """Forget preloaded datasets."""
+    yield
+    HistoryProvider.unload()
+
+
+def make_backfill(tmp_path, upstream, **kwargs):
+    client = FXClient(None, providers=[upstream])
+    return Backfill(client, directory=str(tmp_path), rate=1000, backoff=0, **kwargs)
+
+
+def test_chunk_span():
+    """Test spans split into consecutive inclusive chunks."""
+    assert chunk_span("2025-01-01", "2025-01-10", 4) == [
+        ("2025-01-01", "2025-01-04"),
+        ("2025-01-05", "2025-01-08"),
+        ("2025-01-09", "2025-01-10"),
+    ]
+    assert chunk_span("2025-01-01", "2025-01-01", 365) == [("2025-01-01", "2025-01-01")]
+
+
+@pytest.mark.asyncio
+async def test_backfill_writes_history_per_pair(tmp_path):
+    """Test quotes sharing a base are fetched together and written per pair."""
+    upstream = FakeUpstream()
+    backfill = make_backfill(tmp_path, upstream, chunk_days=5, concurrency=2)
+
+    report = await backfill.run(
+        [("EUR", "USD"), ("EUR", "GBP"), ("GBP", "JPY")], "2025-01-01", "2025-01-10"
+    )
+
+    assert len(upstream.calls) == 4
+    assert ("2025-01-01", "2025-01-05", "EUR", ("USD", "GBP")) in upstream.calls
+    assert upstream.max_in_flight <= 2
+    assert report["fetched"] == 4 and report["failed"] == 0
+    assert report["points"] == 30
+
+    stored = json.loads((tmp_path / "EUR_USD.json").read_text())
+    assert stored["base"] == "EUR" and stored["to"] == "USD"
+    assert len(stored["rates"]) == 10
+    assert HistoryProvider(str(tmp_path)).load(
+        "2025-01-03", "2025-01-04", "GBP", "JPY"
+    ) == {"2025-01-03": 1.5, "2025-01-04": 1.5}
+
+
+@pytest.mark.asyncio
+async def test_interrupted_backfill_resumes(tmp_path):
+    """Test a rerun only fetches chunks the previous run did not finish."""
+    failing = FakeUpstream(fail_starts={"2025-01-06"})
+    first = await make_backfill(tmp_path, failing, chunk_days=5, retries=1).run(
+        [("EUR", "USD")], "2025-01-01", "2025-01-10"
+    )
+    assert first["fetched"] == 1 and first["failed"] == 1
+    assert len(failing.calls) == 3
+
+    upstream = FakeUpstream()
+    second = await make_backfill(tmp_path, upstream, chunk_days=5).run(
+        [("EUR", "USD"), ("EUR", "GBP")], "2025-01-01", "2025-01-10"
+    )
+
+    assert second["already_covered"] == 5
+    assert ("2025-01-01", "2025-01-05", "EUR", ("GBP",)) in upstream.calls
+    assert ("2025-01-06", "2025-01-10", "EUR", ("USD", "GBP")) in upstream.calls
+    assert len(upstream.calls) == 2
+    assert len(json.loads((tmp_path / "EUR_USD.json").read_text())["rates"]) == 10
+    assert (
+        Checkpoint(str(tmp_path / ".checkpoint.json")).missing(
+            "EUR", "GBP", "2025-01-01", "2025-01-10"
+        )
+        == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_rerun_with_other_start_skips_covered_days(tmp_path):
+    """Test progress is kept by covered days, not by the chunks of one run."""
+    await make_backfill(tmp_path, FakeUpstream(), chunk_days=5).run(
+        [("EUR", "USD")], "2025-01-01", "2025-01-10"
+    )
+
+    upstream = FakeUpstream()
+    report = await make_backfill(tmp_path, upstream, chunk_days=7).run(
+        [("EUR", "USD")], "2024-12-30", "2025-01-12"
+    )
+
+    assert upstream.calls == [
+        ("2024-12-30", "2024-12-31", "EUR", ("USD",)),
+        ("2025-01-11", "2025-01-12", "EUR", ("USD",)),
+    ]
+    assert report["already_covered"] == 10
+    assert Checkpoint(str(tmp_path / ".checkpoint.json")).missing(
+        "EUR", "USD", "2024-12-01", "2025-01-31"
+    ) == [("2024-12-01", "2024-12-29"), ("2025-01-13", "2025-01-31")]
+
+
+@pytest.mark.asyncio
+async def test_backfill_writes_each_pair_once(tmp_path, monkeypatch):
+    """Test chunks are merged in memory and each dataset is written once."""
+    writes = []
+    merge = backfill_module.merge_into_history
+    monkeypatch.setattr(
+        backfill_module,
+        "merge_into_history",
+        lambda directory, base, quote, series: (
+            writes.append((base, quote)) or merge(directory, base, quote, series)
+        ),
+    )
+
+    await make_backfill(tmp_path, FakeUpstream(), chunk_days=3, concurrency=3).run(
+        [("EUR", "USD"), ("EUR", "GBP")], "2025-01-01", "2025-01-12"
+    )
+
+    assert sorted(writes) == [("EUR", "GBP"), ("EUR", "USD")]
+    assert len(json.loads((tmp_path / "EUR_GBP.json").read_text())["rates"]) == 12
+
+
+def test_checkpoint_reads_chunk_keys_of_older_runs(tmp_path):
+    """Test a checkpoint listing finished chunks is read as covered days."""
+    path = tmp_path / ".checkpoint.json"
+    path.write_text(
+        json.dumps(
+            {
+                "done": [
+                    "EUR/USD:2025-01-01..2025-01-05",
+                    "EUR/USD:2025-01-06..2025-01-10",
+                ]
+            }
+        )
+    )
+
+    checkpoint = Checkpoint(str(path))
+
+    assert checkpoint.missing("EUR", "USD", "2025-01-01", "2025-01-12") == [
+        ("2025-01-11", "2025-01-12")
+    ]
+    assert checkpoint.missing("EUR", "GBP", "2025-01-01", "2025-01-02") == [
+        ("2025-01-01", "2025-01-02")
+    ]
+
+
+def test_merge_prefers_new_rates(tmp_path):
+    """Test merged rates overwrite stored ones on the same date."""
+    merge_into_history(
+        str(tmp_path),
+        "EUR",
+        "USD",
+        RateSeries.from_mapping({"2025-01-02": 1.0, "2025-01-03": 1.1}),
+    )
+    total = merge_into_history(
+        str(tmp_path), "EUR", "USD", RateSeries.from_mapping({"2025-01-03": 1.2})
+    )
+
+    assert total == 2
+    assert json.loads((tmp_path / "EUR_USD.json").read_text())["rates"] == {
+        "2025-01-02": 1.0,
+        "2025-01-03": 1.2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_history_is_served_as_fallback(tmp_path, monkeypatch):
+    """Test backfilled pairs are read before the bundled dataset."""
+    merge_into_history(
+        str(tmp_path), "EUR", "GBP", RateSeries.from_mapping({"2025-01-02": 0.83})
+    )
+    monkeypatch.setattr(providers_module, "HISTORY_DIR", str(tmp_path))
+
+    class Down(FakeUpstream):
+        async def fetch_matrix(self, *args, **kwargs):
+            raise ConnectionError("down")
+
+    fallbacks = [p for p in default_providers(None) if p.fallback]
+    client = FXClient(None, providers=[Down()] + fallbacks)
+
+    rates, source = await client.fetch_rates("2025-01-01", "2025-01-03", "EUR", "GBP")
+    assert (rates, source) == ({"2025-01-02": 0.83}, "history")
+    assert client.fetch_local_rates("2025-01-01", "2025-01-03", "EUR", "GBP") == {
+        "2025-01-02": 0.83
+    }
+    with pytest.raises(ServiceUnavailableError):
+        await client.fetch_rates("2025-01-01", "2025-01-03", "EUR", "JPY")
+
+    HistoryProvider.preload_all(str(tmp_path))
+    assert HistoryProvider.is_preloaded(
+        HistoryProvider.path_for(str(tmp_path), "EUR", "GBP")
+    )
+
+
+@pytest.mark.asyncio
+async def test_covered_ranges_are_served_from_history(tmp_path):
+    """Test ranges the backfill covered skip upstream; others are routed."""
+    await make_backfill(tmp_path, FakeUpstream(), chunk_days=5).run(
+        [("EUR", "USD"), ("EUR", "GBP")], "2025-01-01", "2025-01-10"
+    )
+    upstream = FakeUpstream()
+    client = FXClient(
+        None, providers=[upstream, HistoryProvider(str(tmp_path)), LocalFileProvider()]
+    )
+
+    matrix, source = await client.fetch_matrix(
+        "2025-01-02", "2025-01-03", "EUR", ["USD", "GBP"]
+    )
+    assert source == "history" and upstream.calls == []
+    assert matrix["GBP"] == {"2025-01-02": 1.5, "2025-01-03": 1.5}
+
+    _, source = await client.fetch_rates("2025-01-09", "2025-01-11", "EUR", "USD")
+    assert source == "fake"
+    _, source = await client.fetch_matrix(
+        "2025-01-02", "2025-01-03", "EUR", ["USD", "JPY"]
+    )
+    assert source == "fake"
+    assert len(upstream.calls) == 2
+
+
+def test_cli_prints_report(tmp_path, monkeypatch, capsys):
+    """Test the command line backfills through routed providers only."""
+    upstream = FakeUpstream()
+    monkeypatch.setattr(
+        backfill_module,
+        "default_providers",
+        lambda client: [upstream, LocalFileProvider()],
+    )
+
+    main(
+        [
+            "EUR/USD",
+            "--start",
+            "2025-01-01",
+            "--end",
+            "2025-01-03",
+            "--out",
+            str(tmp_path),
+            "--rate",
+            "100",
+        ]
+    )
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["fetched"] == 1 and report["points"] == 3
+    assert (tmp_path / "EUR_USD.json").exists()
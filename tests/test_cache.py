@@ -63,3 +63,116 @@ def test_cache_overwrite():
     result = cache.get("test_key")
 
     assert result == "new_value"
+
+
+def test_cache_age():
+    """Test age of live and missing entries."""
+    cache = InMemoryCache(ttl_seconds=60)
+
+    cache.set("test_key", "value")
+
+    assert 0 <= cache.age("test_key") < 1
+    assert cache.age("nonexistent") is None
+
+
+def test_cache_entry_ttl():
+    """Test entry-specific TTL overrides the cache TTL."""
+    cache = InMemoryCache(ttl_seconds=60)
+
+    cache.set("short", "value", ttl_seconds=0)
+    cache.set("long", "value")
+    time.sleep(0.01)
+
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+
+
+def test_cache_byte_budget_evicts_least_recently_used():
+    """Test entries beyond the byte budget are evicted oldest-used first."""
+    cache = InMemoryCache(ttl_seconds=60, max_bytes=100)
+
+    cache.set("a", "value", nbytes=40)
+    cache.set("b", "value", nbytes=40)
+    cache.get("a")
+    cache.set("c", "value", nbytes=40)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "value" and cache.get("c") == "value"
+    assert cache.stats() == {
+        "entries": 2,
+        "bytes": 80,
+        "max_bytes": 100,
+        "evictions": 1,
+    }
+
+
+def test_cache_bytes_follow_overwrite_and_expiry():
+    """Test replaced and expired entries release their bytes."""
+    cache = InMemoryCache(ttl_seconds=60, max_bytes=1000)
+
+    cache.set("a", "value", nbytes=100)
+    cache.set("a", "value", nbytes=30)
+    cache.set("b", "value", ttl_seconds=0, nbytes=50)
+    time.sleep(0.01)
+    cache.get("b")
+
+    assert cache.bytes == 30
+    cache.clear()
+    assert cache.bytes == 0
+
+
+def test_cache_invalidate_overlapping_spans():
+    """Test only a group's entries overlapping the range are dropped."""
+    cache = InMemoryCache(ttl_seconds=60, max_bytes=1000)
+
+    cache.set("jan", "value", nbytes=10, spans=[("EUR/USD", 1, 31)])
+    cache.set("feb", "value", nbytes=10, spans=[("EUR/USD", 32, 59)])
+    cache.set("both", "value", spans=[("EUR/USD", 1, 59), ("EUR/GBP", 1, 59)])
+    cache.set("gbp", "value", spans=[("EUR/GBP", 1, 31)])
+
+    assert sorted(cache.invalidate("EUR/USD", 40, 45)) == ["both", "feb"]
+    assert cache.get("jan") == "value" and cache.get("gbp") == "value"
+    assert cache.bytes == 10
+    assert cache.occupancy() == {
+        "EUR/USD": {"entries": 1, "bytes": 10, "first": 1, "last": 31},
+        "EUR/GBP": {"entries": 1, "bytes": 0, "first": 1, "last": 31},
+    }
+    assert cache.invalidate("EUR/GBP") == ["gbp"]
+    assert cache.invalidate("EUR/JPY") == []
+
+
+def test_cache_index_follows_overwrite_and_eviction():
+    """Test replaced and evicted entries leave the index."""
+    cache = InMemoryCache(ttl_seconds=60, max_bytes=100)
+
+    cache.set("a", "value", nbytes=60, spans=[("EUR/USD", 1, 10)])
+    cache.set("a", "value", nbytes=60, spans=[("EUR/GBP", 1, 10)])
+    cache.set("b", "value", nbytes=60, spans=[("EUR/GBP", 5, 20)])
+
+    assert cache.invalidate("EUR/USD") == []
+    assert cache.occupancy() == {
+        "EUR/GBP": {"entries": 1, "bytes": 60, "first": 5, "last": 20}
+    }
+    cache.clear()
+    assert cache.occupancy() == {}
+
+
+def test_cache_resize_charges_growth_and_evicts():
+    """Test resizing an entry updates its bytes and enforces the budget."""
+    cache = InMemoryCache(ttl_seconds=60, max_bytes=100)
+
+    cache.set("a", "value", nbytes=40, spans=[("EUR/USD", 1, 10)])
+    cache.set("b", "value", nbytes=40)
+    cache.resize("a", 10)
+    cache.resize("missing", 500)
+
+    assert cache.bytes == 90
+    assert cache.occupancy()["EUR/USD"]["bytes"] == 50
+    cache.resize("b", 30)
+    assert cache.get("a") is None
+    assert cache.stats() == {
+        "entries": 1,
+        "bytes": 70,
+        "max_bytes": 100,
+        "evictions": 1,
+    }
@@ -2,6 +2,7 @@
 
 import pytest
 from app.services.calculator import Calculator
+from app.services.rate_series import RateSeries
 
 
 def test_compute_totals():
@@ -11,9 +12,9 @@ def test_compute_totals():
         "2025-07-02": 1.08,
         "2025-07-03": 1.06
     }
-    sorted_dates = sorted(rates.keys())
+    series = RateSeries.from_mapping(rates)
 
-    totals = Calculator._compute_totals(rates, sorted_dates)
+    totals = Calculator._compute_totals(series)
 
     assert totals.start_rate == 1.07
     assert totals.end_rate == 1.06
@@ -28,9 +29,9 @@ def test_compute_totals_division_by_zero():
         "2025-07-01": 0.0,
         "2025-07-02": 1.08
     }
-    sorted_dates = sorted(rates.keys())
+    series = RateSeries.from_mapping(rates)
 
-    totals = Calculator._compute_totals(rates, sorted_dates)
+    totals = Calculator._compute_totals(series)
 
     assert totals.start_rate == 0.0
     assert totals.end_rate == 1.08
@@ -44,9 +45,9 @@ def test_compute_daily():
         "2025-07-02": 1.08,
         "2025-07-03": 1.06
     }
-    sorted_dates = sorted(rates.keys())
+    series = RateSeries.from_mapping(rates)
 
-    daily = Calculator._compute_daily(rates, sorted_dates)
+    daily = Calculator._compute_daily(series)
 
     assert len(daily) == 3
 
@@ -75,9 +76,9 @@ def test_compute_daily_division_by_zero():
         "2025-07-02": 1.08,
         "2025-07-03": 1.06
     }
-    sorted_dates = sorted(rates.keys())
+    series = RateSeries.from_mapping(rates)
 
-    daily = Calculator._compute_daily(rates, sorted_dates)
+    daily = Calculator._compute_daily(series)
 
     assert daily[0].pct_change is None  # First day
     assert daily[1].pct_change is None  # Previous rate was 0
@@ -91,9 +92,9 @@ def test_compute_pattern_up():
         "2025-07-02": 1.08,
         "2025-07-03": 1.09
     }
-    sorted_dates = sorted(rates.keys())
+    series = RateSeries.from_mapping(rates)
 
-    pattern = Calculator._compute_pattern(rates, sorted_dates)
+    pattern = Calculator._compute_pattern(series)
 
     assert pattern.direction == "up"
     assert pattern.min_rate.rate == 1.07
@@ -109,9 +110,9 @@ def test_compute_pattern_down():
         "2025-07-02": 1.08,
         "2025-07-03": 1.07
     }
-    sorted_dates = sorted(rates.keys())
+    series = RateSeries.from_mapping(rates)
 
-    pattern = Calculator._compute_pattern(rates, sorted_dates)
+    pattern = Calculator._compute_pattern(series)
 
     assert pattern.direction == "down"
     assert pattern.min_rate.rate == 1.07
@@ -127,9 +128,9 @@ def test_compute_pattern_flat():
         "2025-07-02": 1.09,
         "2025-07-03": 1.08
     }
-    sorted_dates = sorted(rates.keys())
+    series = RateSeries.from_mapping(rates)
 
-    pattern = Calculator._compute_pattern(rates, sorted_dates)
+    pattern = Calculator._compute_pattern(series)
 
     assert pattern.direction == "flat"
     assert pattern.min_rate.rate == 1.08
@@ -165,3 +166,95 @@ def test_compute_summary_without_breakdown():
     assert totals.start_rate == 1.07
     assert len(daily) == 0
     assert pattern.direction == "down"
+
+
+def test_compute_periods_month():
+    """Test monthly resampling produces OHLC buckets."""
+    rates = {
+        "2025-06-27": 1.05,
+        "2025-06-30": 1.06,
+        "2025-07-01": 1.07,
+        "2025-07-02": 1.09,
+        "2025-07-03": 1.08
+    }
+
+    periods = Calculator.compute_periods(rates, "month")
+
+    assert [p.period for p in periods] == ["2025-06", "2025-07"]
+    july = periods[1]
+    assert july.start_date == "2025-07-01"
+    assert july.end_date == "2025-07-03"
+    assert july.open == 1.07
+    assert july.close == 1.08
+    assert july.min == 1.07
+    assert july.max == 1.09
+    assert july.count == 3
+    assert abs(july.mean - (1.07 + 1.09 + 1.08) / 3) < 1e-9
+    assert abs(july.pct_change - ((1.08 - 1.07) / 1.07 * 100)) < 0.01
+
+
+def test_compute_periods_week_quarter_year():
+    """Test week, quarter and year labels."""
+    rates = {
+        "2024-12-30": 1.04,
+        "2025-01-03": 1.03,
+        "2025-01-06": 1.02,
+        "2025-04-01": 1.08
+    }
+
+    weeks = Calculator.compute_periods(rates, "week")
+    quarters = Calculator.compute_periods(rates, "quarter")
+    years = Calculator.compute_periods(rates, "year")
+
+    assert [p.period for p in weeks] == ["2025-W01", "2025-W02", "2025-W14"]
+    assert weeks[0].count == 2
+    assert [p.period for p in quarters] == ["2024-Q4", "2025-Q1", "2025-Q2"]
+    assert [p.period for p in years] == ["2024", "2025"]
+    assert years[1].open == 1.03
+    assert years[1].close == 1.08
+
+
+def test_compute_periods_division_by_zero():
+    """Test period pct_change when the opening rate is zero."""
+    rates = {
+        "2025-07-01": 0.0,
+        "2025-07-02": 1.08
+    }
+
+    periods = Calculator.compute_periods(rates, "month")
+
+    assert periods[0].pct_change is None
+
+
+def test_compute_fields_matches_full_sections():
+    """Test selected fields equal the corresponding full section values."""
+    rates = {
+        "2025-07-01": 1.07,
+        "2025-07-02": 1.05,
+        "2025-07-03": 1.09
+    }
+    totals, _, pattern = Calculator.compute_summary(rates, "none")
+
+    assert Calculator.compute_fields(rates, "totals", list(totals.model_fields)) == totals.model_dump()
+    assert Calculator.compute_fields(rates, "pattern", list(pattern.model_fields)) == pattern.model_dump()
+    assert Calculator.compute_fields(rates, "totals", ["end_rate"]) == {"end_rate": 1.09}
+
+
+def test_compute_fields_unknown():
+    """Test unknown fields raise ValueError."""
+    with pytest.raises(ValueError):
+        Calculator.compute_fields({"2025-07-01": 1.0}, "totals", ["median"])
+
+
+def test_compute_daily_page():
+    """Test a daily page keeps pct_change against the point before it."""
+    series = RateSeries.from_mapping({
+        "2025-07-01": 1.0,
+        "2025-07-02": 1.1,
+        "2025-07-03": 1.21
+    })
+
+    page = Calculator._compute_daily(series, 1, 2)
+
+    assert [d.date for d in page] == ["2025-07-02"]
+    assert page[0].pct_change == pytest.approx(10.0)
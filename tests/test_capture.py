@@ -0,0 +1,111 @@
+"""Tests for traffic capture."""
+
+import gzip
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app, cache, rate_limiter, recorder
+from app.services.capture import TrafficRecorder, read_capture
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear cache and rate limits before and after each test."""
+    cache.clear()
+    rate_limiter.clear()
+    yield
+    cache.clear()
+
+
+def test_record_is_noop_when_stopped(tmp_path):
+    """Test nothing is buffered unless capture is running."""
+    capture = TrafficRecorder(str(tmp_path / "capture.jsonl"))
+
+    capture.record("10.0.0.1", {"start": "2025-07-01"})
+
+    assert capture.stats() == {
+        "running": False,
+        "recorded": 0,
+        "dropped": 0,
+        "buffered": 0,
+    }
+
+
+def test_records_are_anonymized_and_compact(tmp_path):
+    """Test client addresses are hashed and unknown parameters dropped."""
+    path = tmp_path / "capture-{pid}.jsonl.gz"
+    capture = TrafficRecorder(str(path))
+    capture.start()
+    capture.record(
+        "10.0.0.1", {"start": "2025-07-01", "end": "2025-07-03", "token": "secret"}
+    )
+    capture.record("10.0.0.1", {"start": "2025-07-02", "end": "2025-07-03"})
+    capture.record(
+        "10.0.0.2", {"start": "2025-07-01", "end": "2025-07-03", "from": "GBP"}
+    )
+    capture.stop()
+
+    files = list(tmp_path.glob("capture-*.jsonl.gz"))
+    assert len(files) == 1
+    raw = gzip.decompress(files[0].read_bytes()).decode()
+    assert "10.0.0.1" not in raw and "secret" not in raw
+
+    records = read_capture([str(files[0])])
+    assert [r["q"] for r in records] == [
+        {"start": "2025-07-01", "end": "2025-07-03"},
+        {"start": "2025-07-02", "end": "2025-07-03"},
+        {"start": "2025-07-01", "end": "2025-07-03", "from": "GBP"},
+    ]
+    assert records[0]["c"] == records[1]["c"] != records[2]["c"]
+    assert records[0]["t"] <= records[1]["t"] <= records[2]["t"]
+
+
+def test_buffer_bound_drops(tmp_path):
+    """Test records beyond the buffer bound are dropped and counted."""
+    capture = TrafficRecorder(
+        str(tmp_path / "capture.jsonl"), interval=60, max_buffered=2
+    )
+    capture.start()
+    for _ in range(3):
+        capture.record("10.0.0.1", {"start": "2025-07-01"})
+    stats = capture.stats()
+    capture.stop()
+
+    assert stats["recorded"] == 2 and stats["dropped"] == 1
+    assert len(read_capture([str(tmp_path / "capture.jsonl")])) == 2
+
+
+def test_read_capture_merges_files_in_arrival_order(tmp_path):
+    """Test logs of several workers are merged by arrival time."""
+    first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    first.write_text('{"t":1,"c":"a","q":{}}\n{"t":3,"c":"a","q":{}}\n')
+    second.write_text('{"t":2,"c":"b","q":{}}\n')
+
+    records = read_capture([str(first), str(second)])
+
+    assert [r["t"] for r in records] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_summary_requests_are_captured(tmp_path, monkeypatch):
+    """Test /summary records its parameters, including rejected requests."""
+    monkeypatch.setattr(recorder, "path", str(tmp_path / "capture.jsonl"))
+    recorder.start()
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/summary?start=2025-07-03&end=2025-07-01&breakdown=day"
+            )
+    finally:
+        recorder.stop()
+
+    assert response.status_code == 400
+    records = read_capture([str(tmp_path / "capture.jsonl")])
+    assert [r["q"] for r in records] == [
+        {"start": "2025-07-03", "end": "2025-07-01", "breakdown": "day"}
+    ]
+    assert json.dumps(records).count("127.0.0.1") == 0
@@ -0,0 +1,146 @@
+"""Tests for multi-pair comparison and the compare endpoint."""
+
+import itertools
+import statistics
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app, cache, rate_limiter
+from app.services.comparison import PairComparison
+from app.services.rate_series import RateSeries
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear cache and rate limits before each test."""
+    cache.clear()
+    rate_limiter.clear()
+    yield
+    cache.clear()
+
+
+USD = {"2025-07-01": 1.00, "2025-07-02": 1.10, "2025-07-03": 1.32, "2025-07-04": 1.10}
+GBP = {"2025-07-01": 2.00, "2025-07-02": 2.20, "2025-07-03": 2.42, "2025-07-07": 9.99}
+JPY = {"2025-07-01": 100.0, "2025-07-02": 90.0, "2025-07-03": 99.0}
+
+
+def returns(values):
+    return [(b - a) / a * 100 for a, b in itertools.pairwise(values)]
+
+
+def test_align_inner_joins_dates():
+    """Test only dates present for every quote are kept."""
+    ordinals, rows = PairComparison.align(
+        {"USD": RateSeries.from_mapping(USD), "GBP": RateSeries.from_mapping(GBP)}
+    )
+
+    assert len(ordinals) == 3
+    assert rows[0] == [1.00, 2.00]
+
+
+def test_compute_stats_and_correlation():
+    """Test per-pair stats and correlations match direct computation."""
+    result = PairComparison.compute(
+        {
+            "USD": RateSeries.from_mapping(USD),
+            "GBP": RateSeries.from_mapping(GBP),
+            "JPY": RateSeries.from_mapping(JPY),
+        }
+    )
+
+    usd = result["pairs"]["USD"]
+    assert result["points"] == 3
+    assert usd.end_rate == 1.32
+    assert usd.pct_change == pytest.approx(32.0)
+    assert usd.volatility == pytest.approx(
+        statistics.stdev(returns([1.0, 1.1, 1.32])), abs=1e-9
+    )
+    assert result["correlation"]["USD"]["USD"] == 1.0
+    assert result["correlation"]["USD"]["JPY"] == pytest.approx(
+        statistics.correlation(returns([1.0, 1.1, 1.32]), returns([100.0, 90.0, 99.0]))
+    )
+    assert result["correlation"]["GBP"]["JPY"] == result["correlation"]["JPY"]["GBP"]
+
+
+def test_compute_degenerate():
+    """Test constant rates and disjoint dates."""
+    flat = PairComparison.compute(
+        {
+            "USD": RateSeries.from_mapping(
+                {"2025-07-01": 1.0, "2025-07-02": 1.0, "2025-07-03": 1.0}
+            ),
+            "GBP": RateSeries.from_mapping(
+                {"2025-07-01": 1.0, "2025-07-02": 2.0, "2025-07-03": 1.0}
+            ),
+        }
+    )
+    disjoint = PairComparison.compute(
+        {
+            "USD": RateSeries.from_mapping({"2025-07-01": 1.0}),
+            "GBP": RateSeries.from_mapping({"2025-07-02": 1.0}),
+        }
+    )
+
+    assert flat["correlation"]["USD"]["GBP"] is None
+    assert flat["pairs"]["USD"].volatility == 0.0
+    assert disjoint is None
+
+
+@pytest.mark.asyncio
+async def test_compare_endpoint_one_fetch():
+    """Test the endpoint fetches all quotes once and caches the comparison."""
+    matrix = {"USD": RateSeries.from_mapping(USD), "JPY": RateSeries.from_mapping(JPY)}
+    fetch = AsyncMock(return_value=(matrix, "frankfurter"))
+
+    with patch("app.main.FXClient") as fx_client:
+        fx_client.return_value.fetch_matrix = fetch
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response1 = await client.get(
+                "/compare?start=2025-07-01&end=2025-07-04&quotes=usd,JPY"
+            )
+            response2 = await client.get(
+                "/compare?start=2025-07-01&end=2025-07-06&quotes=JPY,USD"
+            )
+
+    assert response1.status_code == 200
+    fetch.assert_awaited_once()
+    assert fetch.await_args.args == ("2025-07-01", "2025-07-04", "EUR", ["JPY", "USD"])
+    data1 = response1.json()
+    data2 = response2.json()
+    assert data1["meta"]["cache"] == "MISS"
+    assert data2["meta"]["cache"] == "HIT"
+    assert [p["quote"] for p in data1["pairs"]] == ["USD", "JPY"]
+    assert [p["quote"] for p in data2["pairs"]] == ["JPY", "USD"]
+    assert data1["correlation"]["USD"]["JPY"] == data2["correlation"]["JPY"]["USD"]
+
+
+@pytest.mark.asyncio
+async def test_compare_endpoint_errors():
+    """Test validation, no-data and upstream failures."""
+    from app.services.fx_client import ServiceUnavailableError
+
+    fetch = AsyncMock(side_effect=ServiceUnavailableError("down"))
+    with patch("app.main.FXClient") as fx_client:
+        fx_client.return_value.fetch_matrix = fetch
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            invalid = await client.get(
+                "/compare?start=2025-07-01&end=2025-07-03&quotes=US"
+            )
+            base_quote = await client.get(
+                "/compare?start=2025-07-01&end=2025-07-03&quotes=EUR"
+            )
+            weekend = await client.get(
+                "/compare?start=2025-07-05&end=2025-07-06&quotes=USD"
+            )
+            down = await client.get(
+                "/compare?start=2025-07-01&end=2025-07-03&quotes=USD"
+            )
+
+    assert invalid.status_code == 400
+    assert base_quote.status_code == 400
+    assert weekend.status_code == 404
+    assert down.status_code == 503
@@ -0,0 +1,122 @@
+"""Tests for the compute worker pool."""
+
+import asyncio
+import json
+import threading
+from unittest.mock import mock_open, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main
+from app.main import app, cache, rate_limiter
+from app.services.admission import OverloadedError
+from app.services.compute_pool import ComputePool
+
+
+@pytest.mark.asyncio
+async def test_small_jobs_run_inline():
+    """Test jobs below the threshold run on the calling thread."""
+    pool = ComputePool(max_workers=1, threshold=10)
+
+    thread = await pool.run(5, threading.get_ident)
+
+    assert thread == threading.get_ident()
+    assert pool.stats()["inline"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_large_jobs_offloaded():
+    """Test jobs at or above the threshold run in a worker thread."""
+    pool = ComputePool(max_workers=1, threshold=10)
+
+    thread = await pool.run(10, threading.get_ident)
+
+    assert thread != threading.get_ident()
+    assert pool.stats()["offloaded"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_backpressure_rejects_when_full():
+    """Test jobs beyond max_pending are rejected while the loop stays free."""
+    pool = ComputePool(max_workers=1, max_pending=2, threshold=0)
+    release = threading.Event()
+
+    jobs = [asyncio.create_task(pool.run(1, release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    assert pool.stats()["queue_depth"] == 1
+    with pytest.raises(OverloadedError):
+        await pool.run(1, release.wait)
+
+    release.set()
+    await asyncio.gather(*jobs)
+    assert pool.stats()["rejected"] == 1
+    assert pool.pending == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_summary_rendered_in_pool():
+    """Test large summaries are rendered through the pool."""
+
+    async def mock_get(*args, **kwargs):
+        raise ConnectionError("Force fallback")
+
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {"2025-07-01": 1.07, "2025-07-02": 1.08},
+    }
+    pool = ComputePool(max_workers=1, threshold=1)
+    cache.clear()
+    rate_limiter.clear()
+
+    with (
+        patch("app.main.http_client") as mock_client,
+        patch.object(main, "compute_pool", pool),
+        patch("builtins.open", mock_open(read_data=json.dumps(local_data))),
+    ):
+        mock_client.get = mock_get
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/summary?start=2025-07-01&end=2025-07-02&breakdown=day"
+            )
+            stats = await client.get("/metrics")
+
+    cache.clear()
+    pool.shutdown()
+    assert response.status_code == 200
+    assert len(response.json()["daily"]) == 2
+    assert stats.json()["compute"]["offloaded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_summary_pool_saturated():
+    """Test 503 with Retry-After when the pool is saturated."""
+
+    async def mock_get(*args, **kwargs):
+        raise ConnectionError("Force fallback")
+
+    local_data = {"base": "EUR", "to": "USD", "rates": {"2025-07-01": 1.07}}
+    pool = ComputePool(max_workers=1, max_pending=0, threshold=1)
+    cache.clear()
+    rate_limiter.clear()
+
+    with (
+        patch("app.main.http_client") as mock_client,
+        patch.object(main, "compute_pool", pool),
+        patch("builtins.open", mock_open(read_data=json.dumps(local_data))),
+    ):
+        mock_client.get = mock_get
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/summary?start=2025-07-01&end=2025-07-01")
+
+    cache.clear()
+    pool.shutdown()
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
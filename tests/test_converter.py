@@ -0,0 +1,263 @@
+"""Tests for bulk amount conversion."""
+
+import asyncio
+import json
+from datetime import date
+from unittest.mock import AsyncMock, mock_open, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.services.admission import OverloadedError
+from app.services.converter import (
+    BulkConverter,
+    RateTable,
+    format_record,
+    iter_lines,
+    parse_records,
+)
+from app.services.fx_client import ServiceUnavailableError
+from app.services.rate_series import RateSeries
+
+RATES = {"2025-07-03": 1.06, "2025-07-04": 1.065, "2025-07-07": 1.09}
+
+
+def ordinal(date_str):
+    return date.fromisoformat(date_str).toordinal()
+
+
+async def agen(items):
+    for item in items:
+        yield item
+
+
+async def collect(aiter):
+    return [item async for item in aiter]
+
+
+def test_rate_table_previous():
+    """Test weekend dates use the previous fixing."""
+    table = RateTable(
+        RateSeries.from_mapping(RATES),
+        ordinal("2025-07-03"),
+        ordinal("2025-07-07"),
+        "previous",
+    )
+
+    assert table.lookup(ordinal("2025-07-05")) == (1.065, "2025-07-04")
+    assert table.lookup(ordinal("2025-07-07")) == (1.09, "2025-07-07")
+
+
+def test_rate_table_next():
+    """Test weekend dates use the next fixing."""
+    table = RateTable(
+        RateSeries.from_mapping(RATES),
+        ordinal("2025-07-03"),
+        ordinal("2025-07-08"),
+        "next",
+    )
+
+    assert table.lookup(ordinal("2025-07-06")) == (1.09, "2025-07-07")
+    assert table.lookup(ordinal("2025-07-08")) is None
+
+
+def test_rate_table_error():
+    """Test weekend dates have no rate with the error policy."""
+    table = RateTable(
+        RateSeries.from_mapping(RATES),
+        ordinal("2025-07-03"),
+        ordinal("2025-07-07"),
+        "error",
+    )
+
+    assert table.lookup(ordinal("2025-07-05")) is None
+    assert table.lookup(ordinal("2025-07-04")) == (1.065, "2025-07-04")
+
+
+@pytest.mark.asyncio
+async def test_bulk_converter_fetches_once_per_currency():
+    """Test records are converted with one fetch per currency."""
+    fx_client = AsyncMock()
+    fx_client.fetch_rates = AsyncMock(return_value=(RATES, "frankfurter"))
+    converter = BulkConverter(fx_client, "USD")
+    records = [
+        {"date": "2025-07-04", "amount": "100", "currency": "eur"},
+        {"date": "2025-07-05", "amount": 10, "currency": "EUR"},
+        {"date": "2025-07-05", "amount": 5, "currency": "USD"},
+        {"date": "bad", "amount": 1, "currency": "EUR"},
+        {"date": "2025-07-04", "amount": 1},
+    ]
+
+    result = await collect(converter.convert(agen(records)))
+
+    assert fx_client.fetch_rates.await_count == 1
+    assert result[0]["converted"] == pytest.approx(106.5)
+    assert result[1]["rate_date"] == "2025-07-04"
+    assert result[2]["rate"] == 1.0
+    assert result[3]["error"] == "invalid date or amount"
+    assert result[4]["error"] == "missing currency"
+
+
+@pytest.mark.asyncio
+async def test_bulk_converter_extends_range():
+    """Test a later batch outside the loaded range fetches only the new span."""
+    fx_client = AsyncMock()
+    fx_client.fetch_rates = AsyncMock(return_value=(RATES, "frankfurter"))
+    converter = BulkConverter(fx_client, "USD")
+
+    with patch("app.services.converter.CONVERT_BATCH_SIZE", 1):
+        await collect(
+            converter.convert(
+                agen(
+                    [
+                        {"date": "2025-07-04", "amount": 1, "currency": "EUR"},
+                        {"date": "2025-07-04", "amount": 1, "currency": "EUR"},
+                        {"date": "2025-08-01", "amount": 1, "currency": "EUR"},
+                    ]
+                )
+            )
+        )
+
+    calls = fx_client.fetch_rates.await_args_list
+    assert len(calls) == 2
+    assert calls[1].args[0] == "2025-07-12"
+
+
+@pytest.mark.asyncio
+async def test_bulk_converter_unavailable():
+    """Test records get an error when rates cannot be fetched."""
+    fx_client = AsyncMock()
+    fx_client.fetch_rates = AsyncMock(side_effect=ServiceUnavailableError())
+    converter = BulkConverter(fx_client, "USD")
+
+    result = await collect(
+        converter.convert(
+            agen([{"date": "2025-07-04", "amount": 1, "currency": "GBP"}])
+        )
+    )
+
+    assert result[0]["error"] == "rates unavailable"
+
+
+@pytest.mark.asyncio
+async def test_parse_csv_and_ndjson():
+    """Test CSV and NDJSON parsing across chunk boundaries."""
+    csv_chunks = [b"date,amount,curr", b"ency\r\n2025-07-04,1", b"0,EUR\n"]
+    ndjson_chunks = [b'{"date": "2025-07-04"}\nnot json\n[1]']
+
+    csv_records = await collect(parse_records(iter_lines(agen(csv_chunks)), "csv"))
+    ndjson_records = await collect(
+        parse_records(iter_lines(agen(ndjson_chunks)), "ndjson")
+    )
+
+    assert csv_records == [{"date": "2025-07-04", "amount": "10", "currency": "EUR"}]
+    assert ndjson_records == [{"date": "2025-07-04"}, {}, {}]
+
+
+def test_format_record():
+    """Test output serialization."""
+    record = {
+        "date": "2025-07-04",
+        "amount": 1.0,
+        "currency": "EUR",
+        "to": "USD",
+        "error": "x",
+    }
+
+    assert json.loads(format_record(record, "ndjson")) == record
+    assert format_record(record, "csv") == "2025-07-04,1.0,EUR,USD,,,,x\n"
+
+
+@pytest.mark.asyncio
+async def test_convert_endpoint_csv():
+    """Test the endpoint streams converted CSV using the local fallback."""
+
+    async def mock_get(*args, **kwargs):
+        raise ConnectionError("Force fallback")
+
+    local_data = {"base": "EUR", "to": "USD", "rates": RATES}
+    body = "date,amount,currency\n2025-07-04,100,EUR\n2025-07-05,100,EUR\n"
+
+    with (
+        patch("app.main.http_client") as mock_client,
+        patch("builtins.open", mock_open(read_data=json.dumps(local_data))),
+    ):
+        mock_client.get = mock_get
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/convert?gap_policy=error",
+                content=body,
+                headers={"content-type": "text/csv"},
+            )
+
+    assert response.status_code == 200
+    lines = response.text.strip().split("\n")
+    assert lines[0].startswith("date,amount,currency,to,rate")
+    assert lines[1].startswith("2025-07-04,100.0,EUR,USD,1.065,2025-07-04,106.5")
+    assert lines[2].endswith("no fixing for date")
+
+
+@pytest.mark.asyncio
+async def test_convert_endpoint_invalid_policy():
+    """Test 400 error for unknown gap policy."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/convert?gap_policy=nearest", content="")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_invalid_utf8():
+    """Test undecodable bytes are replaced instead of aborting the stream."""
+    lines = await collect(iter_lines(agen([b"2025-07-04,\xff1,EUR\nok\n"])))
+
+    assert lines == ["2025-07-04,�1,EUR", "ok"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_converter_retries_after_backoff():
+    """Test a transient failure only fails records until the backoff passes."""
+    fx_client = AsyncMock()
+    fx_client.fetch_rates = AsyncMock(
+        side_effect=[ServiceUnavailableError(), (RATES, "frankfurter")]
+    )
+    converter = BulkConverter(fx_client, "USD")
+    records = [{"date": "2025-07-04", "amount": 1, "currency": "EUR"}] * 3
+
+    with (
+        patch("app.services.converter.CONVERT_BATCH_SIZE", 1),
+        patch("app.services.converter.CONVERT_RETRY_BACKOFF_SECONDS", 0.05),
+    ):
+
+        async def paced():
+            for i, record in enumerate(records):
+                if i == 2:
+                    await asyncio.sleep(0.06)
+                yield record
+
+        result = await collect(converter.convert(paced()))
+
+    assert [r.get("error") for r in result] == [
+        "rates unavailable",
+        "rates unavailable",
+        None,
+    ]
+    assert result[2]["rate"] == 1.065
+    assert fx_client.fetch_rates.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_convert_endpoint_rate_limited():
+    """Test uploads count against the client rate limit."""
+    with patch(
+        "app.main.rate_limiter.check", side_effect=OverloadedError("slow down", 3)
+    ):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/convert", content="")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
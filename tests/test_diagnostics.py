@@ -0,0 +1,134 @@
+"""Tests for event-loop and memory diagnostics."""
+
+import asyncio
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main
+from app.main import app, cache
+from app.services.cache import InMemoryCache
+from app.services.diagnostics import (
+    LoopLagMonitor,
+    MemoryProfiler,
+    cache_memory_by_pair,
+    deep_sizeof,
+)
+from app.services.rate_series import RateSeries
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear cache before and after each test."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def blocking_work():
+    time.sleep(0.15)
+
+
+def test_lag_histogram_buckets():
+    """Test samples land in the first bucket they fit."""
+    monitor = LoopLagMonitor(buckets_ms=(1, 10))
+
+    for lag in [0.5, 1.0, 5, 50]:
+        monitor.record(lag)
+
+    stats = monitor.stats()
+    assert stats["histogram"] == {"le_1ms": 2, "le_10ms": 1, "inf": 1}
+    assert stats["max_ms"] == 50
+    assert stats["samples"] == 4
+
+
+@pytest.mark.asyncio
+async def test_blocking_callback_reported_with_stack():
+    """Test a blocked loop is measured and its stack captured."""
+    monitor = LoopLagMonitor(interval=0.01, slow_threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.03)
+
+    blocking_work()
+    await asyncio.sleep(0.03)
+    await monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["max_ms"] >= 100
+    assert stats["slow_callbacks"]
+    assert "blocking_work" in stats["slow_callbacks"][0]["stack"]
+
+
+def test_memory_snapshot_and_diff():
+    """Test tracemalloc diffs show allocations made after the baseline."""
+    profiler = MemoryProfiler(frames=1)
+    with pytest.raises(RuntimeError):
+        profiler.diff()
+
+    try:
+        profiler.snapshot()
+        held = [bytearray(1024) for _ in range(200)]
+        diff = profiler.diff(limit=5)
+    finally:
+        profiler.stop()
+
+    assert held
+    assert diff["top"][0]["size_diff_bytes"] > 100_000
+    assert "test_diagnostics.py" in diff["top"][0]["location"]
+    assert not profiler.tracing
+
+
+def test_cache_memory_by_pair():
+    """Test cache memory is grouped by currency pair, largest first."""
+    store = InMemoryCache(ttl_seconds=60)
+    big = RateSeries(range(730000, 731000), [1.0] * 1000)
+    store.set("EUR_USD_2000-01-01_2002-09-26", {"series": big, "meta": {}})
+    store.set("EUR_GBP_2025-07-01_2025-07-02", {"series": RateSeries([730000], [1.0])})
+    store.set("compare_EUR_GBP,USD_2025-07-01_2025-07-02", {"points": 1})
+
+    usage = cache_memory_by_pair(store)
+
+    assert next(iter(usage)) == "EUR/USD"
+    assert set(usage) == {"EUR/USD", "EUR/GBP", "EUR/GBP,USD"}
+    assert usage["EUR/GBP"]["entries"] == 1
+    assert usage["EUR/USD"]["bytes"] > big.nbytes()
+    assert deep_sizeof([big, big]) < 2 * deep_sizeof(big)
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_endpoints(monkeypatch):
+    """Test the diagnostics endpoints."""
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test", headers={"X-Admin-Token": "secret"}
+    ) as client:
+        overview = await client.get("/diagnostics")
+        missing = await client.get("/diagnostics/memory/diff")
+        snapshot = await client.post("/diagnostics/memory/snapshot")
+        diff = await client.get("/diagnostics/memory/diff?limit=3")
+        stopped = await client.post("/diagnostics/memory/stop")
+
+    assert set(overview.json()) == {"loop", "cache", "tracemalloc"}
+    assert missing.status_code == 409
+    assert snapshot.json()["tracing"] is True
+    assert len(diff.json()["top"]) <= 3
+    assert stopped.json() == {"tracing": False}
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_require_admin_token(monkeypatch):
+    """Test diagnostics are refused without the admin token."""
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for method, path in [
+            ("GET", "/diagnostics"),
+            ("POST", "/diagnostics/memory/snapshot"),
+            ("GET", "/diagnostics/memory/diff"),
+            ("POST", "/diagnostics/memory/stop"),
+        ]:
+            assert (await client.request(method, path)).status_code == 403
+
+    assert not MemoryProfiler().tracing
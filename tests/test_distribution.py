@@ -0,0 +1,92 @@
+"""Tests for distribution statistics and quantile sketches."""
+
+import random
+import statistics
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.distribution import DistributionStats, QuantileSketch, SketchStore
+from app.services.rate_series import RateSeries
+
+
+def make_series(days, start=date(2000, 1, 3), seed=7):
+    rng = random.Random(seed)
+    ordinals = [(start + timedelta(days=i)).toordinal() for i in range(days)]
+    return RateSeries(ordinals, [1.0 + rng.random() for _ in ordinals])
+
+
+def test_exact_small_range():
+    """Test small ranges use exact interpolated quantiles."""
+    series = RateSeries.from_mapping(
+        {"2025-07-01": 1.0, "2025-07-02": 2.0, "2025-07-03": 3.0, "2025-07-04": 4.0}
+    )
+
+    result = DistributionStats.compute(series, bins=3)
+
+    assert result.method == "exact"
+    assert result.median == 2.5
+    assert result.p5 == pytest.approx(1.15)
+    assert result.p95 == pytest.approx(3.85)
+    assert [b.count for b in result.histogram] == [1, 1, 2]
+    assert result.histogram[-1].upper == 4.0
+
+
+def test_exact_constant_rates():
+    """Test identical rates produce a single histogram bin."""
+    series = RateSeries.from_mapping({"2025-07-01": 1.1, "2025-07-02": 1.1})
+
+    result = DistributionStats.compute(series)
+
+    assert result.median == 1.1
+    assert [(b.lower, b.upper, b.count) for b in result.histogram] == [(1.1, 1.1, 2)]
+
+
+def test_sketch_within_accuracy():
+    """Test sketched quantiles stay within the relative accuracy."""
+    series = make_series(6000)
+    values = sorted(series.rates)
+
+    result = DistributionStats.compute(series, exact_max=100, today=date(2030, 1, 1))
+
+    assert result.method == "sketch"
+    assert result.count == len(values)
+    assert sum(b.count for b in result.histogram) == len(values)
+    assert result.median == pytest.approx(statistics.median(values), rel=0.003)
+    assert result.p5 == pytest.approx(values[int(0.05 * (len(values) - 1))], rel=0.003)
+    assert result.p95 == pytest.approx(values[int(0.95 * (len(values) - 1))], rel=0.003)
+
+
+def test_sketch_store_reuses_complete_years():
+    """Test complete years are sketched once and shared across ranges."""
+    series = make_series(6000)
+    store = SketchStore()
+
+    DistributionStats.compute(
+        series, store, "EUR/USD", exact_max=100, today=date(2030, 1, 1)
+    )
+    stored = len(store)
+    DistributionStats.compute(
+        series.slice(date(2001, 6, 1).toordinal(), series.ordinals[-1]),
+        store,
+        "EUR/USD",
+        exact_max=100,
+        today=date(2030, 1, 1),
+    )
+
+    assert stored == 15
+    assert len(store) == stored
+
+
+def test_sketch_merge_equals_combined():
+    """Test merged sketches match a sketch of all values."""
+    a = QuantileSketch().add_all([1.0, 1.1, 1.2, 0.0])
+    b = QuantileSketch().add_all([1.3, 1.4])
+    combined = QuantileSketch().add_all([1.0, 1.1, 1.2, 0.0, 1.3, 1.4])
+
+    merged = a.merge(b)
+
+    assert merged.buckets == combined.buckets
+    assert (merged.count, merged.zeros, merged.min, merged.max) == (6, 1, 0.0, 1.4)
+    assert merged.quantile(0.0) == 0.0
+    assert merged.quantile(1.0) == pytest.approx(1.4, rel=0.002)
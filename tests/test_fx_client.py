@@ -130,3 +130,56 @@ async def test_local_file_currency_mismatch():
 
         with pytest.raises(ServiceUnavailableError):
             await client.fetch_rates("2025-07-01", "2025-07-03", "GBP", "USD")
+
+
+@pytest.mark.asyncio
+async def test_fetch_latest():
+    """Test latest rate fetch."""
+    mock_http_response = MagicMock()
+    mock_http_response.json.return_value = {
+        "amount": 1.0,
+        "base": "EUR",
+        "date": "2025-07-04",
+        "rates": {"USD": 1.17}
+    }
+    mock_http_response.raise_for_status = MagicMock()
+
+    mock_http_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_http_client.get = AsyncMock(return_value=mock_http_response)
+
+    client = FXClient(mock_http_client)
+    latest = await client.fetch_latest("EUR", "USD")
+
+    assert latest == ("2025-07-04", 1.17)
+    assert mock_http_client.get.await_args.args[0].endswith("/latest")
+
+
+@pytest.mark.asyncio
+async def test_fetch_matrix_single_request():
+    """Test all quotes are fetched with one API call."""
+    mock_http_response = MagicMock()
+    mock_http_response.json.return_value = {
+        "amount": 1.0,
+        "base": "EUR",
+        "start_date": "2025-07-01",
+        "end_date": "2025-07-02",
+        "rates": {
+            "2025-07-01": {"USD": 1.07, "GBP": 0.85},
+            "2025-07-02": {"USD": 1.08}
+        }
+    }
+    mock_http_response.raise_for_status = MagicMock()
+
+    mock_http_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_http_client.get = AsyncMock(return_value=mock_http_response)
+
+    client = FXClient(mock_http_client)
+    matrix, source = await client.fetch_matrix("2025-07-01", "2025-07-02", "EUR", ["USD", "GBP"])
+
+    assert source == "frankfurter"
+    assert matrix == {
+        "USD": {"2025-07-01": 1.07, "2025-07-02": 1.08},
+        "GBP": {"2025-07-01": 0.85}
+    }
+    mock_http_client.get.assert_awaited_once()
+    assert mock_http_client.get.await_args.kwargs["params"]["to"] == "USD,GBP"
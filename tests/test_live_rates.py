@@ -0,0 +1,159 @@
+"""Tests for live latest-rate subscriptions."""
+
+import asyncio
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.services.admission import OverloadedError
+from app.services.live_rates import LiveRateHub, Subscription, parse_pairs
+
+
+def test_subscription_drops_oldest_when_full():
+    """Test slow consumers keep only the newest events."""
+    subscription = Subscription([("EUR", "USD")], buffer=2)
+
+    for event in ["a", "b", "c"]:
+        subscription.offer(event)
+
+    assert subscription.dropped == 1
+    assert subscription.queue.get_nowait() == "b"
+    assert subscription.queue.get_nowait() == "c"
+
+
+def test_parse_pairs():
+    """Test pair parsing, de-duplication and limits."""
+    assert parse_pairs("eur/usd, EUR/GBP,EUR/USD", 5) == [
+        ("EUR", "USD"),
+        ("EUR", "GBP"),
+    ]
+    with pytest.raises(ValueError):
+        parse_pairs("EURUSD", 5)
+    with pytest.raises(ValueError):
+        parse_pairs("EUR/USD,EUR/GBP", 1)
+
+
+@pytest.mark.asyncio
+async def test_one_poller_shared_by_subscribers():
+    """Test many subscribers share one poller and get only changed values."""
+    values = iter([("2025-07-04", 1.17), ("2025-07-04", 1.17), ("2025-07-07", 1.18)])
+    calls = []
+
+    async def fetch_latest(pair):
+        calls.append(pair)
+        return next(values, ("2025-07-07", 1.18))
+
+    hub = LiveRateHub(fetch_latest, interval=0.01)
+    subscribers = [hub.subscribe([("EUR", "USD")]) for _ in range(50)]
+    await asyncio.sleep(0.05)
+
+    assert hub.subscriber_count(("EUR", "USD")) == 50
+    assert len(hub._pollers) == 1
+    for subscription in subscribers:
+        events = [
+            subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())
+        ]
+        assert [json.loads(e.split("data: ")[1])["rate"] for e in events] == [
+            1.17,
+            1.18,
+        ]
+
+    late = hub.subscribe([("EUR", "USD")])
+    assert "1.18" in late.queue.get_nowait()
+
+    for subscription in subscribers + [late]:
+        hub.unsubscribe(subscription)
+    assert hub._pollers == {}
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_poll_errors_are_tolerated():
+    """Test a failing poll does not stop the poller."""
+    attempts = 0
+
+    async def fetch_latest(pair):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("upstream down")
+        return ("2025-07-04", 1.17)
+
+    hub = LiveRateHub(fetch_latest, interval=0.01)
+    subscription = hub.subscribe([("EUR", "USD")])
+    await asyncio.sleep(0.05)
+
+    assert not subscription.queue.empty()
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_events_keepalive_and_unsubscribe():
+    """Test the event stream sends keepalives and unsubscribes on close."""
+
+    async def fetch_latest(pair):
+        await asyncio.sleep(10)
+
+    hub = LiveRateHub(fetch_latest, interval=1)
+    subscription = hub.subscribe([("EUR", "USD")])
+    subscription.offer("event: rate\ndata: {}\n\n")
+
+    stream = hub.events(subscription, keepalive=0.01)
+    assert (await stream.__anext__()).startswith("event: rate")
+    assert await stream.__anext__() == ": keepalive\n\n"
+    await stream.aclose()
+
+    assert hub.subscriber_count(("EUR", "USD")) == 0
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_invalid_pairs():
+    """Test 400 error for malformed pairs."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/stream?pairs=EURUSD")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_poller_and_subscription_limits():
+    """Test subscriptions beyond the poller or subscription cap are refused."""
+
+    async def fetch_latest(pair):
+        return ("2025-07-04", 1.17)
+
+    hub = LiveRateHub(fetch_latest, interval=1, max_pollers=2, max_subscriptions=3)
+    first = hub.subscribe([("EUR", "USD"), ("EUR", "GBP")])
+
+    with pytest.raises(OverloadedError):
+        hub.subscribe([("EUR", "JPY")])
+    hub.subscribe([("EUR", "USD")])
+    hub.subscribe([("EUR", "GBP")])
+    with pytest.raises(OverloadedError):
+        hub.subscribe([("EUR", "USD")])
+
+    hub.unsubscribe(first)
+    hub.subscribe([("EUR", "USD")])
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_stream_overloaded(monkeypatch):
+    """Test the stream answers 503 when the hub is full."""
+    from app import main
+
+    def full(pairs):
+        raise OverloadedError("Too many distinct live pairs", 5)
+
+    monkeypatch.setattr(main.live_hub, "subscribe", full)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/stream", params={"pairs": "EUR/JPY"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
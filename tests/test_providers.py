@@ -0,0 +1,200 @@
+"""Tests for rate providers and latency-aware routing."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.services.fx_client import FXClient, ServiceUnavailableError
+from app.services.providers import HTTPProvider, ProviderRouter, default_providers
+from app.services.rate_series import RateSeries
+
+
+class StubProvider:
+    """In-memory provider with configurable delay and failure."""
+
+    fallback = False
+
+    def __init__(self, name, delay=0.0, fail=False, fallback=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.fallback = fallback
+        self.calls = 0
+
+    async def fetch_matrix(self, start, end, base, quotes, timeout=10):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise httpx.ConnectError(f"{self.name} down")
+        return {quote: RateSeries.from_mapping({start: 1.0}) for quote in quotes}
+
+    async def fetch_latest(self, base, quote, timeout=10):
+        self.calls += 1
+        if self.fail:
+            raise httpx.ConnectError(f"{self.name} down")
+        return "2025-07-04", 1.17
+
+
+def router(**kwargs):
+    return ProviderRouter(
+        **{"min_timeout": 0.02, "timeout_factor": 2.0, "cooldown": 60, **kwargs}
+    )
+
+
+@pytest.mark.asyncio
+async def test_routes_to_fastest_provider():
+    """Test traffic goes to the provider with the lowest observed latency."""
+    shared = router()
+    slow = StubProvider("slow", delay=0.03)
+    fast = StubProvider("fast", delay=0.0)
+    client = FXClient(None, shared, [slow, fast])
+
+    for _ in range(4):
+        _, source = await client.fetch_rates("2025-07-01", "2025-07-01")
+
+    assert source == "fast"
+    assert [p.name for p in shared.order([slow, fast])] == ["fast", "slow"]
+
+
+@pytest.mark.asyncio
+async def test_shifts_when_provider_turns_slow():
+    """Test a provider that turns slow is cut off and loses traffic."""
+    shared = router()
+    primary = StubProvider("primary")
+    mirror = StubProvider("mirror", delay=0.005)
+    client = FXClient(None, shared, [primary, mirror])
+    for _ in range(3):
+        await client.fetch_rates("2025-07-01", "2025-07-01")
+
+    primary.delay = 1.0
+    sources = [
+        (await client.fetch_rates("2025-07-01", "2025-07-01"))[1] for _ in range(4)
+    ]
+
+    assert sources == ["mirror"] * 4
+    assert 1 <= shared.stats()["primary"]["failures"] <= 4
+    assert shared.order([primary, mirror])[0] is mirror
+
+
+@pytest.mark.asyncio
+async def test_failing_provider_cools_down():
+    """Test failures push a provider behind healthy ones."""
+    shared = router(error_threshold=0.1)
+    broken = StubProvider("broken", fail=True)
+    healthy = StubProvider("healthy", delay=0.01)
+    shared.record("broken", 0.001, ok=True)
+    client = FXClient(None, shared, [broken, healthy])
+
+    _, first = await client.fetch_rates("2025-07-01", "2025-07-01")
+    _, second = await client.fetch_rates("2025-07-01", "2025-07-01")
+
+    assert (first, second) == ("healthy", "healthy")
+    assert broken.calls == 1
+    assert shared.stats()["broken"]["healthy"] is False
+
+
+@pytest.mark.asyncio
+async def test_fallback_used_last_and_not_for_latest():
+    """Test fallback providers only answer after routed ones fail."""
+    primary = StubProvider("primary", fail=True)
+    local = StubProvider("local", fallback=True)
+    client = FXClient(None, router(), [local, primary])
+
+    _, source = await client.fetch_rates("2025-07-01", "2025-07-01")
+    assert source == "local"
+
+    with pytest.raises(httpx.ConnectError):
+        await client.fetch_latest("EUR", "USD")
+    assert local.calls == 1
+
+    local.fail = True
+    with pytest.raises(ServiceUnavailableError):
+        await client.fetch_rates("2025-07-01", "2025-07-01")
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_count_as_failures():
+    """Test 4xx responses pass through uncounted while 5xx ones count."""
+    shared = router(error_threshold=0.1)
+    status = 404
+
+    async def handler(request):
+        return httpx.Response(status)
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    primary = HTTPProvider("primary", "https://primary.example", http_client)
+    mirror = StubProvider("mirror")
+    client = FXClient(http_client, shared, [primary, mirror])
+
+    for _ in range(3):
+        with pytest.raises(ServiceUnavailableError):
+            await client.fetch_rates("2025-07-01", "2025-07-01", "EUR", "XXX")
+    assert mirror.calls == 0
+    assert shared.stats()["primary"]["failures"] == 0
+    assert shared.stats()["primary"]["healthy"] is True
+
+    status = 503
+    _, source = await client.fetch_rates("2025-07-01", "2025-07-01")
+    assert source == "mirror"
+    assert shared.stats()["primary"]["failures"] == 1
+    await http_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_http_mirror_uses_same_shape():
+    """Test any Frankfurter-shaped HTTP source can serve as a mirror."""
+    response = MagicMock()
+    response.json.return_value = {
+        "amount": 1.0,
+        "base": "EUR",
+        "date": "2025-07-04",
+        "rates": {"USD": 1.17},
+    }
+    http_client = AsyncMock(spec=httpx.AsyncClient)
+    http_client.get = AsyncMock(return_value=response)
+
+    mirror = HTTPProvider("mirror", "http://fx-mirror.internal/", http_client)
+    latest = await FXClient(http_client, router(), [mirror]).fetch_latest("EUR", "USD")
+
+    assert latest == ("2025-07-04", 1.17)
+    assert http_client.get.await_args.args[0] == "http://fx-mirror.internal/latest"
+
+
+def test_default_providers_include_mirrors():
+    """Test configured mirrors sit between Frankfurter and the local file."""
+    with patch(
+        "app.services.providers.RATE_MIRRORS", {"mirror": "http://fx-mirror.internal"}
+    ):
+        names = [p.name for p in default_providers(None)]
+
+    assert names == ["frankfurter", "mirror", "local_file"]
+
+
+def test_fetch_local_rates_requires_local_provider():
+    """Test shed requests fail clearly without a local dataset."""
+    with pytest.raises(LookupError):
+        FXClient(None, router(), [StubProvider("primary")]).fetch_local_rates(
+            "2025-07-01", "2025-07-01"
+        )
+
+
+def test_providers_built_once_per_http_client(monkeypatch):
+    """Test requests reuse the configured providers until the HTTP client changes."""
+    from app import main
+
+    built = []
+    monkeypatch.setattr(
+        main, "default_providers", lambda http_client: built.append(http_client) or []
+    )
+    monkeypatch.setattr(main, "_providers", None)
+    monkeypatch.setattr(main, "http_client", MagicMock())
+
+    main._fx_client()
+    main._fx_client()
+    assert len(built) == 1
+
+    monkeypatch.setattr(main, "http_client", MagicMock())
+    main._fx_client()
+    assert len(built) == 2
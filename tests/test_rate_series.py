@@ -0,0 +1,105 @@
+"""Tests for the array-backed rate series."""
+
+import pickle
+from datetime import date
+
+import pytest
+
+from app.services.rate_series import RateSeries
+from app.utils.validators import (
+    decode_cursor,
+    encode_cursor,
+    parse_date_ordinal,
+    validate_date_format,
+    validate_date_range,
+)
+
+RATES = {"2025-07-03": 1.06, "2025-07-01": 1.07, "2025-07-02": 1.08, "2025-07-07": 1.09}
+
+
+def test_from_mapping_sorts_once():
+    """Test construction sorts points and stores typed arrays."""
+    series = RateSeries.from_mapping(RATES)
+
+    assert series.dates() == ["2025-07-01", "2025-07-02", "2025-07-03", "2025-07-07"]
+    assert list(series.rates) == [1.07, 1.08, 1.06, 1.09]
+    assert series.ordinals.typecode == "l"
+    assert series.rates.typecode == "d"
+    assert RateSeries.from_mapping(series) is series
+
+
+def test_mapping_interface():
+    """Test the series behaves like a read-only dict."""
+    series = RateSeries.from_mapping(RATES)
+
+    assert series == RATES
+    assert len(series) == 4
+    assert series["2025-07-02"] == 1.08
+    assert "2025-07-04" not in series
+    assert "garbage" not in series
+    assert series.date(0) == "2025-07-01"
+    assert not RateSeries()
+
+
+def test_slice_dates():
+    """Test inclusive range slicing."""
+    series = RateSeries.from_mapping(RATES)
+
+    sliced = series.slice_dates("2025-07-02", "2025-07-05")
+
+    assert sliced == {"2025-07-02": 1.08, "2025-07-03": 1.06}
+    assert series.slice_dates("2025-08-01", "2025-08-02") == {}
+
+
+def test_position():
+    """Test position finds the first point on or after a day."""
+    series = RateSeries.from_mapping(RATES)
+
+    assert series.position(parse_date_ordinal("2025-07-02")) == 1
+    assert series.position(parse_date_ordinal("2025-07-04")) == 3
+    assert series.position(parse_date_ordinal("2025-08-01")) == 4
+
+
+def test_merge_prefers_other():
+    """Test merging keeps order and lets the newer series win."""
+    series = RateSeries.from_mapping({"2025-07-01": 1.0, "2025-07-03": 1.0})
+    other = RateSeries.from_mapping({"2025-07-02": 2.0, "2025-07-03": 3.0})
+
+    merged = series.merge(other)
+
+    assert merged.dates() == ["2025-07-01", "2025-07-02", "2025-07-03"]
+    assert merged["2025-07-03"] == 3.0
+
+
+def test_nbytes_and_pickle():
+    """Test memory accounting and round-tripping through pickle."""
+    series = RateSeries.from_mapping(RATES)
+
+    assert series.nbytes() == 4 * (series.ordinals.itemsize + 8)
+    assert pickle.loads(pickle.dumps(series)) == series
+
+
+def test_parse_date_ordinal():
+    """Test strict YYYY-MM-DD parsing."""
+    assert parse_date_ordinal("2025-07-01") == date(2025, 7, 1).toordinal()
+    for bad in ["2025-7-1", "2025/07/01", "2025-13-01", "abcd-ef-gh", None]:
+        with pytest.raises(ValueError):
+            parse_date_ordinal(bad)
+
+
+def test_validators():
+    """Test date validators share the fast parser."""
+    assert validate_date_format("2025-07-01").day == 1
+    validate_date_range("2025-07-01", "2025-07-01")
+    with pytest.raises(ValueError):
+        validate_date_range("2025-07-02", "2025-07-01")
+
+
+def test_cursor_round_trip():
+    """Test cursors decode to the encoded ordinal and reject garbage."""
+    ordinal = parse_date_ordinal("2025-07-01")
+
+    assert decode_cursor(encode_cursor(ordinal)) == ordinal
+    for bad in ["", "not-a-cursor", encode_cursor(0), "ZDp4"]:
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
@@ -0,0 +1,159 @@
+"""Tests for the background refresher."""
+
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.cache import InMemoryCache
+from app.services.refresher import RefreshScheduler
+
+QUERY = ("EUR", "USD", "2025-07-01", "2025-07-03")
+
+
+def make_scheduler(cache, refresh, **kwargs):
+    return RefreshScheduler(
+        cache, lambda query: InMemoryCache.make_key(*query), refresh, jitter=0, **kwargs
+    )
+
+
+def test_hot_orders_by_frequency():
+    """Test hot queries are ranked by request count."""
+    other = ("EUR", "USD", "2025-07-02", "2025-07-03")
+    scheduler = make_scheduler(InMemoryCache(60), AsyncMock(), top_n=1)
+
+    scheduler.record(QUERY)
+    scheduler.record(other)
+    scheduler.record(other)
+
+    assert scheduler.hot() == [other]
+
+
+def test_due_when_missing_or_near_expiry():
+    """Test entries are due when missing or close to expiry."""
+    cache = InMemoryCache(ttl_seconds=60)
+    scheduler = make_scheduler(cache, AsyncMock())
+
+    assert scheduler.due(QUERY)
+
+    cache.set(InMemoryCache.make_key(*QUERY), {"data": 1})
+    assert not scheduler.due(QUERY)
+
+    with patch(
+        "app.services.cache.time.time",
+        return_value=cache._cache["EUR_USD_2025-07-01_2025-07-03"][1] + 50,
+    ):
+        assert scheduler.due(QUERY)
+
+
+def test_due_after_publication():
+    """Test entries covering today are due once today's fixing is published."""
+    query = ("EUR", "USD", "2025-07-01", "2025-07-03")
+    cache = InMemoryCache(ttl_seconds=3600)
+    scheduler = make_scheduler(cache, AsyncMock())
+    cache.set(InMemoryCache.make_key(*query), {"data": 1})
+
+    stored = cache._cache[InMemoryCache.make_key(*query)][1]
+    before = datetime.fromtimestamp(stored, UTC)
+    with patch(
+        "app.services.refresher.PUBLICATION_TIME_UTC", before.strftime("%H:%M:%S.%f")
+    ):
+        later = datetime.fromtimestamp(stored + 1, UTC)
+        with patch("app.services.cache.time.time", return_value=stored + 1):
+            assert not scheduler.due(query, now=later)
+            today_query = ("EUR", "USD", "2025-07-01", later.date().isoformat())
+            cache.set(InMemoryCache.make_key(*today_query), {"data": 1})
+            cache._cache[InMemoryCache.make_key(*today_query)] = (
+                {"data": 1},
+                stored - 1,
+                3600,
+            )
+            assert scheduler.due(today_query, now=later)
+
+
+@pytest.mark.asyncio
+async def test_run_once_refreshes_due_and_decays():
+    """Test a round refreshes due queries and halves popularity."""
+    refresh = AsyncMock()
+    scheduler = make_scheduler(InMemoryCache(60), refresh)
+    scheduler.record(QUERY)
+    scheduler.record(QUERY)
+
+    refreshed = await scheduler.run_once()
+
+    assert refreshed == 1
+    refresh.assert_awaited_once_with(QUERY)
+    assert scheduler.hot() == [QUERY]
+    await scheduler.run_once()
+    assert scheduler.hot() == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_failure_counted():
+    """Test failed refreshes are counted and do not raise."""
+    scheduler = make_scheduler(InMemoryCache(60), AsyncMock(side_effect=RuntimeError()))
+    scheduler.record(QUERY)
+
+    assert await scheduler.run_once() == 0
+    assert scheduler.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    """Test no more than the configured number of refreshes run at once."""
+    running = 0
+    peak = 0
+
+    async def refresh(query):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    scheduler = make_scheduler(InMemoryCache(60), refresh, concurrency=2)
+    for day in range(1, 6):
+        scheduler.record(("EUR", "USD", f"2025-07-0{day}", "2025-07-09"))
+
+    assert await scheduler.run_once() == 5
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_start_stop():
+    """Test the background loop runs rounds and stops cleanly."""
+    refresh = AsyncMock()
+    scheduler = make_scheduler(InMemoryCache(60), refresh, interval=0.01)
+    scheduler.record(QUERY)
+
+    scheduler.start()
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+
+    assert refresh.await_count >= 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_shares_fetch_with_concurrent_miss():
+    """Test a refresh and a user miss for the same query fetch upstream once."""
+    from app import main
+
+    calls = 0
+
+    async def fill(query):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return {"meta": {}}
+
+    query = ("EUR", "USD", "2025-07-01", "2025-07-04")
+    with patch("app.main._fill_cache", fill):
+        await asyncio.gather(
+            main._refresh(query),
+            main.coalescer.do(
+                InMemoryCache.make_key(*query), lambda: main._fill_cache(query)
+            ),
+        )
+
+    assert calls == 1
@@ -0,0 +1,118 @@
+"""Tests for the traffic replay tool."""
+
+import asyncio
+import json
+from datetime import date
+
+import httpx
+import pytest
+
+from app import main as service
+from app.replay import StubUpstream, main, replay, replay_in_process, summarize
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear cache and rate limits before and after each test."""
+    service.cache.clear()
+    service.rate_limiter.clear()
+    yield
+    service.cache.clear()
+
+
+def record(t, start="2025-07-01", end="2025-07-04", client="c1", **params):
+    return {"t": t, "c": client, "q": {"start": start, "end": end, **params}}
+
+
+@pytest.mark.asyncio
+async def test_stub_upstream_is_deterministic():
+    """Test the stub serves the same rates for publication days only."""
+    stub = StubUpstream(latency=0)
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(stub), base_url="http://stub"
+    ) as client:
+        first = (
+            await client.get(
+                "/2025-07-04..2025-07-07", params={"from": "EUR", "to": "USD"}
+            )
+        ).json()
+        second = (
+            await client.get(
+                "/2025-07-04..2025-07-07", params={"from": "EUR", "to": "USD"}
+            )
+        ).json()
+
+    assert first == second
+    assert sorted(first["rates"]) == ["2025-07-04", "2025-07-07"]
+    assert first["rates"]["2025-07-04"]["USD"] == StubUpstream.rate(
+        "EUR", "USD", date(2025, 7, 4).toordinal()
+    )
+    assert stub.calls == 2
+
+
+def test_summarize_report():
+    """Test hit rate and nearest-rank latency percentiles."""
+    results = [(200, "HIT", 0.001 * i) for i in range(1, 100)] + [
+        (200, "MISS", 0.1),
+        (400, None, 0.002),
+    ]
+
+    report = summarize(results, upstream_calls=1, elapsed=2.0)
+
+    assert report["requests"] == 101
+    assert report["status"] == {"200": 100, "400": 1}
+    assert report["hit_rate"] == 0.99
+    assert report["upstream_calls"] == 1
+    assert report["latency_ms"]["p50"] == 50
+    assert report["latency_ms"]["max"] == 100
+    assert report["throughput_rps"] == 50.5
+
+
+@pytest.mark.asyncio
+async def test_replay_respects_arrival_offsets():
+    """Test requests are sent at their recorded offsets, scaled by speed."""
+    sent = []
+
+    async def send(rec):
+        sent.append(rec["t"])
+        return httpx.Response(200, json={"meta": {"cache": "HIT"}})
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await replay([record(1000), record(1200)], send, speed=2)
+
+    assert loop.time() - started >= 0.09
+    assert sent == [1000, 1200]
+    assert [r[:2] for r in results] == [(200, "HIT"), (200, "HIT")]
+
+
+@pytest.mark.asyncio
+async def test_replay_in_process_reports_cache_behavior():
+    """Test repeated queries hit the cache and only misses reach upstream."""
+    records = [
+        record(0),
+        record(50),
+        # Saturday start shares the entry of the Monday start
+        record(100, start="2025-07-05", end="2025-07-08"),
+        record(150, start="2025-07-07", end="2025-07-08"),
+        record(200, start="2025-07-03", end="2025-07-01"),
+    ]
+
+    report = await replay_in_process(records, speed=1, upstream_latency=0)
+
+    assert report["status"] == {"200": 4, "400": 1}
+    assert report["upstream_calls"] == 2
+    assert report["hit_rate"] == 0.5
+    assert service.http_client is None
+
+
+def test_cli_prints_report(tmp_path, capsys):
+    """Test the command line replays logs in-process; concurrent misses coalesce."""
+    path = tmp_path / "capture.jsonl"
+    path.write_text("\n".join(json.dumps(record(t)) for t in (0, 5)) + "\n")
+
+    main([str(path), "--speed", "0", "--upstream-latency-ms", "0"])
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["requests"] == 2
+    assert report["upstream_calls"] == 1
@@ -0,0 +1,108 @@
+"""Tests for the compressed cache encoding of rate series."""
+
+import random
+from datetime import date
+
+import pytest
+
+from app.services.rate_series import RateSeries
+from app.services.series_codec import EncodedSeries
+from app.services.trading_calendar import TradingCalendar
+
+
+@pytest.fixture(scope="module")
+def history():
+    """Twenty-five years of four-decimal daily fixings."""
+    calendar = TradingCalendar()
+    ordinals = [
+        o
+        for o in range(date(2000, 1, 3).toordinal(), date(2025, 1, 1).toordinal())
+        if calendar.is_publication_day(o)
+    ]
+    rng = random.Random(7)
+    rate, rates = 1.1, []
+    for _ in ordinals:
+        rate = round(rate * (1 + rng.gauss(0, 0.005)), 4)
+        rates.append(rate)
+    return RateSeries(ordinals, rates)
+
+
+def test_round_trip_is_exact(history):
+    """Test decoding restores every ordinal and rate bit for bit."""
+    encoded = EncodedSeries.encode(history)
+
+    decoded = encoded.decode()
+
+    assert encoded.decimals == 4
+    assert list(decoded.ordinals) == list(history.ordinals)
+    assert list(decoded.rates) == list(history.rates)
+
+
+def test_compresses_ten_times(history):
+    """Test daily fixings take a tenth of the array-backed size."""
+    encoded = EncodedSeries.encode(history)
+
+    assert encoded.nbytes() * 10 <= history.nbytes()
+
+
+def test_unscalable_rates_stay_exact():
+    """Test rates needing more than the allowed decimals are kept raw."""
+    series = RateSeries(range(738000, 738600), [random.random() for _ in range(600)])
+
+    encoded = EncodedSeries.encode(series, block_size=64)
+
+    assert encoded.decimals is None
+    assert encoded.decode() == series
+
+
+@pytest.mark.parametrize(
+    "lo,hi", [(0, 1), (250, 260), (255, 257), (1000, 1600), (6000, 10**6)]
+)
+def test_slices_cross_blocks(history, lo, hi):
+    """Test slices starting and ending anywhere match the original."""
+    encoded = EncodedSeries.encode(history, block_size=256)
+
+    part = encoded.decode(lo, hi)
+
+    assert list(part.ordinals) == list(history.ordinals[lo:hi])
+    assert list(part.rates) == list(history.rates[lo:hi])
+
+
+def test_position_and_ordinal(history):
+    """Test point lookups decode a single block and agree with the series."""
+    encoded = EncodedSeries.encode(history, block_size=128)
+
+    for i in (0, 127, 128, 3000, len(history) - 1):
+        assert encoded.ordinal(i) == history.ordinals[i]
+        assert encoded.position(history.ordinals[i]) == i
+        # A weekend or holiday maps to the next publication day
+        assert encoded.position(history.ordinals[i] - 1) == history.position(
+            history.ordinals[i] - 1
+        )
+    assert encoded.position(history.ordinals[-1] + 1) == len(history)
+
+
+def test_empty_and_tiny_series():
+    """Test degenerate series encode and decode."""
+    assert len(EncodedSeries.encode(RateSeries()).decode()) == 0
+    single = RateSeries([739000], [0.0])
+    assert EncodedSeries.encode(single).decode() == single
+    assert EncodedSeries.encode(single).decode(1, 5) == RateSeries()
+
+
+def test_endpoints_inflate_first_and_last_blocks(history, monkeypatch):
+    """Test endpoints decode only the first and last points."""
+    encoded = EncodedSeries.encode(history, block_size=256)
+    inflated = []
+    block = EncodedSeries._block
+    monkeypatch.setattr(
+        EncodedSeries, "_block", lambda self, b: inflated.append(b) or block(self, b)
+    )
+
+    ends = encoded.endpoints()
+
+    assert list(ends.ordinals) == [history.ordinals[0], history.ordinals[-1]]
+    assert list(ends.rates) == [history.rates[0], history.rates[-1]]
+    assert inflated == [0, len(encoded.blocks) - 1]
+    single = RateSeries([739000], [1.5])
+    assert EncodedSeries.encode(single).endpoints() == single
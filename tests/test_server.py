@@ -0,0 +1,136 @@
+"""Tests for the pre-fork server."""
+
+import gc
+import os
+import signal
+import time
+from unittest.mock import mock_open, patch
+
+import pytest
+
+from app import main
+from app.server import PreforkServer, bind, default_workers, preload
+from app.services.providers import LocalFileProvider
+
+
+@pytest.fixture
+def sock():
+    listener = bind("127.0.0.1", 0)
+    yield listener
+    listener.close()
+
+
+def idle(sock):
+    """Worker body that waits to be terminated."""
+    while True:
+        time.sleep(0.05)
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_preload_shares_dataset():
+    """Test preload parses the dataset once and serves it from memory."""
+    data = '{"base": "EUR", "to": "USD", "rates": {"2025-07-01": 1.07, "2025-07-02": 1.08}}'
+    try:
+        with patch("builtins.open", mock_open(read_data=data)) as file_open:
+            preload()
+            rates = LocalFileProvider().load("2025-07-01", "2025-07-02", "EUR", "USD")
+            LocalFileProvider().load("2025-07-01", "2025-07-01", "EUR", "USD")
+
+        assert rates == {"2025-07-01": 1.07, "2025-07-02": 1.08}
+        assert file_open.call_count == 1
+        assert gc.get_freeze_count() > 0
+        assert main.calendar.is_publication_day(main.calendar.first_on_or_after(730000))
+    finally:
+        gc.unfreeze()
+        LocalFileProvider.unload()
+
+
+def test_bind_inheritable(sock):
+    """Test the shared socket is listening and inheritable."""
+    assert sock.get_inheritable()
+    assert sock.getsockname()[1] > 0
+
+
+def test_spawn_reload_and_stop(sock):
+    """Test workers are forked, replaced one by one on reload, and stopped."""
+    loads = []
+    server = PreforkServer(
+        sock, workers=2, serve=idle, load=lambda: loads.append(1), graceful_timeout=2
+    )
+    first = {server.spawn(), server.spawn()}
+    assert all(alive(pid) for pid in first)
+
+    server.reload()
+    assert loads == [1]
+    assert len(server.pids) == 2 and server.reloading
+
+    deadline = time.monotonic() + 5
+    while server.reloading and time.monotonic() < deadline:
+        server.supervise()
+        time.sleep(0.02)
+
+    assert len(server.pids) == 2
+    assert not server.pids & first
+    assert not any(alive(pid) for pid in first)
+
+    server.stop()
+    assert not server.pids
+
+
+def test_reap_reports_exited_worker(sock):
+    """Test crashed workers are reaped so the master can respawn them."""
+    server = PreforkServer(sock, workers=1, serve=idle, load=lambda: None)
+    pid = server.spawn()
+    os.kill(pid, signal.SIGKILL)
+
+    for _ in range(50):
+        exited = server.reap()
+        if exited:
+            break
+        time.sleep(0.02)
+
+    assert exited == [pid]
+    assert not server.pids
+
+
+def test_retiring_worker_killed_after_deadline(sock):
+    """Test a worker that ignores SIGTERM is killed once its drain deadline passes."""
+
+    def stubborn(sock):
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        idle(sock)
+
+    server = PreforkServer(
+        sock, workers=1, serve=stubborn, load=lambda: None, graceful_timeout=0.1
+    )
+    pid = server.spawn()
+    time.sleep(0.1)
+    server.retire(pid)
+
+    deadline = time.monotonic() + 5
+    while server.retiring and time.monotonic() < deadline:
+        server.supervise()
+        time.sleep(0.02)
+
+    assert not server.retiring
+    assert not alive(pid)
+    assert not server.pids
+
+
+def test_default_workers(monkeypatch):
+    """Test WEB_CONCURRENCY wins and the CPU-based default is capped."""
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert default_workers() == 3
+
+    monkeypatch.delenv("WEB_CONCURRENCY")
+    monkeypatch.setattr(
+        os, "sched_getaffinity", lambda pid: set(range(64)), raising=False
+    )
+    assert default_workers() == 4
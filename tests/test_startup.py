@@ -0,0 +1,98 @@
+"""Tests for startup warm-up, readiness and the startup budget."""
+
+import asyncio
+import logging
+import subprocess
+import sys
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app import main
+from app.config import STARTUP_BUDGET_SECONDS
+from app.services.providers import LocalFileProvider
+from app.services.startup import StartupTracker
+
+IMPORT_SCRIPT = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+async def run_lifespan(tracker):
+    """Run the app lifespan with a stub HTTP client until warm-up finishes."""
+    http_client = MagicMock()
+    http_client.head = AsyncMock()
+    http_client.aclose = AsyncMock()
+
+    with (
+        patch("app.main.httpx.AsyncClient", return_value=http_client),
+        patch("app.main.startup", tracker),
+        patch("app.main.REFRESH_ENABLED", False),
+    ):
+        async with main.app.router.lifespan_context(main.app):
+            for _ in range(200):
+                if tracker.ready:
+                    break
+                await asyncio.sleep(0.01)
+    return http_client
+
+
+@pytest.mark.asyncio
+async def test_import_and_startup_within_budget():
+    """Test a fresh import plus warm-up fits in the startup budget."""
+    result = await asyncio.to_thread(
+        subprocess.run,
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_seconds = float(result.stdout.strip())
+    tracker = StartupTracker(time.perf_counter())
+
+    try:
+        http_client = await run_lifespan(tracker)
+    finally:
+        LocalFileProvider.unload()
+
+    assert tracker.ready
+    assert tracker.failed == []
+    warmup_seconds = tracker.ready_at - tracker.started_at
+    assert import_seconds + warmup_seconds < STARTUP_BUDGET_SECONDS
+    http_client.head.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_ready_separate_from_health():
+    """Test /ready is 503 until warm-up finishes while /health is always ok."""
+    tracker = StartupTracker(time.perf_counter())
+
+    with patch("app.main.startup", tracker):
+        transport = ASGITransport(app=main.app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            health = await client.get("/health")
+            starting = await client.get("/ready")
+            await tracker.run({"noop": AsyncMock()})
+            ready = await client.get("/ready")
+
+    assert health.status_code == 200
+    assert starting.status_code == 503
+    assert starting.json() == {"status": "starting"}
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ready"
+    assert "noop" in ready.json()["steps"]
+
+
+@pytest.mark.asyncio
+async def test_failed_step_and_budget_warning(caplog):
+    """Test failed steps do not block readiness and overruns are logged."""
+    tracker = StartupTracker(time.perf_counter() - 10, budget=1.0)
+
+    with caplog.at_level(logging.WARNING, logger="app.services.startup"):
+        await tracker.run(
+            {"ok": AsyncMock(), "broken": AsyncMock(side_effect=RuntimeError("boom"))}
+        )
+
+    assert tracker.ready
+    assert tracker.failed == ["broken"]
+    assert "over the 1000 ms budget" in caplog.text
@@ -1,17 +1,22 @@
 """Integration tests for summary endpoint."""
 
 import json
+from datetime import date
+
 import pytest
 from unittest.mock import AsyncMock, patch, mock_open, MagicMock
 from httpx import AsyncClient, ASGITransport
 
-from app.main import app, cache
+from app.config import NEGATIVE_CACHE_ENTRY_BYTES
+from app.main import app, cache, rate_limiter
+from app.services.series_codec import EncodedSeries
 
 
 @pytest.fixture(autouse=True)
 def clear_cache():
-    """Clear cache before each test."""
+    """Clear cache and rate limits before each test."""
     cache.clear()
+    rate_limiter.clear()
     yield
     cache.clear()
 
@@ -186,3 +191,358 @@ async def test_summary_with_pattern(mock_api_error):
     assert data["pattern"]["direction"] == "up"
     assert data["pattern"]["min_rate"]["rate"] == 1.07
     assert data["pattern"]["max_rate"]["rate"] == 1.09
+
+
+@pytest.mark.asyncio
+async def test_summary_breakdown_month(mock_api_error):
+    """Test monthly breakdown returns periods and reuses cached rollups."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {
+            "2025-06-30": 1.06,
+            "2025-07-01": 1.07,
+            "2025-07-02": 1.08,
+            "2025-07-03": 1.06
+        }
+    }
+
+    with patch("builtins.open", mock_open(read_data=json.dumps(local_data))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response1 = await client.get(
+                "/summary?start=2025-06-30&end=2025-07-03&breakdown=none"
+            )
+            response2 = await client.get(
+                "/summary?start=2025-06-30&end=2025-07-03&breakdown=month"
+            )
+
+    assert response1.json()["periods"] == []
+    data = response2.json()
+    assert data["meta"]["cache"] == "HIT"
+    assert data["meta"]["breakdown"] == "month"
+    assert data["daily"] == []
+    assert [p["period"] for p in data["periods"]] == ["2025-06", "2025-07"]
+    assert data["periods"][1]["open"] == 1.07
+    assert data["periods"][1]["close"] == 1.06
+    assert data["periods"][1]["max"] == 1.08
+
+
+@pytest.mark.asyncio
+async def test_summary_day_after_none_hit(mock_api_error):
+    """Test cached entry keeps full daily data for later day breakdowns."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {
+            "2025-07-01": 1.07,
+            "2025-07-02": 1.08
+        }
+    }
+
+    with patch("builtins.open", mock_open(read_data=json.dumps(local_data))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/summary?start=2025-07-01&end=2025-07-02&breakdown=none")
+            response = await client.get(
+                "/summary?start=2025-07-01&end=2025-07-02&breakdown=day"
+            )
+
+    data = response.json()
+    assert data["meta"]["cache"] == "HIT"
+    assert len(data["daily"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_summary_with_analytics(mock_api_error):
+    """Test rolling analytics are returned on MISS and HIT."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {
+            "2025-07-01": 1.07,
+            "2025-07-02": 1.08,
+            "2025-07-03": 1.06,
+            "2025-07-04": 1.065
+        }
+    }
+
+    with patch("builtins.open", mock_open(read_data=json.dumps(local_data))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            url = "/summary?start=2025-07-01&end=2025-07-04&analytics=sma,drawdown&window=2"
+            response1 = await client.get(url)
+            response2 = await client.get(url)
+            plain = await client.get("/summary?start=2025-07-01&end=2025-07-04")
+
+    for response in (response1, response2):
+        analytics = response.json()["analytics"]
+        assert analytics["window"] == 2
+        assert len(analytics["moving_average"]) == 3
+        assert analytics["drawdown"]["trough"]["date"] == "2025-07-03"
+    assert plain.json()["analytics"] is None
+
+
+@pytest.mark.asyncio
+async def test_summary_invalid_analytics():
+    """Test 400 error for unknown analytics kind or bad window."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response1 = await client.get(
+            "/summary?start=2025-07-01&end=2025-07-03&analytics=rsi"
+        )
+        response2 = await client.get(
+            "/summary?start=2025-07-01&end=2025-07-03&analytics=sma&window=1"
+        )
+
+    assert response1.status_code == 400
+    assert response2.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_summary_non_numeric_window():
+    """Test non-numeric window returns the repo's 400 error body."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(
+            "/summary?start=2025-07-01&end=2025-07-03&analytics=sma&window=abc"
+        )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "ValidationError"
+
+
+@pytest.mark.asyncio
+async def test_summary_weekend_range_short_circuits():
+    """Test ranges without publication days return 404 without fetching."""
+    with patch("app.main.FXClient") as fx_client:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/summary?start=2025-07-05&end=2025-07-06")
+
+    assert response.status_code == 404
+    assert response.json()["detail"]["error"] == "NoDataFound"
+    fx_client.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_summary_no_data_negative_cached(mock_api_error):
+    """Test an empty range is remembered and not fetched again."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {"2025-06-02": 1.08}
+    }
+    file_open = mock_open(read_data=json.dumps(local_data))
+
+    with patch("builtins.open", file_open):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response1 = await client.get("/summary?start=2025-07-01&end=2025-07-03")
+            response2 = await client.get("/summary?start=2025-07-01&end=2025-07-03")
+
+    assert response1.status_code == 404
+    assert response2.status_code == 404
+    assert file_open.call_count == 1
+    # Negative entries count against the byte budget too
+    assert cache.bytes == NEGATIVE_CACHE_ENTRY_BYTES
+
+
+@pytest.mark.asyncio
+async def test_summary_equivalent_ranges_share_entry(mock_api_error):
+    """Test ranges covering the same publication days hit one cache entry."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {
+            "2025-07-04": 1.07,
+            "2025-07-07": 1.08,
+            "2025-07-08": 1.06
+        }
+    }
+    file_open = mock_open(read_data=json.dumps(local_data))
+
+    with patch("builtins.open", file_open):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response1 = await client.get("/summary?start=2025-07-07&end=2025-07-08")
+            response2 = await client.get("/summary?start=2025-07-05&end=2025-07-08&from=eur&to=usd")
+
+    assert file_open.call_count == 1
+    data1 = response1.json()
+    data2 = response2.json()
+    assert data2["meta"]["cache"] == "HIT"
+    assert data2["meta"]["start"] == "2025-07-05"
+    assert data2["meta"]["base"] == "eur"
+    assert data2["totals"] == data1["totals"]
+    assert data2["pattern"] == data1["pattern"]
+
+
+@pytest.mark.asyncio
+async def test_summary_field_selection(mock_api_error):
+    """Test fields= returns only the requested sections and fields."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {
+            "2025-07-01": 1.07,
+            "2025-07-02": 1.09,
+            "2025-07-03": 1.08
+        }
+    }
+
+    with patch("builtins.open", mock_open(read_data=json.dumps(local_data))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            partial = await client.get(
+                "/summary?start=2025-07-01&end=2025-07-03&fields=totals.end_rate,pattern.direction"
+            )
+            section = await client.get("/summary?start=2025-07-01&end=2025-07-03&fields=pattern")
+            full = await client.get("/summary?start=2025-07-01&end=2025-07-03")
+
+    assert partial.status_code == 200
+    data = partial.json()
+    assert set(data) == {"meta", "totals", "pattern"}
+    assert data["totals"] == {"end_rate": 1.08}
+    assert data["pattern"] == {"direction": "up"}
+    assert set(section.json()) == {"meta", "pattern"}
+    assert section.json()["pattern"] == full.json()["pattern"]
+
+
+@pytest.fixture
+def long_history():
+    """Four years of weekday rates, spanning several encoded blocks."""
+    start = date(2021, 1, 4).toordinal()
+    days = [date.fromordinal(o) for o in range(start, start + 4 * 365) if date.fromordinal(o).weekday() < 5]
+    return {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {d.isoformat(): round(1.1 + (i % 50) / 1000, 4) for i, d in enumerate(days)}
+    }
+
+
+@pytest.mark.asyncio
+async def test_summary_endpoint_fields_skip_full_decode(mock_api_error, long_history, monkeypatch):
+    """Test endpoint-only fields inflate the first and last blocks, not the series."""
+    inflated = []
+    block = EncodedSeries._block
+    monkeypatch.setattr(EncodedSeries, "_block", lambda self, b: inflated.append(b) or block(self, b))
+
+    with patch("builtins.open", mock_open(read_data=json.dumps(long_history))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(
+                "/summary?start=2021-01-04&end=2024-12-31"
+                "&fields=totals.start_rate,totals.end_rate,totals.total_pct_change,pattern.direction"
+            )
+
+    assert response.status_code == 200
+    assert response.json()["totals"]["start_rate"] == 1.1
+    # Two blocks per endpoint-only section, out of more than four
+    assert len(inflated) <= 4
+    assert set(inflated) == {0, max(inflated)} and max(inflated) >= 4
+
+
+@pytest.mark.asyncio
+async def test_summary_memoized_views_count_against_cache(mock_api_error, long_history):
+    """Test sections and rollups kept on an entry grow the cache's byte total."""
+    with patch("builtins.open", mock_open(read_data=json.dumps(long_history))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            url = "/summary?start=2021-01-04&end=2024-12-31"
+            await client.get(f"{url}&fields=totals.end_rate")
+            encoded_only = cache.bytes
+            await client.get(url)
+            with_sections = cache.bytes
+            await client.get(f"{url}&breakdown=month")
+            with_rollups = cache.bytes
+            await client.get(f"{url}&breakdown=month")
+
+    assert encoded_only < with_sections < with_rollups
+    # Views are charged once, not on every hit
+    assert cache.bytes == with_rollups
+
+
+@pytest.mark.asyncio
+async def test_summary_invalid_fields():
+    """Test unknown fields return 400."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/summary?start=2025-07-01&end=2025-07-03&fields=totals.median")
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "ValidationError"
+
+
+@pytest.mark.asyncio
+async def test_summary_daily_pagination(mock_api_error):
+    """Test limit/cursor walk the daily breakdown page by page."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {
+            "2025-07-01": 1.07,
+            "2025-07-02": 1.08,
+            "2025-07-03": 1.06,
+            "2025-07-04": 1.09,
+            "2025-07-07": 1.10
+        }
+    }
+
+    with patch("builtins.open", mock_open(read_data=json.dumps(local_data))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            url = "/summary?start=2025-07-01&end=2025-07-07&breakdown=day&limit=2"
+            pages = [(await client.get(url)).json()]
+            while pages[-1]["next_cursor"]:
+                pages.append((await client.get(f"{url}&cursor={pages[-1]['next_cursor']}")).json())
+
+    assert [len(page["daily"]) for page in pages] == [2, 2, 1]
+    assert pages[0]["totals"]["end_rate"] == 1.10
+    assert pages[0]["pattern"]["direction"] == "up"
+    assert all(page["totals"] is None and page["pattern"] is None for page in pages[1:])
+    assert pages[1]["daily"][0]["date"] == "2025-07-03"
+    assert pages[1]["daily"][0]["pct_change"] is not None
+    assert pages[-1]["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_summary_pagination_validation():
+    """Test bad cursors, limits and breakdowns return 400."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        base = "/summary?start=2025-07-01&end=2025-07-03"
+        responses = [
+            await client.get(f"{base}&breakdown=day&cursor=garbage"),
+            await client.get(f"{base}&breakdown=day&limit=0"),
+            await client.get(f"{base}&breakdown=day&limit=abc"),
+            await client.get(f"{base}&breakdown=none&limit=10"),
+        ]
+
+    assert [r.status_code for r in responses] == [400, 400, 400, 400]
+
+
+@pytest.mark.asyncio
+async def test_summary_distribution(mock_api_error):
+    """Test distribution=true adds median, quantiles and histogram."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {
+            "2025-07-01": 1.07,
+            "2025-07-02": 1.09,
+            "2025-07-03": 1.08
+        }
+    }
+
+    with patch("builtins.open", mock_open(read_data=json.dumps(local_data))):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/summary?start=2025-07-01&end=2025-07-03&distribution=true")
+            plain = await client.get("/summary?start=2025-07-01&end=2025-07-03")
+
+    distribution = response.json()["distribution"]
+    assert distribution["method"] == "exact"
+    assert distribution["median"] == 1.08
+    assert sum(b["count"] for b in distribution["histogram"]) == 3
+    assert plain.json()["distribution"] is None
@@ -0,0 +1,270 @@
+"""Tests for request tracing."""
+
+import asyncio
+import json
+import time
+from unittest.mock import mock_open, patch
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app, cache, rate_limiter, tracer
+from app.services.compute_pool import ComputePool
+from app.services.tracing import (
+    NOOP_SPAN,
+    JsonlExporter,
+    OTLPExporter,
+    SpanProcessor,
+    Tracer,
+    build_exporter,
+    parse_traceparent,
+    start_span,
+)
+
+
+class ListExporter:
+    """Collect exported spans in memory."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Clear cache and rate limits before and after each test."""
+    cache.clear()
+    rate_limiter.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """Sample every request into an in-memory exporter."""
+    exporter = ListExporter()
+    monkeypatch.setattr(tracer, "processor", SpanProcessor(exporter))
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    return exporter
+
+
+def test_unsampled_spans_are_noops():
+    """Test nothing is recorded without a sampled root span."""
+    exporter = ListExporter()
+    processor = SpanProcessor(exporter)
+
+    assert start_span("orphan") is NOOP_SPAN
+    assert Tracer(processor, sample_rate=0).start_trace("root") is NOOP_SPAN
+    processor.flush()
+    assert exporter.spans == []
+
+
+@pytest.mark.asyncio
+async def test_context_propagates_to_tasks_and_threads():
+    """Test spans opened in tasks and pool threads get the right parent."""
+    exporter = ListExporter()
+    processor = SpanProcessor(exporter)
+    pool = ComputePool(threshold=0)
+
+    def in_thread():
+        with start_span("thread"):
+            pass
+
+    async def in_task():
+        with start_span("task"):
+            await asyncio.sleep(0)
+
+    with (
+        Tracer(processor, sample_rate=1).start_trace("root") as root,
+        start_span("child") as child,
+    ):
+        await asyncio.gather(asyncio.create_task(in_task()), pool.run(1, in_thread))
+    pool.shutdown()
+    processor.flush()
+
+    by_name = {span.name: span for span in exporter.spans}
+    assert set(by_name) == {"root", "child", "task", "thread"}
+    assert {span.trace_id for span in exporter.spans} == {root.trace_id}
+    assert by_name["root"].parent_id is None
+    assert by_name["child"].parent_id == root.span_id
+    assert by_name["task"].parent_id == child.span_id
+    assert by_name["thread"].parent_id == child.span_id
+
+
+def test_traceparent_continues_callers_trace():
+    """Test an incoming traceparent sets trace id and parent but not sampling."""
+    processor = SpanProcessor(ListExporter())
+    trace_id, parent_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    span = Tracer(processor, sample_rate=1).start_trace(
+        "root", f"00-{trace_id}-{parent_id}-00"
+    )
+    assert (span.trace_id, span.parent_id) == (trace_id, parent_id)
+    assert (
+        Tracer(processor, sample_rate=0).start_trace(
+            "root", f"00-{trace_id}-{parent_id}-01"
+        )
+        is NOOP_SPAN
+    )
+    assert parse_traceparent("00-xyz-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(None) is None
+
+
+def test_span_records_error():
+    """Test an exception leaving a span marks it as failed."""
+    exporter = ListExporter()
+    processor = SpanProcessor(exporter)
+
+    with pytest.raises(KeyError), Tracer(processor, sample_rate=1).start_trace("root"):
+        raise KeyError("x")
+    processor.flush()
+
+    assert exporter.spans[0].error == "KeyError"
+
+
+def test_processor_drops_when_full():
+    """Test spans beyond the queue bound are dropped and counted."""
+    exporter = ListExporter()
+    processor = SpanProcessor(exporter, batch_size=2, max_queued=3)
+    tracer = Tracer(processor, sample_rate=1)
+
+    for _ in range(5):
+        with tracer.start_trace("root"):
+            pass
+    processor.flush()
+
+    assert len(exporter.spans) == 3
+    assert processor.stats() == {"queued": 0, "exported": 3, "dropped": 2, "failed": 0}
+
+
+def test_tracing_is_opt_in():
+    """Test the default configuration exports and samples nothing."""
+    assert build_exporter() is None
+    assert tracer.sample_rate == 0
+
+
+def test_jsonl_exporter(tmp_path):
+    """Test spans are appended one JSON object per line."""
+    path = tmp_path / "traces.jsonl"
+    processor = SpanProcessor(JsonlExporter(str(path)))
+    tracer = Tracer(processor, sample_rate=1)
+
+    with tracer.start_trace("root", route="/summary"), start_span("child"):
+        pass
+    processor.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["child", "root"]
+    assert lines[1]["attributes"] == {"route": "/summary"}
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+    assert lines[1]["duration_ms"] >= 0
+
+
+def test_otlp_exporter_posts_json():
+    """Test spans are posted to the collector in OTLP/JSON form."""
+    received = []
+
+    def collector(request):
+        received.append(json.loads(request.content))
+        return httpx.Response(200, json={})
+
+    exporter = OTLPExporter(
+        "http://collector/v1/traces",
+        httpx.Client(transport=httpx.MockTransport(collector)),
+    )
+    processor = SpanProcessor(exporter)
+    tracer = Tracer(processor, sample_rate=1)
+
+    with tracer.start_trace("root", hit=True, points=3), start_span("child"):
+        pass
+    processor.flush()
+
+    spans = received[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    child, root = spans
+    assert root["kind"] == 2 and "parentSpanId" not in root
+    assert child["parentSpanId"] == root["spanId"]
+    assert {"key": "points", "value": {"intValue": "3"}} in root["attributes"]
+    assert {"key": "hit", "value": {"boolValue": True}} in root["attributes"]
+
+
+@pytest.mark.asyncio
+async def test_summary_request_is_traced(exporter):
+    """Test a sampled /summary miss records the spans of each stage."""
+    local_data = {
+        "base": "EUR",
+        "to": "USD",
+        "rates": {"2025-07-01": 1.07, "2025-07-02": 1.08},
+    }
+
+    async def mock_get(*args, **kwargs):
+        raise ConnectionError("Force fallback")
+
+    with (
+        patch("app.main.http_client") as mock_client,
+        patch("builtins.open", mock_open(read_data=json.dumps(local_data))),
+    ):
+        mock_client.get = mock_get
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/summary?start=2025-07-01&end=2025-07-02")
+    tracer.processor.flush()
+
+    assert response.status_code == 200
+    by_name = {span.name: span for span in exporter.spans}
+    assert {
+        "GET /summary",
+        "validate",
+        "cache.lookup",
+        "coalesce.wait",
+        "fetch",
+        "upstream.attempt",
+        "fallback.read",
+        "render",
+        "compute",
+        "serialize",
+    } <= set(by_name)
+    assert len({span.trace_id for span in exporter.spans}) == 1
+
+    root = by_name["GET /summary"]
+    assert root.attributes["http.status_code"] == 200
+    assert by_name["cache.lookup"].attributes["hit"] is False
+    assert by_name["upstream.attempt"].error is not None
+    assert by_name["fetch"].attributes["source"] == "local_file"
+    assert by_name["fetch"].parent_id == by_name["coalesce.wait"].span_id
+    assert by_name["serialize"].parent_id == by_name["render"].span_id
+
+
+@pytest.mark.asyncio
+async def test_unsampled_requests_record_nothing(monkeypatch):
+    """Test requests outside the sample are not traced."""
+    exporter = ListExporter()
+    monkeypatch.setattr(tracer, "processor", SpanProcessor(exporter))
+    monkeypatch.setattr(tracer, "sample_rate", 0.0)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get("/health")
+    tracer.processor.flush()
+
+    assert response.status_code == 200
+    assert exporter.spans == []
+
+
+def test_sampled_span_overhead():
+    """Test a sampled span costs microseconds, small next to a request."""
+    processor = SpanProcessor(ListExporter(), max_queued=100000)
+    tracer = Tracer(processor, sample_rate=1)
+
+    started = time.perf_counter()
+    with tracer.start_trace("root"):
+        for _ in range(10000):
+            with start_span("child", points=10):
+                pass
+    per_span = (time.perf_counter() - started) / 10000
+
+    assert per_span < 50e-6
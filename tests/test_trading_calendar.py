@@ -0,0 +1,67 @@
+"""Tests for the ECB publication calendar."""
+
+from datetime import date
+
+from app.services.trading_calendar import TradingCalendar
+
+
+def o(date_str):
+    return date.fromisoformat(date_str).toordinal()
+
+
+def test_weekends_and_holidays_closed():
+    """Test weekends and TARGET holidays are not publication days."""
+    calendar = TradingCalendar()
+
+    assert calendar.is_publication_day(o("2025-07-04"))
+    assert not calendar.is_publication_day(o("2025-07-05"))
+    assert not calendar.is_publication_day(o("2025-07-06"))
+    for holiday in [
+        "2025-01-01",
+        "2025-04-18",
+        "2025-04-21",
+        "2025-05-01",
+        "2025-12-25",
+        "2025-12-26",
+    ]:
+        assert not calendar.is_publication_day(o(holiday))
+
+
+def test_easter():
+    """Test Easter dates for a few known years."""
+    assert TradingCalendar._easter(2024) == date(2024, 3, 31)
+    assert TradingCalendar._easter(2025) == date(2025, 4, 20)
+    assert TradingCalendar._easter(2026) == date(2026, 4, 5)
+
+
+def test_effective_range_trims_to_publication_days():
+    """Test ranges are narrowed to their first and last publication days."""
+    calendar = TradingCalendar()
+
+    result = calendar.effective_range(
+        o("2025-07-05"), o("2025-07-13"), today=o("2026-01-01")
+    )
+
+    assert result == (o("2025-07-07"), o("2025-07-11"))
+
+
+def test_effective_range_across_year_boundary():
+    """Test lookups continue into neighbouring years."""
+    calendar = TradingCalendar()
+
+    assert calendar.first_on_or_after(o("2025-12-31") + 1) == o("2026-01-02")
+    assert calendar.last_on_or_before(o("2026-01-01")) == o("2025-12-31")
+
+
+def test_effective_range_no_publication_days():
+    """Test weekend, holiday and future ranges have no fixings."""
+    calendar = TradingCalendar()
+
+    assert calendar.effective_range(o("2025-07-05"), o("2025-07-06")) is None
+    assert calendar.effective_range(o("2025-12-25"), o("2025-12-26")) is None
+    assert (
+        calendar.effective_range(
+            o("2025-07-07"), o("2025-07-10"), today=o("2025-07-06")
+        )
+        is None
+    )